@@ -1,7 +1,7 @@
 from logging.config import fileConfig
-from sqlalchemy import engine_from_config
-from sqlalchemy import pool
 from alembic import context
+from app.core.config import get_settings
+from app.core.storage import backend_name, build_engine, to_sync_url
 from app.models.schemas import Base  # Import your Base here
 
 # Alembic Config object
@@ -14,29 +14,32 @@ if config.config_file_name is not None:
 # Set target metadata
 target_metadata = Base.metadata
 
+# Migrate the database the app uses; DATABASE_URL overrides alembic.ini
+database_url = to_sync_url(get_settings().DATABASE_URL or config.get_main_option("sqlalchemy.url"))
+
+# SQLite cannot ALTER most column properties, so autogenerate batch (copy-and-move) operations there
+render_as_batch = backend_name(database_url) == 'sqlite'
+
 def run_migrations_offline():
-    url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url,
+        url=database_url,
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        render_as_batch=render_as_batch,
     )
 
     with context.begin_transaction():
         context.run_migrations()
 
 def run_migrations_online():
-    connectable = engine_from_config(
-        config.get_section(config.config_ini_section, {}),
-        prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
-    )
+    connectable = build_engine(database_url, pooled=False)
 
     with connectable.connect() as connection:
         context.configure(
             connection=connection,
             target_metadata=target_metadata,
+            render_as_batch=render_as_batch,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,27 @@
+"""Add scholarship model tier
+
+Revision ID: 50822a6316c2
+Revises: 7da3813021ac
+Create Date: 2026-10-19 09:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '50822a6316c2'
+down_revision: Union[str, None] = '7da3813021ac'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('scholarships', sa.Column('model_tier', sa.String(length=100), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('scholarships') as batch_op:
+        batch_op.drop_column('model_tier')
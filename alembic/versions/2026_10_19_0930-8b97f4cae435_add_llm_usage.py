@@ -0,0 +1,45 @@
+"""Add llm usage accounting
+
+Revision ID: 8b97f4cae435
+Revises: 50822a6316c2
+Create Date: 2026-10-19 09:30:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b97f4cae435'
+down_revision: Union[str, None] = '50822a6316c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('llm_usage',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('domain', sa.String(length=255), nullable=False),
+    sa.Column('model', sa.String(length=100), nullable=False),
+    sa.Column('operation', sa.String(length=50), nullable=False),
+    sa.Column('calls', sa.Integer(), nullable=True),
+    sa.Column('prompt_tokens', sa.Integer(), nullable=True),
+    sa.Column('completion_tokens', sa.Integer(), nullable=True),
+    sa.Column('cost', sa.Float(), nullable=True),
+    sa.Column('total_latency', sa.Float(), nullable=True),
+    sa.Column('last_update', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['task_id'], ['scraping_tasks.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('task_id', 'model', 'operation', name='uq_llm_usage_task_model_operation')
+    )
+    op.create_index(op.f('ix_llm_usage_domain'), 'llm_usage', ['domain'], unique=False)
+    op.create_index(op.f('ix_llm_usage_task_id'), 'llm_usage', ['task_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_llm_usage_task_id'), table_name='llm_usage')
+    op.drop_index(op.f('ix_llm_usage_domain'), table_name='llm_usage')
+    op.drop_table('llm_usage')
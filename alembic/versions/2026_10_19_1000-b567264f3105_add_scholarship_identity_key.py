@@ -0,0 +1,109 @@
+"""Add scholarship identity key and collapse duplicates
+
+Revision ID: b567264f3105
+Revises: 8b97f4cae435
+Create Date: 2026-10-19 10:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import hashlib
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b567264f3105'
+down_revision: Union[str, None] = '8b97f4cae435'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Frozen copy of app.utils.identity as of this revision, so later changes to the
+# normalization cannot change what this migration does.
+_NON_WORD_RE = re.compile(r'[\W_]+', re.UNICODE)
+_TRACKING_PARAMS = ('utm_', 'fbclid', 'gclid', 'mc_cid', 'mc_eid')
+
+
+def _normalize_title(title):
+    text = unicodedata.normalize('NFKC', title or '').casefold()
+    return _NON_WORD_RE.sub(' ', text).strip()
+
+
+def _normalize_domain(url):
+    host = (urlsplit(url or '').hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def _normalize_url(url):
+    parts = urlsplit((url or '').strip())
+    if not parts.netloc:
+        return (url or '').strip().lower()
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith(_TRACKING_PARAMS)
+    )
+    path = parts.path.rstrip('/')
+    return urlunsplit(('', _normalize_domain(url), path, urlencode(query), '')).lstrip('/')
+
+
+def _identity_key(title, application_url, source_url):
+    parts = (_normalize_title(title), _normalize_url(application_url), _normalize_domain(source_url))
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+scholarships = sa.table(
+    'scholarships',
+    sa.column('id', sa.Integer),
+    sa.column('identity_key', sa.String),
+    sa.column('title', sa.String),
+    sa.column('application_url', sa.String),
+    sa.column('source_url', sa.String),
+    sa.column('last_updated', sa.DateTime),
+    sa.column('created_at', sa.DateTime),
+)
+
+
+def upgrade() -> None:
+    op.add_column('scholarships', sa.Column('identity_key', sa.String(length=64), nullable=True))
+
+    conn = op.get_bind()
+    rows = conn.execute(sa.select(
+        scholarships.c.id,
+        scholarships.c.title,
+        scholarships.c.application_url,
+        scholarships.c.source_url,
+        scholarships.c.last_updated,
+        scholarships.c.created_at,
+    )).all()
+
+    groups = {}
+    for row in rows:
+        groups.setdefault(_identity_key(row.title, row.application_url, row.source_url), []).append(row)
+
+    # Keep the most recently refreshed row of each group, dated from the first crawl
+    for key, group in groups.items():
+        group.sort(key=lambda row: (row.last_updated is not None, row.last_updated or 0, row.id))
+        keeper, duplicates = group[-1], group[:-1]
+        first_seen = min((row.created_at for row in group if row.created_at), default=keeper.created_at)
+        conn.execute(
+            scholarships.update()
+            .where(scholarships.c.id == keeper.id)
+            .values(identity_key=key, created_at=first_seen)
+        )
+        if duplicates:
+            conn.execute(scholarships.delete().where(scholarships.c.id.in_([row.id for row in duplicates])))
+
+    with op.batch_alter_table('scholarships') as batch_op:
+        batch_op.alter_column('identity_key', existing_type=sa.String(length=64), nullable=False)
+        batch_op.create_index(batch_op.f('ix_scholarships_identity_key'), ['identity_key'], unique=True)
+
+
+def downgrade() -> None:
+    # Collapsed duplicates are not restored
+    with op.batch_alter_table('scholarships') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_scholarships_identity_key'))
+        batch_op.drop_column('identity_key')
@@ -0,0 +1,79 @@
+"""Add scholarship full-text search index
+
+Revision ID: beea04476c4a
+Revises: b567264f3105
+Create Date: 2026-10-19 10:30:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'beea04476c4a'
+down_revision: Union[str, None] = 'b567264f3105'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SQLITE_UPGRADE = [
+    """CREATE VIRTUAL TABLE scholarships_fts USING fts5(
+        title, eligibility_criteria, field_of_study, level_of_study,
+        content='scholarships', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER scholarships_fts_ai AFTER INSERT ON scholarships BEGIN
+        INSERT INTO scholarships_fts(rowid, title, eligibility_criteria, field_of_study, level_of_study)
+        VALUES (new.id, new.title, new.eligibility_criteria, new.field_of_study, new.level_of_study);
+    END""",
+    """CREATE TRIGGER scholarships_fts_ad AFTER DELETE ON scholarships BEGIN
+        INSERT INTO scholarships_fts(scholarships_fts, rowid, title, eligibility_criteria, field_of_study, level_of_study)
+        VALUES ('delete', old.id, old.title, old.eligibility_criteria, old.field_of_study, old.level_of_study);
+    END""",
+    """CREATE TRIGGER scholarships_fts_au AFTER UPDATE OF title, eligibility_criteria, field_of_study, level_of_study
+    ON scholarships BEGIN
+        INSERT INTO scholarships_fts(scholarships_fts, rowid, title, eligibility_criteria, field_of_study, level_of_study)
+        VALUES ('delete', old.id, old.title, old.eligibility_criteria, old.field_of_study, old.level_of_study);
+        INSERT INTO scholarships_fts(rowid, title, eligibility_criteria, field_of_study, level_of_study)
+        VALUES (new.id, new.title, new.eligibility_criteria, new.field_of_study, new.level_of_study);
+    END""",
+    # Index the rows that already exist
+    "INSERT INTO scholarships_fts(scholarships_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS scholarships_fts_au",
+    "DROP TRIGGER IF EXISTS scholarships_fts_ad",
+    "DROP TRIGGER IF EXISTS scholarships_fts_ai",
+    "DROP TABLE IF EXISTS scholarships_fts",
+]
+
+POSTGRESQL_UPGRADE = [
+    """ALTER TABLE scholarships ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(field_of_study, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(level_of_study, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(eligibility_criteria, '')), 'C')
+    ) STORED""",
+    "CREATE INDEX ix_scholarships_search_vector ON scholarships USING GIN (search_vector)",
+]
+
+POSTGRESQL_DOWNGRADE = [
+    "DROP INDEX IF EXISTS ix_scholarships_search_vector",
+    "ALTER TABLE scholarships DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _run(statements_by_dialect) -> None:
+    for statement in statements_by_dialect.get(op.get_context().dialect.name, []):
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    _run({'sqlite': SQLITE_UPGRADE, 'postgresql': POSTGRESQL_UPGRADE})
+
+
+def downgrade() -> None:
+    _run({'sqlite': SQLITE_DOWNGRADE, 'postgresql': POSTGRESQL_DOWNGRADE})
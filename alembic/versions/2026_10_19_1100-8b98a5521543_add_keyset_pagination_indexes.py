@@ -0,0 +1,28 @@
+"""Add keyset pagination indexes
+
+Revision ID: 8b98a5521543
+Revises: beea04476c4a
+Create Date: 2026-10-19 11:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b98a5521543'
+down_revision: Union[str, None] = 'beea04476c4a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_scholarships_last_updated_id', 'scholarships', ['last_updated', 'id'], unique=False)
+    op.create_index('ix_scraping_tasks_status_last_run_id', 'scraping_tasks', ['status', 'last_run', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_scraping_tasks_status_last_run_id', table_name='scraping_tasks')
+    op.drop_index('ix_scholarships_last_updated_id', table_name='scholarships')
@@ -0,0 +1,96 @@
+"""Add scholarship stats rollups
+
+Revision ID: feaf82a96264
+Revises: 8b98a5521543
+Create Date: 2026-10-19 11:30:00.000000+00:00
+
+"""
+from collections import defaultdict
+from typing import Sequence, Union
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'feaf82a96264'
+down_revision: Union[str, None] = '8b98a5521543'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Frozen copy of app.services.rollups bucketing as of this revision
+_AMOUNT_RE = re.compile(r'\$?\d+(?:,\d{3})*(?:\.\d{2})?')
+_AMOUNT_BUCKETS = (
+    (1000, 'Under $1,000'),
+    (5000, '$1,000 - $4,999'),
+    (10000, '$5,000 - $9,999'),
+    (25000, '$10,000 - $24,999'),
+)
+
+
+def _amount_bucket(amount):
+    figures = [float(re.sub(r'[$,]', '', match)) for match in _AMOUNT_RE.findall(amount or '')]
+    if not figures:
+        return 'Unknown'
+    top = max(figures)
+    for bound, label in _AMOUNT_BUCKETS:
+        if top < bound:
+            return label
+    return '$25,000+'
+
+
+def _rollup_keys(row):
+    keys = [
+        ('total', ''),
+        ('field', row.field_of_study or 'Not specified'),
+        ('level', row.level_of_study or 'Not specified'),
+        ('amount', _amount_bucket(row.amount)),
+        ('deadline_month', row.deadline.strftime('%Y-%m') if row.deadline else 'No deadline'),
+    ]
+    if row.last_updated:
+        keys.append(('day', row.last_updated.strftime('%Y-%m-%d')))
+    return keys
+
+
+scholarships = sa.table(
+    'scholarships',
+    sa.column('field_of_study', sa.String),
+    sa.column('level_of_study', sa.String),
+    sa.column('amount', sa.String),
+    sa.column('deadline', sa.DateTime),
+    sa.column('last_updated', sa.DateTime),
+    sa.column('confidence_score', sa.Float),
+)
+
+
+def upgrade() -> None:
+    rollups = op.create_table('scholarship_rollups',
+        sa.Column('dimension', sa.String(length=32), nullable=False),
+        sa.Column('bucket', sa.String(length=200), nullable=False),
+        sa.Column('row_count', sa.Integer(), nullable=False),
+        sa.Column('confidence_sum', sa.Float(), nullable=False),
+        sa.Column('confidence_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('dimension', 'bucket')
+    )
+
+    totals = defaultdict(lambda: [0, 0.0, 0])
+    for row in op.get_bind().execute(sa.select(scholarships)):
+        for key in _rollup_keys(row):
+            total = totals[key]
+            total[0] += 1
+            if row.confidence_score is not None:
+                total[1] += row.confidence_score
+                total[2] += 1
+
+    if totals:
+        op.bulk_insert(rollups, [
+            {'dimension': dimension, 'bucket': bucket, 'row_count': count,
+             'confidence_sum': confidence_sum, 'confidence_count': confidence_count}
+            for (dimension, bucket), (count, confidence_sum, confidence_count) in totals.items()
+        ])
+
+
+def downgrade() -> None:
+    op.drop_table('scholarship_rollups')
@@ -0,0 +1,26 @@
+"""Add task last_run index for status paging
+
+Revision ID: 33140440c354
+Revises: feaf82a96264
+Create Date: 2026-10-19 12:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '33140440c354'
+down_revision: Union[str, None] = 'feaf82a96264'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_scraping_tasks_last_run_id', 'scraping_tasks', ['last_run', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_scraping_tasks_last_run_id', table_name='scraping_tasks')
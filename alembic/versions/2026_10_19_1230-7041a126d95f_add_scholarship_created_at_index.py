@@ -0,0 +1,26 @@
+"""Add scholarship created_at index for exports
+
+Revision ID: 7041a126d95f
+Revises: 33140440c354
+Create Date: 2026-10-19 12:30:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7041a126d95f'
+down_revision: Union[str, None] = '33140440c354'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_scholarships_created_at_id', 'scholarships', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_scholarships_created_at_id', table_name='scholarships')
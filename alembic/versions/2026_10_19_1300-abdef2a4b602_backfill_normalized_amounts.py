@@ -0,0 +1,79 @@
+"""Backfill and index normalized scholarship amounts
+
+Revision ID: abdef2a4b602
+Revises: 7041a126d95f
+Create Date: 2026-10-19 13:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'abdef2a4b602'
+down_revision: Union[str, None] = '7041a126d95f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Frozen copy of app.utils.amounts.parse_amount as of this revision
+_AMOUNT_RE = re.compile(r'\$?\d+(?:,\d{3})*(?:\.\d{2})?')
+_RENEWABLE_RE = re.compile(r'renewable|per year|annual|yearly', re.I)
+BATCH_SIZE = 1000
+
+
+def _amount_columns(amount):
+    figures = [float(re.sub(r'[$,]', '', match)) for match in _AMOUNT_RE.findall(amount or '')]
+    return {
+        'amount_normalized_min': min(figures) if figures else None,
+        'amount_normalized_max': max(figures) if figures else None,
+        'amount_type': 'range' if len(figures) > 1 else 'fixed' if figures else 'unknown',
+        'is_renewable': bool(amount and _RENEWABLE_RE.search(amount)),
+    }
+
+
+scholarships = sa.table(
+    'scholarships',
+    sa.column('id', sa.Integer),
+    sa.column('amount', sa.String),
+    sa.column('amount_normalized_min', sa.Float),
+    sa.column('amount_normalized_max', sa.Float),
+    sa.column('amount_type', sa.String),
+    sa.column('is_renewable', sa.Boolean),
+)
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    update = (
+        scholarships.update()
+        .where(scholarships.c.id == sa.bindparam('row_id'))
+        .values({column: sa.bindparam(column) for column in (
+            'amount_normalized_min', 'amount_normalized_max', 'amount_type', 'is_renewable'
+        )})
+    )
+
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(scholarships.c.id, scholarships.c.amount)
+            .where(scholarships.c.id > last_id)
+            .order_by(scholarships.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        conn.execute(update, [{'row_id': row.id, **_amount_columns(row.amount)} for row in rows])
+        last_id = rows[-1].id
+
+    op.create_index(op.f('ix_scholarships_amount_normalized_min'), 'scholarships', ['amount_normalized_min'], unique=False)
+    op.create_index(op.f('ix_scholarships_amount_normalized_max'), 'scholarships', ['amount_normalized_max'], unique=False)
+
+
+def downgrade() -> None:
+    # Backfilled values are left in place; they were always valid for these columns
+    op.drop_index(op.f('ix_scholarships_amount_normalized_max'), table_name='scholarships')
+    op.drop_index(op.f('ix_scholarships_amount_normalized_min'), table_name='scholarships')
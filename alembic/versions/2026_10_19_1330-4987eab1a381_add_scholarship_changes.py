@@ -0,0 +1,55 @@
+"""Add scholarship change log
+
+Revision ID: 4987eab1a381
+Revises: abdef2a4b602
+Create Date: 2026-10-19 13:30:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4987eab1a381'
+down_revision: Union[str, None] = 'abdef2a4b602'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+scholarships = sa.table(
+    'scholarships',
+    sa.column('id', sa.Integer),
+    sa.column('identity_key', sa.String),
+    sa.column('last_updated', sa.DateTime),
+    sa.column('created_at', sa.DateTime),
+)
+
+
+def upgrade() -> None:
+    changes = op.create_table('scholarship_changes',
+        sa.Column('seq', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('scholarship_id', sa.Integer(), nullable=False),
+        sa.Column('identity_key', sa.String(length=64), nullable=False),
+        sa.Column('operation', sa.String(length=10), nullable=False),
+        sa.Column('changed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('seq')
+    )
+    op.create_index(op.f('ix_scholarship_changes_scholarship_id'), 'scholarship_changes', ['scholarship_id'], unique=False)
+
+    # Existing rows become the opening inserts, so a consumer starting at 0 gets a full sync
+    op.execute(changes.insert().from_select(
+        ['scholarship_id', 'identity_key', 'operation', 'changed_at'],
+        sa.select(
+            scholarships.c.id,
+            scholarships.c.identity_key,
+            sa.literal('insert'),
+            sa.func.coalesce(scholarships.c.last_updated, scholarships.c.created_at)
+        ).order_by(scholarships.c.id)
+    ))
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_scholarship_changes_scholarship_id'), table_name='scholarship_changes')
+    op.drop_table('scholarship_changes')
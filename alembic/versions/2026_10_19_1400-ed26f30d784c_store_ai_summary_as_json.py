@@ -0,0 +1,102 @@
+"""Store ai_summary as JSON with generated filter columns
+
+Revision ID: ed26f30d784c
+Revises: 4987eab1a381
+Create Date: 2026-10-19 14:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+import json
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ed26f30d784c'
+down_revision: Union[str, None] = '4987eab1a381'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BATCH_SIZE = 1000
+
+# Generated column -> (SQLite expression, Postgres expression) over ai_summary
+GENERATED = {
+    'ai_is_recurring': (
+        "JSON_EXTRACT(ai_summary, '$.\"deadline_info\".\"is_recurring\"')",
+        "CAST(ai_summary #>> '{deadline_info,is_recurring}' AS BOOLEAN)",
+    ),
+    'ai_is_renewable': (
+        "JSON_EXTRACT(ai_summary, '$.\"amount_analysis\".\"is_renewable\"')",
+        "CAST(ai_summary #>> '{amount_analysis,is_renewable}' AS BOOLEAN)",
+    ),
+}
+
+scholarships = sa.table(
+    'scholarships',
+    sa.column('id', sa.Integer),
+    sa.column('ai_summary', sa.Text),
+)
+
+
+def _normalized(text):
+    """The stored text as a JSON object, or None when it is not one; unwraps double-encoded values."""
+    try:
+        value = json.loads(text)
+        if isinstance(value, str):
+            value = json.loads(value)
+    except (TypeError, ValueError):
+        return None
+    return json.dumps(value) if isinstance(value, dict) else None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    postgres = conn.dialect.name == 'postgresql'
+
+    # JSON functions reject malformed text, which would break the generated columns
+    update = (
+        scholarships.update()
+        .where(scholarships.c.id == sa.bindparam('row_id'))
+        .values(ai_summary=sa.bindparam('summary'))
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(scholarships.c.id, scholarships.c.ai_summary)
+            .where(scholarships.c.id > last_id)
+            .order_by(scholarships.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        changed = [
+            {'row_id': row.id, 'summary': summary}
+            for row in rows
+            if row.ai_summary is not None and (summary := _normalized(row.ai_summary)) != row.ai_summary
+        ]
+        if changed:
+            conn.execute(update, changed)
+        last_id = rows[-1].id
+
+    # SQLite's JSON functions work on the stored text, so only Postgres changes type
+    if postgres:
+        op.alter_column('scholarships', 'ai_summary', type_=postgresql.JSONB(),
+                        existing_type=sa.Text(), postgresql_using='ai_summary::jsonb')
+
+    for column, (sqlite_expression, postgres_expression) in GENERATED.items():
+        op.add_column('scholarships', sa.Column(
+            column, sa.Boolean(), sa.Computed(postgres_expression if postgres else sqlite_expression), nullable=True
+        ))
+        op.create_index(op.f(f'ix_scholarships_{column}'), 'scholarships', [column], unique=False)
+
+
+def downgrade() -> None:
+    for column in reversed(list(GENERATED)):
+        op.drop_index(op.f(f'ix_scholarships_{column}'), table_name='scholarships')
+        op.drop_column('scholarships', column)
+    if op.get_bind().dialect.name == 'postgresql':
+        op.alter_column('scholarships', 'ai_summary', type_=sa.Text(),
+                        existing_type=postgresql.JSONB(), postgresql_using='ai_summary::text')
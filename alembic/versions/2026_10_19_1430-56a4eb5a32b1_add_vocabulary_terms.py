@@ -0,0 +1,220 @@
+"""Add canonical field and level vocabulary
+
+Revision ID: 56a4eb5a32b1
+Revises: ed26f30d784c
+Create Date: 2026-10-19 14:30:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+import difflib
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '56a4eb5a32b1'
+down_revision: Union[str, None] = 'ed26f30d784c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BATCH_SIZE = 1000
+
+# Frozen copy of app.utils.vocabulary as of this revision
+TERMS = (
+    (1, 'field', 'Not specified'), (2, 'field', 'Any field'), (3, 'field', 'Multiple fields'),
+    (4, 'field', 'STEM'), (5, 'field', 'Agriculture and Environment'), (6, 'field', 'Arts and Humanities'),
+    (7, 'field', 'Business and Economics'), (8, 'field', 'Computer Science and IT'), (9, 'field', 'Education'),
+    (10, 'field', 'Engineering'), (11, 'field', 'Health and Medicine'), (12, 'field', 'Sciences and Mathematics'),
+    (13, 'field', 'Social Sciences'), (14, 'field', 'Other'),
+    (101, 'level', 'Not specified'), (102, 'level', 'Any level'), (103, 'level', 'High school'),
+    (104, 'level', 'College and vocational'), (105, 'level', 'Post-secondary'), (106, 'level', 'Undergraduate'),
+    (107, 'level', 'Graduate'), (108, 'level', 'Multiple levels'), (109, 'level', 'Other'),
+)
+EXACT = {
+    1: ('not specified', 'unknown', 'none', 'n a', 'not applicable'),
+    2: ('any', 'all', 'various', 'open', 'general', 'open to all'),
+    101: ('not specified', 'unknown', 'none', 'n a', 'not applicable'),
+    102: ('any', 'all', 'various', 'open', 'all levels', 'any level', 'open to all'),
+}
+PHRASES = {
+    2: ('any field', 'all fields', 'any discipline', 'all disciplines', 'any program', 'all programs',
+        'any degree', 'any undergraduate degree', 'any major', 'all majors'),
+    3: ('multiple fields', 'several fields', 'various fields', 'multiple disciplines'),
+    4: ('stem', 'steam', 'science technology engineering and mathematics',
+        'science technology engineering and math', 'science technology engineering math'),
+    5: ('agriculture', 'agricultural', 'crop science', 'animal health', 'animal science', 'forestry',
+        'forest', 'environment', 'environmental', 'conservation', 'ecology', 'sustainability',
+        'veterinary'),
+    6: ('art', 'arts', 'fine arts', 'music', 'humanities', 'history', 'philosophy', 'languages',
+        'linguistics', 'literature', 'english', 'french', 'native studies', 'indigenous studies',
+        'black studies', 'african studies', 'caribbean studies', 'design', 'theatre', 'film',
+        'journalism', 'communications'),
+    7: ('business', 'commerce', 'accounting', 'finance', 'economics', 'marketing', 'management',
+        'entrepreneurship', 'mba', 'public relations'),
+    8: ('computer science', 'computing science', 'computing', 'computer', 'information technology',
+        'software', 'data science', 'cybersecurity', 'informatics', 'technology'),
+    9: ('education', 'teaching', 'teacher'),
+    10: ('engineering', 'engineer'),
+    11: ('health', 'health sciences', 'mental health', 'public health', 'medicine', 'medical',
+         'nursing', 'nutrition', 'kinesiology', 'pharmacy', 'dentistry', 'physiotherapy',
+         'sport', 'sports', 'recreation'),
+    12: ('science', 'sciences', 'natural sciences', 'applied science', 'biology', 'chemistry',
+         'biochemistry', 'physics', 'mathematics', 'math', 'statistics'),
+    13: ('psychology', 'sociology', 'social sciences', 'social science', 'social work',
+         'political science', 'anthropology', 'criminology', 'humanitarian', 'community',
+         'advocacy', 'law', 'public policy'),
+    103: ('high school', 'secondary school', 'grade 12', 'grade twelve'),
+    104: ('college', 'community college', 'vocational', 'technical', 'trade', 'trades',
+          'apprenticeship', 'diploma', 'certificate'),
+    105: ('post secondary', 'postsecondary', 'college or university', 'university', 'tertiary',
+          'higher education'),
+    106: ('undergraduate', 'undergrad', 'bachelor', 'bachelors', 'bachelor s', 'bsc', 'ba', 'bs',
+          'freshman', 'first year'),
+    107: ('graduate', 'postgraduate', 'post graduate', 'master', 'masters', 'master s', 'msc',
+          'doctoral', 'doctorate', 'phd', 'postdoctoral'),
+}
+FALLBACK = {'field': (1, 14), 'level': (101, 109)}  # (not specified, other)
+MULTIPLE_LEVELS = 108
+
+
+def _normalize(text):
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode()
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', text.lower()).split())
+
+
+def _mapper(dimension):
+    ids = {term_id for term_id, term_dimension, _ in TERMS if term_dimension == dimension}
+    exact = {_normalize(name): term_id for term_id, term_dimension, name in TERMS if term_dimension == dimension}
+    exact.update({phrase: term_id for term_id, phrases in EXACT.items() if term_id in ids for phrase in phrases})
+    phrases = {phrase: term_id for term_id, candidates in PHRASES.items() if term_id in ids for phrase in candidates}
+    pattern = re.compile(r'\b(?:' + '|'.join(map(re.escape, sorted(phrases, key=len, reverse=True))) + r')\b')
+    words = [phrase for phrase in phrases if ' ' not in phrase and len(phrase) >= 5]
+    not_specified, other = FALLBACK[dimension]
+
+    def canonical(value):
+        text = _normalize(value)
+        if not text:
+            return not_specified
+        if text in exact:
+            return exact[text]
+        found = [phrases[match.group(0)] for match in pattern.finditer(text)]
+        if not found:
+            for word in text.split():
+                close = difflib.get_close_matches(word, words, n=1, cutoff=0.85) if len(word) >= 5 else []
+                if close:
+                    found.append(phrases[close[0]])
+        if not found:
+            return other
+        if dimension == 'level' and len(set(found)) > 1:
+            return MULTIPLE_LEVELS
+        return found[0]
+    return canonical
+
+
+scholarships = sa.table(
+    'scholarships',
+    sa.column('id', sa.Integer),
+    sa.column('field_of_study', sa.String),
+    sa.column('level_of_study', sa.String),
+    sa.column('field_id', sa.Integer),
+    sa.column('level_id', sa.Integer),
+    sa.column('confidence_score', sa.Float),
+)
+rollups = sa.table(
+    'scholarship_rollups',
+    sa.column('dimension', sa.String),
+    sa.column('bucket', sa.String),
+    sa.column('row_count', sa.Integer),
+    sa.column('confidence_sum', sa.Float),
+    sa.column('confidence_count', sa.Integer),
+)
+
+
+def _rebuild_rollups(buckets):
+    """Recount the field and level rollups; buckets maps dimension -> (bucket expression, FROM clause)."""
+    op.execute(rollups.delete().where(rollups.c.dimension.in_(list(buckets))))
+    for dimension, (bucket, source) in buckets.items():
+        op.execute(rollups.insert().from_select(
+            ['dimension', 'bucket', 'row_count', 'confidence_sum', 'confidence_count'],
+            sa.select(
+                sa.literal(dimension),
+                bucket,
+                sa.func.count(),
+                sa.func.coalesce(sa.func.sum(scholarships.c.confidence_score), 0.0),
+                sa.func.count(scholarships.c.confidence_score)
+            ).select_from(source).group_by(bucket)
+        ))
+
+
+def upgrade() -> None:
+    terms = op.create_table('vocabulary_terms',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('dimension', sa.String(length=16), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('dimension', 'name', name='uq_vocabulary_terms_dimension_name')
+    )
+    op.bulk_insert(terms, [{'id': term_id, 'dimension': dimension, 'name': name} for term_id, dimension, name in TERMS])
+
+    op.add_column('scholarships', sa.Column('field_id', sa.Integer(), nullable=True))
+    op.add_column('scholarships', sa.Column('level_id', sa.Integer(), nullable=True))
+    # SQLite can only add constraints by rebuilding the table (and its search triggers),
+    # and does not enforce foreign keys unless asked to
+    if op.get_bind().dialect.name == 'postgresql':
+        op.create_foreign_key('scholarships_field_id_fkey', 'scholarships', 'vocabulary_terms', ['field_id'], ['id'])
+        op.create_foreign_key('scholarships_level_id_fkey', 'scholarships', 'vocabulary_terms', ['level_id'], ['id'])
+
+    conn = op.get_bind()
+    canonical_field, canonical_level = _mapper('field'), _mapper('level')
+    update = (
+        scholarships.update()
+        .where(scholarships.c.id == sa.bindparam('row_id'))
+        .values(field_id=sa.bindparam('new_field_id'), level_id=sa.bindparam('new_level_id'))
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(scholarships.c.id, scholarships.c.field_of_study, scholarships.c.level_of_study)
+            .where(scholarships.c.id > last_id)
+            .order_by(scholarships.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        conn.execute(update, [
+            {'row_id': row.id, 'new_field_id': canonical_field(row.field_of_study),
+             'new_level_id': canonical_level(row.level_of_study)}
+            for row in rows
+        ])
+        last_id = rows[-1].id
+
+    op.create_index(op.f('ix_scholarships_field_id'), 'scholarships', ['field_id'], unique=False)
+    op.create_index(op.f('ix_scholarships_level_id'), 'scholarships', ['level_id'], unique=False)
+
+    # Stats now group by canonical term instead of the raw strings
+    field_terms, level_terms = terms.alias('field_terms'), terms.alias('level_terms')
+    _rebuild_rollups({
+        'field': (sa.func.coalesce(field_terms.c.name, 'Not specified'),
+                  scholarships.outerjoin(field_terms, field_terms.c.id == scholarships.c.field_id)),
+        'level': (sa.func.coalesce(level_terms.c.name, 'Not specified'),
+                  scholarships.outerjoin(level_terms, level_terms.c.id == scholarships.c.level_id)),
+    })
+
+
+def downgrade() -> None:
+    _rebuild_rollups({
+        'field': (sa.func.coalesce(scholarships.c.field_of_study, 'Not specified'), scholarships),
+        'level': (sa.func.coalesce(scholarships.c.level_of_study, 'Not specified'), scholarships),
+    })
+    op.drop_index(op.f('ix_scholarships_level_id'), table_name='scholarships')
+    op.drop_index(op.f('ix_scholarships_field_id'), table_name='scholarships')
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_constraint('scholarships_level_id_fkey', 'scholarships', type_='foreignkey')
+        op.drop_constraint('scholarships_field_id_fkey', 'scholarships', type_='foreignkey')
+    op.drop_column('scholarships', 'level_id')
+    op.drop_column('scholarships', 'field_id')
+    op.drop_table('vocabulary_terms')
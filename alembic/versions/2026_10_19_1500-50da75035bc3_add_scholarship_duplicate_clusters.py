@@ -0,0 +1,153 @@
+"""Add MinHash signatures and near-duplicate clusters
+
+Revision ID: 50da75035bc3
+Revises: 56a4eb5a32b1
+Create Date: 2026-10-19 15:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+from array import array
+import hashlib
+import random
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '50da75035bc3'
+down_revision: Union[str, None] = '56a4eb5a32b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BATCH_SIZE = 1000
+THRESHOLD = 0.8
+
+# Frozen copy of app.utils.minhash as of this revision
+NUM_PERM = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_WORDS = 3
+_PRIME = (1 << 61) - 1
+_MASK32 = (1 << 32) - 1
+_rng = random.Random(1337)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+_NON_WORD_RE = re.compile(r'[\W_]+', re.UNICODE)
+
+
+def _hash64(data):
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+
+def _signature(title, eligibility):
+    text = unicodedata.normalize('NFKC', f"{title or ''} {eligibility or ''}").casefold()
+    words = _NON_WORD_RE.sub(' ', text).split()
+    if len(words) < SHINGLE_WORDS:
+        shingles = {' '.join(words)} if words else set()
+    else:
+        shingles = {' '.join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+    hashes = [_hash64(shingle.encode('utf-8')) for shingle in shingles]
+    if not hashes:
+        return None
+    return array('I', [min((a * h + b) % _PRIME for h in hashes) & _MASK32 for a, b in _PERMUTATIONS]).tobytes()
+
+
+def _band_buckets(packed):
+    size = ROWS_PER_BAND * 4
+    return [(band, _hash64(packed[band * size:(band + 1) * size]) >> 1) for band in range(BANDS)]
+
+
+def _similarity(first, second):
+    a, b = array('I'), array('I')
+    a.frombytes(first)
+    b.frombytes(second)
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_PERM
+
+
+scholarships = sa.table(
+    'scholarships',
+    sa.column('id', sa.Integer),
+    sa.column('title', sa.String),
+    sa.column('eligibility_criteria', sa.Text),
+    sa.column('minhash', sa.LargeBinary),
+    sa.column('cluster_id', sa.Integer),
+)
+
+
+def upgrade() -> None:
+    op.add_column('scholarships', sa.Column('minhash', sa.LargeBinary(), nullable=True))
+    op.add_column('scholarships', sa.Column('cluster_id', sa.Integer(), nullable=True))
+    bands = op.create_table('scholarship_minhash_bands',
+        sa.Column('scholarship_id', sa.Integer(), nullable=False),
+        sa.Column('band', sa.Integer(), nullable=False),
+        sa.Column('bucket', sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(['scholarship_id'], ['scholarships.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('scholarship_id', 'band')
+    )
+
+    conn = op.get_bind()
+    update = (
+        scholarships.update()
+        .where(scholarships.c.id == sa.bindparam('row_id'))
+        .values(minhash=sa.bindparam('packed'))
+    )
+    signatures, members = {}, {}
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(scholarships.c.id, scholarships.c.title, scholarships.c.eligibility_criteria)
+            .where(scholarships.c.id > last_id)
+            .order_by(scholarships.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        batch = {row.id: _signature(row.title, row.eligibility_criteria) for row in rows}
+        conn.execute(update, [{'row_id': id, 'packed': packed} for id, packed in batch.items()])
+        band_rows = []
+        for id, packed in batch.items():
+            if packed:
+                signatures[id] = packed
+                for band, bucket in _band_buckets(packed):
+                    band_rows.append({'scholarship_id': id, 'band': band, 'bucket': bucket})
+                    members.setdefault((band, bucket), []).append(id)
+        if band_rows:
+            op.bulk_insert(bands, band_rows)
+        last_id = rows[-1].id
+
+    # Union-find over verified pairs; every cluster is labelled by its lowest id
+    parent = {}
+
+    def find(id):
+        while parent.get(id, id) != id:
+            id = parent[id]
+        return id
+
+    for ids in members.values():
+        first = ids[0]
+        for other in ids[1:]:
+            if _similarity(signatures[first], signatures[other]) >= THRESHOLD:
+                a, b = find(first), find(other)
+                if a != b:
+                    parent[max(a, b)] = min(a, b)
+    clusters = {}
+    for id in parent:
+        clusters.setdefault(find(id), set()).add(id)
+    for label, ids in clusters.items():
+        conn.execute(
+            scholarships.update().where(scholarships.c.id.in_(sorted(ids | {label}))).values(cluster_id=label)
+        )
+
+    op.create_index('ix_scholarship_minhash_bands_band_bucket', 'scholarship_minhash_bands', ['band', 'bucket'], unique=False)
+    op.create_index('ix_scholarships_cluster_id_id', 'scholarships', ['cluster_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_scholarships_cluster_id_id', table_name='scholarships')
+    op.drop_index('ix_scholarship_minhash_bands_band_bucket', table_name='scholarship_minhash_bands')
+    op.drop_table('scholarship_minhash_bands')
+    op.drop_column('scholarships', 'cluster_id')
+    op.drop_column('scholarships', 'minhash')
@@ -0,0 +1,45 @@
+"""Add scholarship deadline kind
+
+Revision ID: 71c8d417bbcd
+Revises: 50da75035bc3
+Create Date: 2026-10-19 15:30:00.000000+00:00
+
+Existing rows are classified from what is already stored: a parsed deadline
+is a date, or recurring when the AI summary says so, and anything else is
+unknown. Deadline text the old parser rejected ("March 1st", "Rolling") only
+survives in ai_summary, so scripts/backfill_deadlines.py re-parses it.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '71c8d417bbcd'
+down_revision: Union[str, None] = '50da75035bc3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+scholarships = sa.table(
+    'scholarships',
+    sa.column('deadline', sa.DateTime),
+    sa.column('deadline_kind', sa.String),
+    sa.column('ai_is_recurring', sa.Boolean),
+)
+
+
+def upgrade() -> None:
+    op.add_column('scholarships', sa.Column('deadline_kind', sa.String(length=16), nullable=True))
+    op.execute(scholarships.update().values(deadline_kind=sa.case(
+        (scholarships.c.deadline.is_(None), 'unknown'),
+        (scholarships.c.ai_is_recurring.is_(True), 'recurring'),
+        else_='date'
+    )))
+    op.create_index(op.f('ix_scholarships_deadline_kind'), 'scholarships', ['deadline_kind'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_scholarships_deadline_kind'), table_name='scholarships')
+    op.drop_column('scholarships', 'deadline_kind')
@@ -1,16 +1,36 @@
-from fastapi import APIRouter, HTTPException, Depends, Query, BackgroundTasks, UploadFile, File
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Query, BackgroundTasks, UploadFile, File, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel, HttpUrl, validator, Field
 from datetime import datetime, timedelta
-from app.core.database import get_db
-from app.models.schemas import ScrapingTask, Scholarship, ScrapedLink, ScrapingProgress
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal, get_db
+from app.core.storage import elapsed_seconds
+from app.models.schemas import ScrapingTask, Scholarship, ScrapedLink, ScrapingProgress, LLMUsage, ScholarshipRollup, ScholarshipMinHashBand
 from app.core.logging_config import setup_logging
-from sqlalchemy import desc, func, and_, or_
+from sqlalchemy import desc, func, and_, or_, select, delete
+import asyncio
 import json
 from app.utils.utils import extract_urls_from_file, validate_url
+from app.utils.pagination import Page, paginate_keyset, set_cursor_headers
+from app.utils.vocabulary import CATCH_ALL_TERMS, FIELD, LEVEL, canonical_term, terms
+from app.services.metrics import ai_metrics
+from app.services.resilience import get_openai_guard
+from app.services.changes import read_changes, record_deletes
+from app.services.export import (
+    accepts_gzip, arrow_stream_chunks, columnar_available, columnar_columns, csv_chunks, encode_chunks,
+    export_query, ndjson_chunks, parquet_chunks, stream_batches
+)
+from app.services.duplicates import collapse_condition
+from app.services.facets import facet_index
+from app.services.listing import encode_list, list_fields, list_query
+from app.services.rollups import AMOUNT, DEADLINE_MONTH, apply_rollup_deltas, existing_rollup_rows, read_rollups, rollup_deltas, scholarship_totals
+from app.services.search import search_scholarships
+from app.services.similarity import similarity_index
 
 logger = setup_logging()
+settings = get_settings()
 router = APIRouter()
 
 # --- Pydantic Models ---
@@ -33,6 +53,7 @@ class ScholarshipResponse(BaseModel):
     title: str
     amount: str
     deadline: Optional[str] = None  # Changed to string type
+    deadline_kind: Optional[str] = None  # date, recurring, rolling or unknown
     field_of_study: str
     level_of_study: str
     eligibility_criteria: str
@@ -42,6 +63,7 @@ class ScholarshipResponse(BaseModel):
     ai_summary: Optional[Dict] = None
     last_updated: str  # Changed to string type
     task_id: int
+    cluster_id: Optional[int] = None  # Lowest id among its near-duplicates, if it has any
 
     @validator('ai_summary', pre=True)
     def parse_ai_summary(cls, v):
@@ -73,6 +95,27 @@ class ScholarshipResponse(BaseModel):
                 return None
         return v
 
+class ScholarshipSearchResult(ScholarshipResponse):
+    rank: float  # Higher is more relevant
+    title_highlight: Optional[str] = None  # HTML-escaped, matches wrapped in <mark>
+    snippet: Optional[str] = None
+
+class SimilarScholarshipResponse(ScholarshipResponse):
+    score: float  # Cosine similarity of the two scholarships' text vectors, up to 1
+
+class ScholarshipChangeResponse(BaseModel):
+    seq: int
+    operation: str  # insert, update, delete
+    scholarship_id: int
+    identity_key: str
+    changed_at: Optional[datetime] = None
+    scholarship: Optional[ScholarshipResponse] = None  # Current row; None once deleted
+
+class ScholarshipChangesPage(BaseModel):
+    changes: List[ScholarshipChangeResponse]
+    next_cursor: str  # Pass back as since= to resume; unchanged when nothing is new
+    has_more: bool
+
 class TaskProgressResponse(BaseModel):
     task_id: int
     url: str
@@ -85,6 +128,11 @@ class TaskProgressResponse(BaseModel):
     end_time: Optional[str] = None    # Changed to string type
     error_message: Optional[str] = None
     processing_duration: Optional[str] = None
+    llm_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    llm_cost: float = 0.0  # Estimated USD
+    llm_latency: float = 0.0  # Total seconds spent waiting on the LLM
 
     @validator('start_time', 'end_time', pre=True)
     def format_datetime(cls, v):
@@ -92,6 +140,15 @@ class TaskProgressResponse(BaseModel):
             return v.isoformat()
         return v
 
+class DomainUsageResponse(BaseModel):
+    domain: str
+    tasks: int
+    llm_calls: int
+    prompt_tokens: int
+    completion_tokens: int
+    llm_cost: float
+    avg_latency: float  # Seconds per call
+
 class DetailedTaskStatusResponse(BaseModel):
     total_tasks: int
     pending: int
@@ -105,6 +162,8 @@ class DetailedTaskStatusResponse(BaseModel):
     processing_rate: float  # scholarships per minute
     success_rate: float  # percentage
     system_uptime: str
+    llm_cost: float = 0.0
+    llm_usage_by_domain: List[DomainUsageResponse] = []
 
 class ScholarshipStats(BaseModel):
     total_count: int
@@ -116,260 +175,478 @@ class ScholarshipStats(BaseModel):
     amount_ranges: Dict[str, int]
     deadline_distribution: Dict[str, int]
 
+class VocabularyTermResponse(BaseModel):
+    id: int
+    name: str
+
+class FacetValueResponse(BaseModel):
+    value: str  # Pass back to select it; vocabulary term id for field and level
+    label: str
+    count: int  # Matching rows if this value were selected too
+
+class ScholarshipFacets(BaseModel):
+    total: int  # Rows matching every selection
+    facets: Dict[str, List[FacetValueResponse]]  # field, level, amount, deadline_month
+
 class FilterParams(BaseModel):
     field_of_study: Optional[str] = None
     level_of_study: Optional[str] = None
     min_confidence: float = Field(0.0, ge=0.0, le=1.0)
     deadline_after: Optional[datetime] = None
+    deadline_kind: Optional[str] = None  # date, recurring, rolling or unknown
     min_amount: Optional[float] = None
     max_amount: Optional[float] = None
     source_url: Optional[str] = None
+    field_id: Optional[int] = None  # Vocabulary term id, see /scholarships/vocabulary
+    level_id: Optional[int] = None
+    is_recurring: Optional[bool] = None  # ai_summary deadline_info.is_recurring
+    is_renewable: Optional[bool] = None  # ai_summary amount_analysis.is_renewable
+    cluster_id: Optional[int] = None  # Every member of one duplicate cluster
+    collapse_duplicates: bool = False  # Return only the lowest-id member of each duplicate cluster
 
 # --- Helper Functions ---
-def calculate_processing_rate(db: Session) -> float:
+def scholarship_response_fields(s: Scholarship) -> Dict[str, Any]:
+    return dict(
+        id=s.id,
+        title=s.title,
+        amount=s.amount,
+        deadline=s.deadline.isoformat() if s.deadline else None,
+        deadline_kind=s.deadline_kind,
+        field_of_study=s.field_of_study,
+        level_of_study=s.level_of_study,
+        eligibility_criteria=s.eligibility_criteria,
+        application_url=s.application_url,
+        source_url=s.source_url,
+        confidence_score=s.confidence_score,
+        ai_summary=s.ai_summary,
+        last_updated=s.last_updated.isoformat() if s.last_updated else None,
+        task_id=s.task_id,
+        cluster_id=s.cluster_id
+    )
+
+def vocabulary_matches(column, dimension: str, value: str) -> List[Any]:
+    """Condition on the term `value` maps to, unless it only maps to a catch-all term."""
+    term_id = canonical_term(dimension, value)
+    return [] if term_id in CATCH_ALL_TERMS else [column == term_id]
+
+def scholarship_filter_conditions(filters: FilterParams) -> List[Any]:
+    conditions = [Scholarship.confidence_score >= filters.min_confidence]
+    # Free-form values also match rows filed under the same vocabulary term
+    if filters.field_of_study:
+        conditions.append(or_(
+            Scholarship.field_of_study.ilike(f"%{filters.field_of_study}%"),
+            *vocabulary_matches(Scholarship.field_id, FIELD, filters.field_of_study)
+        ))
+    if filters.level_of_study:
+        conditions.append(or_(
+            Scholarship.level_of_study == filters.level_of_study,
+            *vocabulary_matches(Scholarship.level_id, LEVEL, filters.level_of_study)
+        ))
+    if filters.field_id is not None:
+        conditions.append(Scholarship.field_id == filters.field_id)
+    if filters.level_id is not None:
+        conditions.append(Scholarship.level_id == filters.level_id)
+    if filters.deadline_after:
+        conditions.append(Scholarship.deadline >= filters.deadline_after)
+    if filters.deadline_kind:
+        conditions.append(Scholarship.deadline_kind == filters.deadline_kind)
+    if filters.source_url:
+        conditions.append(Scholarship.source_url.ilike(f"%{filters.source_url}%"))
+    # Range overlap: the award can reach min_amount and can be as low as max_amount
+    if filters.min_amount is not None:
+        conditions.append(Scholarship.amount_normalized_max >= filters.min_amount)
+    if filters.max_amount is not None:
+        conditions.append(Scholarship.amount_normalized_min <= filters.max_amount)
+    if filters.is_recurring is not None:
+        conditions.append(Scholarship.ai_is_recurring == filters.is_recurring)
+    if filters.is_renewable is not None:
+        conditions.append(Scholarship.ai_is_renewable == filters.is_renewable)
+    if filters.cluster_id is not None:
+        conditions.append(Scholarship.cluster_id == filters.cluster_id)
+    if filters.collapse_duplicates:
+        conditions.append(collapse_condition())
+    return conditions
+
+async def calculate_processing_rate(db: AsyncSession) -> float:
     """Calculate average scholarships processed per minute."""
     try:
-        completed_progress = db.query(ScrapingProgress)\
-            .filter(ScrapingProgress.status == "completed")\
-            .all()
-        
-        if not completed_progress:
-            return 0.0
-        
-        total_duration = 0
-        total_scholarships = 0
-        
-        for progress in completed_progress:
-            if progress.start_time and progress.end_time:
-                duration = (progress.end_time - progress.start_time).total_seconds() / 60
-                total_duration += duration
-                total_scholarships += progress.scholarships_found
-        
-        return total_scholarships / total_duration if total_duration > 0 else 0.0
+        minutes = elapsed_seconds(db.bind.dialect.name, ScrapingProgress.start_time, ScrapingProgress.end_time) / 60.0
+        totals = (await db.execute(
+            select(
+                func.coalesce(func.sum(ScrapingProgress.scholarships_found), 0).label('scholarships'),
+                func.coalesce(func.sum(minutes), 0.0).label('minutes')
+            ).filter(
+                ScrapingProgress.status == "completed",
+                ScrapingProgress.start_time.is_not(None),
+                ScrapingProgress.end_time.is_not(None)
+            )
+        )).first()
+
+        return totals.scholarships / totals.minutes if totals.minutes > 0 else 0.0
     except Exception:
         return 0.0
 
+async def latest_progress_by_task(db: AsyncSession, task_ids: List[int]) -> Dict[int, ScrapingProgress]:
+    """Most recent ScrapingProgress row of each task, in one query."""
+    if not task_ids:
+        return {}
+    latest = (
+        select(func.max(ScrapingProgress.id).label('id'))
+        .filter(ScrapingProgress.task_id.in_(task_ids))
+        .group_by(ScrapingProgress.task_id)
+        .subquery()
+    )
+    rows = (await db.execute(select(ScrapingProgress).join(latest, ScrapingProgress.id == latest.c.id))).scalars()
+    return {progress.task_id: progress for progress in rows}
+
+def llm_usage_columns():
+    return (
+        func.coalesce(func.sum(LLMUsage.calls), 0).label('llm_calls'),
+        func.coalesce(func.sum(LLMUsage.prompt_tokens), 0).label('prompt_tokens'),
+        func.coalesce(func.sum(LLMUsage.completion_tokens), 0).label('completion_tokens'),
+        func.coalesce(func.sum(LLMUsage.cost), 0.0).label('llm_cost'),
+        func.coalesce(func.sum(LLMUsage.total_latency), 0.0).label('llm_latency'),
+    )
+
+def llm_usage_fields(row) -> Dict[str, Any]:
+    """Map an aggregated LLMUsage row onto TaskProgressResponse fields."""
+    if row is None:
+        return {}
+    return {
+        'llm_calls': row.llm_calls,
+        'prompt_tokens': row.prompt_tokens,
+        'completion_tokens': row.completion_tokens,
+        'llm_cost': round(row.llm_cost, 6),
+        'llm_latency': round(row.llm_latency, 3),
+    }
+
+async def get_llm_usage_by_domain(db: AsyncSession, limit: int = 20) -> List[DomainUsageResponse]:
+    """Most expensive domains first."""
+    rows = (await db.execute(
+        select(
+            LLMUsage.domain,
+            func.count(func.distinct(LLMUsage.task_id)).label('tasks'),
+            *llm_usage_columns()
+        ).group_by(LLMUsage.domain)
+        .order_by(desc('llm_cost'))
+        .limit(limit)
+    )).all()
+
+    return [
+        DomainUsageResponse(
+            domain=row.domain,
+            tasks=row.tasks,
+            llm_calls=row.llm_calls,
+            prompt_tokens=row.prompt_tokens,
+            completion_tokens=row.completion_tokens,
+            llm_cost=round(row.llm_cost, 6),
+            avg_latency=round(row.llm_latency / row.llm_calls, 3) if row.llm_calls else 0.0
+        )
+        for row in rows
+    ]
+
+async def fetch_page(db: AsyncSession, query, sort_column, id_column, limit: int,
+                     cursor: Optional[str], skip: int, scalars: bool = True) -> Page:
+    """Keyset page by cursor; plain offset paging only for old clients that still send skip."""
+    if skip and not cursor:
+        result = await db.execute(
+            query.order_by(sort_column.desc().nulls_last(), id_column.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        return Page(items=list(result.scalars().all() if scalars else result.all()))
+    try:
+        return await paginate_keyset(db, query, sort_column, id_column, limit, cursor, scalars)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 # --- Endpoints ---
 @router.get("/status", response_model=DetailedTaskStatusResponse)
-async def get_status(db: Session = Depends(get_db)):
-    """Get detailed status of all scraping tasks including progress."""
+async def get_status(
+    response: Response,
+    status: Optional[str] = Query(None, description="Only list tasks_progress entries with this task status"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor or X-Prev-Cursor of a previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get detailed status of all scraping tasks. Totals cover every task;
+    tasks_progress is one page of tasks with progress, most recently run first.
+    """
     try:
-        tasks = db.query(ScrapingTask).all()
-        progress_records = db.query(ScrapingProgress).all()
-        
-        scholarship_stats = db.query(
-            func.count(Scholarship.id).label('count'),
-            func.avg(Scholarship.confidence_score).label('avg_confidence')
-        ).first()
+        status_rows = (await db.execute(
+            select(
+                ScrapingTask.status,
+                func.count(ScrapingTask.id).label('tasks'),
+                func.coalesce(func.sum(ScrapingTask.success_count + ScrapingTask.fail_count), 0).label('attempts'),
+                func.min(ScrapingTask.created_at).label('first_created')
+            ).group_by(ScrapingTask.status)
+        )).all()
+        tasks_by_status = {row.status: row.tasks for row in status_rows}
+        total_attempts = sum(row.attempts for row in status_rows)
+        first_created = min((row.first_created for row in status_rows if row.first_created), default=None)
+
+        total_scholarships, average_confidence = await scholarship_totals(db)
+        total_usage = (await db.execute(select(*llm_usage_columns()))).first()
+        llm_usage_by_domain = await get_llm_usage_by_domain(db)
 
         # Calculate success rate
-        total_completed = sum(1 for task in tasks if task.status == "completed")
-        total_attempts = sum(task.success_count + task.fail_count for task in tasks)
+        total_completed = tasks_by_status.get("completed", 0)
         success_rate = (total_completed / total_attempts * 100) if total_attempts > 0 else 0
 
+        query = select(ScrapingTask).filter(
+            select(ScrapingProgress.id).filter(ScrapingProgress.task_id == ScrapingTask.id).exists()
+        )
+        if status:
+            query = query.filter(ScrapingTask.status == status)
+        page = await fetch_page(db, query, ScrapingTask.last_run, ScrapingTask.id, limit, cursor, 0)
+        set_cursor_headers(response, page)
+
+        task_ids = [task.id for task in page.items]
+        progress_by_task = await latest_progress_by_task(db, task_ids)
+        usage_rows = await db.execute(
+            select(LLMUsage.task_id, *llm_usage_columns())
+            .filter(LLMUsage.task_id.in_(task_ids))
+            .group_by(LLMUsage.task_id)
+        )
+        usage_by_task = {row.task_id: row for row in usage_rows}
+
         tasks_progress = []
-        for task in tasks:
-            progress = next((p for p in progress_records if p.task_id == task.id), None)
-            
-            if progress:
-                processing_duration = None
-                if progress.start_time:
-                    end = progress.end_time or datetime.utcnow()
-                    duration = end - progress.start_time
-                    processing_duration = str(duration)
+        for task in page.items:
+            progress = progress_by_task[task.id]
 
-                progress_percentage = 0
-                if progress.total_links > 0:
-                    progress_percentage = (progress.processed_links / progress.total_links) * 100
+            processing_duration = None
+            if progress.start_time:
+                end = progress.end_time or datetime.utcnow()
+                duration = end - progress.start_time
+                processing_duration = str(duration)
 
-                tasks_progress.append(TaskProgressResponse(
-                    task_id=task.id,
-                    url=task.url,
-                    status=task.status,
-                    total_links=progress.total_links,
-                    processed_links=progress.processed_links,
-                    scholarships_found=progress.scholarships_found,
-                    progress_percentage=progress_percentage,
-                    start_time=progress.start_time,
-                    end_time=progress.end_time,
-                    error_message=progress.error_message,
-                    processing_duration=processing_duration,
-                    success_count=task.success_count,
-                    fail_count=task.fail_count,
-                    created_at=task.created_at,
-                    last_run=task.last_run,
-                    next_run=task.next_run
-                ))
+            progress_percentage = 0
+            if progress.total_links > 0:
+                progress_percentage = (progress.processed_links / progress.total_links) * 100
 
-        processing_rate = calculate_processing_rate(db)
+            tasks_progress.append(TaskProgressResponse(
+                task_id=task.id,
+                url=task.url,
+                status=task.status,
+                total_links=progress.total_links,
+                processed_links=progress.processed_links,
+                scholarships_found=progress.scholarships_found,
+                progress_percentage=progress_percentage,
+                start_time=progress.start_time,
+                end_time=progress.end_time,
+                error_message=progress.error_message,
+                processing_duration=processing_duration,
+                success_count=task.success_count,
+                fail_count=task.fail_count,
+                created_at=task.created_at,
+                last_run=task.last_run,
+                next_run=task.next_run,
+                **llm_usage_fields(usage_by_task.get(task.id))
+            ))
+
+        processing_rate = await calculate_processing_rate(db)
 
         return DetailedTaskStatusResponse(
-            total_tasks=len(tasks),
-            pending=sum(1 for task in tasks if task.status == "pending"),
-            completed=sum(1 for task in tasks if task.status == "completed"),
-            in_progress=sum(1 for task in tasks if task.status == "in_progress"),
-            failed=sum(1 for task in tasks if task.status == "failed"),
-            total_scholarships=scholarship_stats.count,
-            average_confidence_score=float(scholarship_stats.avg_confidence or 0),
+            total_tasks=sum(tasks_by_status.values()),
+            pending=tasks_by_status.get("pending", 0),
+            completed=total_completed,
+            in_progress=tasks_by_status.get("in_progress", 0),
+            failed=tasks_by_status.get("failed", 0),
+            total_scholarships=total_scholarships,
+            average_confidence_score=average_confidence,
             last_update=datetime.utcnow(),
             tasks_progress=tasks_progress,
             processing_rate=processing_rate,
             success_rate=success_rate,
-            system_uptime=str(datetime.utcnow() - min(task.created_at for task in tasks) if tasks else timedelta())
+            system_uptime=str(datetime.utcnow() - first_created if first_created else timedelta()),
+            llm_cost=round(total_usage.llm_cost, 6),
+            llm_usage_by_domain=llm_usage_by_domain
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting status: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
     
-@router.get("/scholarships/{scholarship_id}", response_model=ScholarshipResponse)
-async def get_scholarship(scholarship_id: int, db: Session = Depends(get_db)):
-    """Get detailed information about a specific scholarship."""
+@router.get("/ai/metrics")
+async def get_ai_metrics():
+    """Get call counts, token usage, cost and latency per AI model tier."""
+    return {
+        "tiers": ai_metrics.snapshot(),
+        "circuit": get_openai_guard().snapshot(),
+        "timestamp": datetime.utcnow()
+    }
+
+@router.get("/scholarships", response_model=List[ScholarshipResponse])
+async def get_scholarships(
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor or X-Prev-Cursor of a previous page"),
+    skip: int = Query(0, ge=0, description="Deprecated offset paging; ignored when cursor is set"),
+    limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields; id is always included"),
+    filters: FilterParams = Depends(),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get scholarships with advanced filtering, newest first, paged by cursor.
+    Rows are encoded straight from the selected columns; response_model only
+    documents the shape.
+    """
     try:
-        scholarship = db.query(Scholarship)\
-            .filter(Scholarship.id == scholarship_id)\
-            .first()
+        try:
+            names = list_fields(fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-        if not scholarship:
-            raise HTTPException(status_code=404, detail="Scholarship not found")
+        query = list_query(names).filter(*scholarship_filter_conditions(filters))
+        page = await fetch_page(db, query, Scholarship.last_updated, Scholarship.id, limit, cursor, skip, scalars=False)
 
-        return ScholarshipResponse(
-            id=scholarship.id,
-            title=scholarship.title,
-            amount=scholarship.amount,
-            deadline=scholarship.deadline.isoformat() if scholarship.deadline else None,
-            field_of_study=scholarship.field_of_study,
-            level_of_study=scholarship.level_of_study,
-            eligibility_criteria=scholarship.eligibility_criteria,
-            application_url=scholarship.application_url,
-            source_url=scholarship.source_url,
-            confidence_score=scholarship.confidence_score,
-            ai_summary=scholarship.ai_summary,
-            last_updated=scholarship.last_updated.isoformat() if scholarship.last_updated else None,
-            task_id=scholarship.task_id
-        )
+        response = Response(content=encode_list(page.items, names), media_type="application/json")
+        set_cursor_headers(response, page)
+        return response
 
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error getting scholarship {scholarship_id}: {str(e)}")
+        logger.error(f"Error getting scholarships: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@router.get("/scholarships", response_model=List[ScholarshipResponse])
-async def get_scholarships(
+@router.get("/scholarships/search", response_model=List[ScholarshipSearchResult])
+async def search_scholarship_text(
+    q: str = Query(..., min_length=2, max_length=200),
     skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=1000),
+    limit: int = Query(20, ge=1, le=100),
     filters: FilterParams = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get scholarships with advanced filtering."""
+    """Full-text search over title, eligibility, field and level, best matches first."""
     try:
-        query = db.query(Scholarship)\
-            .filter(Scholarship.confidence_score >= filters.min_confidence)
-
-        if filters.field_of_study:
-            query = query.filter(Scholarship.field_of_study.ilike(f"%{filters.field_of_study}%"))
-        if filters.level_of_study:
-            query = query.filter(Scholarship.level_of_study == filters.level_of_study)
-        if filters.deadline_after:
-            query = query.filter(Scholarship.deadline >= filters.deadline_after)
-        if filters.source_url:
-            query = query.filter(Scholarship.source_url.ilike(f"%{filters.source_url}%"))
-
-        scholarships = query.order_by(desc(Scholarship.last_updated))\
-            .offset(skip)\
-            .limit(limit)\
-            .all()
-
-        # Convert datetime objects to strings before returning
+        results = await search_scholarships(db, q, scholarship_filter_conditions(filters), skip, limit)
         return [
-            ScholarshipResponse(
-                id=s.id,
-                title=s.title,
-                amount=s.amount,
-                deadline=s.deadline.isoformat() if s.deadline else None,
-                field_of_study=s.field_of_study,
-                level_of_study=s.level_of_study,
-                eligibility_criteria=s.eligibility_criteria,
-                application_url=s.application_url,
-                source_url=s.source_url,
-                confidence_score=s.confidence_score,
-                ai_summary=s.ai_summary,
-                last_updated=s.last_updated.isoformat() if s.last_updated else None,
-                task_id=s.task_id
-            ) 
-            for s in scholarships
+            ScholarshipSearchResult(
+                **scholarship_response_fields(s),
+                rank=rank,
+                title_highlight=title_highlight,
+                snippet=snippet
+            )
+            for s, rank, title_highlight, snippet in results
         ]
 
     except Exception as e:
-        logger.error(f"Error getting scholarships: {str(e)}")
+        logger.error(f"Error searching scholarships: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@router.get("/scholarships/stats", response_model=ScholarshipStats)
-async def get_scholarship_stats(db: Session = Depends(get_db)):
-    """Get comprehensive scholarship statistics."""
+@router.get("/scholarships/changes", response_model=ScholarshipChangesPage)
+async def get_scholarship_changes(
+    since: str = Query("0", description="next_cursor of a previous page; 0 replays every change"),
+    limit: int = Query(500, ge=1, le=5000),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Scholarship inserts, updates and deletes in commit order, for incremental
+    sync. Each change carries the scholarship's current row.
+    """
     try:
-        # Basic stats
-        stats = db.query(
-            func.count(Scholarship.id).label('count'),
-            func.avg(Scholarship.confidence_score).label('avg_confidence')
-        ).first()
-
-        # Field distribution
-        field_distribution = dict(
-            db.query(
-                Scholarship.field_of_study,
-                func.count(Scholarship.id)
-            ).group_by(Scholarship.field_of_study).all()
+        try:
+            position = int(since)
+            if position < 0:
+                raise ValueError(since)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid cursor: {since}")
+
+        changes, has_more = await read_changes(db, position, limit)
+        return ScholarshipChangesPage(
+            changes=[
+                ScholarshipChangeResponse(
+                    seq=change.seq,
+                    operation=change.operation,
+                    scholarship_id=change.scholarship_id,
+                    identity_key=change.identity_key,
+                    changed_at=change.changed_at,
+                    scholarship=ScholarshipResponse(**scholarship_response_fields(s)) if s else None
+                )
+                for change, s in changes
+            ],
+            next_cursor=str(changes[-1][0].seq if changes else position),
+            has_more=has_more
         )
 
-        # Level distribution
-        level_distribution = dict(
-            db.query(
-                Scholarship.level_of_study,
-                func.count(Scholarship.id)
-            ).group_by(Scholarship.level_of_study).all()
-        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error reading scholarship changes: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
 
-        # Daily counts for last 7 days
-        seven_days_ago = datetime.utcnow() - timedelta(days=7)
-        daily_counts = dict(
-            db.query(
-                func.date(Scholarship.last_updated),
-                func.count(Scholarship.id)
-            ).filter(Scholarship.last_updated >= seven_days_ago)
-            .group_by(func.date(Scholarship.last_updated))
-            .all()
-        )
+@router.get("/scholarships/stats", response_model=ScholarshipStats)
+async def get_scholarship_stats(db: AsyncSession = Depends(get_db)):
+    """Get comprehensive scholarship statistics."""
+    try:
+        # Counts come from the rollup table, so this stays cheap as the table grows
+        rollups = await read_rollups(db)
 
         # Recent additions
-        recent = db.query(Scholarship)\
-            .order_by(desc(Scholarship.last_updated))\
-            .limit(5)\
-            .all()
+        recent = (await db.execute(
+            select(Scholarship)
+            .order_by(desc(Scholarship.last_updated))
+            .limit(5)
+        )).scalars().all()
 
         return ScholarshipStats(
-            total_count=stats.count,
-            average_confidence=float(stats.avg_confidence or 0),
-            by_field_of_study=field_distribution,
-            by_level_of_study=level_distribution,
-            recent_additions=recent,
-            daily_counts={str(k): v for k, v in daily_counts.items()},
-            amount_ranges={},  # Implement amount range distribution
-            deadline_distribution={}  # Implement deadline distribution
+            **rollups,
+            recent_additions=[ScholarshipResponse(**scholarship_response_fields(s)) for s in recent]
         )
     except Exception as e:
         logger.error(f"Error getting scholarship stats: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@router.get("/scholarships/facets", response_model=ScholarshipFacets)
+async def get_scholarship_facets(
+    field_id: List[int] = Query([], description="Selected field vocabulary ids"),
+    level_id: List[int] = Query([], description="Selected level vocabulary ids"),
+    amount: List[str] = Query([], description="Selected amount buckets"),
+    deadline_month: List[str] = Query([], description="Selected deadline months (YYYY-MM or 'No deadline')"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Counts for every field, level, amount bucket and deadline month under the
+    selected values (repeat a parameter to select several), from the in-memory
+    facet index.
+    """
+    try:
+        await facet_index.refresh(db)
+        total, facets = facet_index.counts({
+            FIELD: [str(value) for value in field_id],
+            LEVEL: [str(value) for value in level_id],
+            AMOUNT: amount,
+            DEADLINE_MONTH: deadline_month,
+        })
+        return ScholarshipFacets(total=total, facets={
+            dimension: [FacetValueResponse(value=value, label=label, count=count) for value, label, count in values]
+            for dimension, values in facets.items()
+        })
+    except Exception as e:
+        logger.error(f"Error counting scholarship facets: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/scholarships/vocabulary", response_model=Dict[str, List[VocabularyTermResponse]])
+async def get_vocabulary():
+    """Canonical field and level of study terms; their ids are the field_id and level_id filters."""
+    return {
+        dimension: [VocabularyTermResponse(id=term_id, name=name) for term_id, name in terms(dimension)]
+        for dimension in (FIELD, LEVEL)
+    }
+
 @router.get("/tasks/{task_id}/progress", response_model=TaskProgressResponse)
-async def get_task_progress(task_id: int, db: Session = Depends(get_db)):
+async def get_task_progress(task_id: int, db: AsyncSession = Depends(get_db)):
     """Get detailed progress information for a specific task."""
     try:
-        task = db.query(ScrapingTask).filter(ScrapingTask.id == task_id).first()
+        task = await db.get(ScrapingTask, task_id)
         if not task:
             raise HTTPException(status_code=404, detail="Task not found")
 
-        progress = db.query(ScrapingProgress).filter(ScrapingProgress.task_id == task_id).first()
+        progress = (await db.execute(
+            select(ScrapingProgress).filter(ScrapingProgress.task_id == task_id).limit(1)
+        )).scalar()
         if not progress:
             raise HTTPException(status_code=404, detail="Progress data not found")
 
@@ -383,6 +660,8 @@ async def get_task_progress(task_id: int, db: Session = Depends(get_db)):
         if progress.total_links > 0:
             progress_percentage = (progress.processed_links / progress.total_links) * 100
 
+        usage = (await db.execute(select(*llm_usage_columns()).filter(LLMUsage.task_id == task_id))).first()
+
         return TaskProgressResponse(
             task_id=task.id,
             url=task.url,
@@ -399,7 +678,8 @@ async def get_task_progress(task_id: int, db: Session = Depends(get_db)):
             fail_count=task.fail_count,
             created_at=task.created_at,
             last_run=task.last_run,
-            next_run=task.next_run
+            next_run=task.next_run,
+            **llm_usage_fields(usage)
         )
     except HTTPException:
         raise
@@ -408,12 +688,12 @@ async def get_task_progress(task_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/tasks")
-async def add_task(data: UrlUpload, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+async def add_task(data: UrlUpload, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_db)):
     """Add a single URL for scraping."""
     try:
-        existing_task = db.query(ScrapingTask)\
-            .filter(ScrapingTask.url == data.url)\
-            .first()
+        existing_task = (await db.execute(
+            select(ScrapingTask).filter(ScrapingTask.url == data.url).limit(1)
+        )).scalar()
 
         if existing_task:
             if existing_task.status == "failed":
@@ -421,7 +701,7 @@ async def add_task(data: UrlUpload, background_tasks: BackgroundTasks, db: Sessi
                 existing_task.error_message = None
                 existing_task.next_run = datetime.utcnow()
                 existing_task.fail_count = 0
-                db.commit()
+                await db.commit()
                 return {"message": "Task reset for retry", "url": data.url}
             return {"message": "Task already exists", "url": data.url}
 
@@ -434,7 +714,7 @@ async def add_task(data: UrlUpload, background_tasks: BackgroundTasks, db: Sessi
             fail_count=0
         )
         db.add(task)
-        db.commit()
+        await db.commit()
 
         # Initialize progress tracking
         progress = ScrapingProgress(
@@ -445,7 +725,7 @@ async def add_task(data: UrlUpload, background_tasks: BackgroundTasks, db: Sessi
             scholarships_found=0
         )
         db.add(progress)
-        db.commit()
+        await db.commit()
 
         return {
             "message": "Task added successfully",
@@ -461,7 +741,7 @@ async def add_task(data: UrlUpload, background_tasks: BackgroundTasks, db: Sessi
 async def create_scraping_tasks(
     data: BulkUrlUpload,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Add multiple URLs for scraping with duplicate handling."""
     try:
@@ -474,9 +754,9 @@ async def create_scraping_tasks(
         }
 
         for url in data.urls:
-            existing_task = db.query(ScrapingTask)\
-                .filter(ScrapingTask.url == url)\
-                .first()
+            existing_task = (await db.execute(
+                select(ScrapingTask).filter(ScrapingTask.url == url).limit(1)
+            )).scalar()
 
             if existing_task:
                 if existing_task.status == "failed":
@@ -508,7 +788,7 @@ async def create_scraping_tasks(
                 fail_count=0
             )
             db.add(task)
-            db.flush()  # Get the task ID without committing
+            await db.flush()  # Get the task ID without committing
 
             # Initialize progress tracking
             progress = ScrapingProgress(
@@ -527,7 +807,7 @@ async def create_scraping_tasks(
                 "task_id": task.id
             })
 
-        db.commit()
+        await db.commit()
         return results
 
     except Exception as e:
@@ -535,19 +815,26 @@ async def create_scraping_tasks(
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.delete("/tasks/{task_id}")
-async def delete_task(task_id: int, db: Session = Depends(get_db)):
+async def delete_task(task_id: int, db: AsyncSession = Depends(get_db)):
     """Delete a specific scraping task and its related data."""
     try:
-        task = db.query(ScrapingTask).filter(ScrapingTask.id == task_id).first()
+        task = await db.get(ScrapingTask, task_id)
         if not task:
             raise HTTPException(status_code=404, detail="Task not found")
 
         # Delete related records
-        db.query(ScrapingProgress).filter(ScrapingProgress.task_id == task_id).delete()
-        db.query(ScrapedLink).filter(ScrapedLink.task_id == task_id).delete()
-        db.query(Scholarship).filter(Scholarship.task_id == task_id).delete()
-        db.delete(task)
-        db.commit()
+        await db.execute(delete(ScrapingProgress).filter(ScrapingProgress.task_id == task_id))
+        await db.execute(delete(ScrapedLink).filter(ScrapedLink.task_id == task_id))
+        await db.execute(delete(LLMUsage).filter(LLMUsage.task_id == task_id))
+        removed = await existing_rollup_rows(db, Scholarship.task_id == task_id)
+        await record_deletes(db, Scholarship.task_id == task_id)
+        await db.execute(delete(ScholarshipMinHashBand).filter(
+            ScholarshipMinHashBand.scholarship_id.in_(select(Scholarship.id).filter(Scholarship.task_id == task_id))
+        ))
+        await db.execute(delete(Scholarship).filter(Scholarship.task_id == task_id))
+        await apply_rollup_deltas(db, rollup_deltas(removed=removed))
+        await db.delete(task)
+        await db.commit()
 
         return {
             "message": "Task and related data deleted successfully",
@@ -561,16 +848,20 @@ async def delete_task(task_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.delete("/delete_all")
-async def delete_all_records(db: Session = Depends(get_db)):
+async def delete_all_records(db: AsyncSession = Depends(get_db)):
     """Delete all records in the database, including tasks and related data."""
     try:
         # Delete in order to respect foreign key constraints
-        db.query(ScrapingProgress).delete()
-        db.query(ScrapedLink).delete()
-        db.query(Scholarship).delete()
-        db.query(ScrapingTask).delete()
+        await db.execute(delete(ScrapingProgress))
+        await db.execute(delete(ScrapedLink))
+        await db.execute(delete(LLMUsage))
+        await record_deletes(db)
+        await db.execute(delete(ScholarshipMinHashBand))
+        await db.execute(delete(Scholarship))
+        await db.execute(delete(ScholarshipRollup))
+        await db.execute(delete(ScrapingTask))
         
-        db.commit()
+        await db.commit()
         return {
             "message": "All records deleted successfully",
             "timestamp": datetime.utcnow()
@@ -584,11 +875,11 @@ async def delete_all_records(db: Session = Depends(get_db)):
 async def retry_task(
     task_id: int,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Retry a failed task."""
     try:
-        task = db.query(ScrapingTask).filter(ScrapingTask.id == task_id).first()
+        task = await db.get(ScrapingTask, task_id)
         if not task:
             raise HTTPException(status_code=404, detail="Task not found")
 
@@ -609,7 +900,7 @@ async def retry_task(
             scholarships_found=0
         )
         db.add(progress)
-        db.commit()
+        await db.commit()
 
         return {
             "message": "Task scheduled for retry",
@@ -626,24 +917,23 @@ async def retry_task(
 
 @router.get("/tasks/failed", response_model=List[TaskProgressResponse])
 async def get_failed_tasks(
-    skip: int = Query(0, ge=0),
+    response: Response,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor or X-Prev-Cursor of a previous page"),
+    skip: int = Query(0, ge=0, description="Deprecated offset paging; ignored when cursor is set"),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get list of failed tasks with their error messages."""
+    """Get list of failed tasks with their error messages, most recently run first."""
     try:
-        tasks = db.query(ScrapingTask)\
-            .filter(ScrapingTask.status == "failed")\
-            .order_by(desc(ScrapingTask.last_run))\
-            .offset(skip)\
-            .limit(limit)\
-            .all()
+        query = select(ScrapingTask).filter(ScrapingTask.status == "failed")
+        page = await fetch_page(db, query, ScrapingTask.last_run, ScrapingTask.id, limit, cursor, skip)
+        set_cursor_headers(response, page)
+
+        progress_by_task = await latest_progress_by_task(db, [task.id for task in page.items])
 
         failed_tasks = []
-        for task in tasks:
-            progress = db.query(ScrapingProgress)\
-                .filter(ScrapingProgress.task_id == task.id)\
-                .first()
+        for task in page.items:
+            progress = progress_by_task.get(task.id)
 
             if progress:
                 processing_duration = None
@@ -672,6 +962,8 @@ async def get_failed_tasks(
 
         return failed_tasks
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting failed tasks: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -680,17 +972,17 @@ async def get_failed_tasks(
 async def search_tasks(
     query: str = Query(..., min_length=3),
     status: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Search tasks by URL and optionally filter by status."""
     try:
-        task_query = db.query(ScrapingTask)\
+        task_query = select(ScrapingTask)\
             .filter(ScrapingTask.url.ilike(f"%{query}%"))
 
         if status:
             task_query = task_query.filter(ScrapingTask.status == status)
 
-        tasks = task_query.all()
+        tasks = (await db.execute(task_query)).scalars().all()
         
         return {
             "query": query,
@@ -708,7 +1000,7 @@ async def search_tasks(
 async def upload_url_file(
     file: UploadFile = File(...),
     background_tasks: BackgroundTasks = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Upload a file containing URLs for scraping.
@@ -747,69 +1039,164 @@ async def upload_url_file(
 async def export_scholarships(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Export scholarships between dates."""
     try:
-        query = db.query(Scholarship)
+        query = select(Scholarship)
         
         if start_date:
             query = query.filter(Scholarship.created_at >= start_date)
         if end_date:
             query = query.filter(Scholarship.created_at <= end_date)
             
-        scholarships = query.order_by(desc(Scholarship.created_at)).all()
+        scholarships = (await db.execute(query.order_by(desc(Scholarship.created_at)))).scalars().all()
         return scholarships
     except Exception as e:
         logger.error(f"Error exporting scholarships: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+def export_response(chunks, request: Request, media_type: str, filename: str) -> StreamingResponse:
+    """Stream export chunks, gzip-encoded when the client accepts it."""
+    gzip = accepts_gzip(request.headers.get("accept-encoding"))
+    headers = {"Content-Disposition": f"attachment; filename={filename}", "Vary": "Accept-Encoding"}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(encode_chunks(chunks, gzip=gzip), media_type=media_type, headers=headers)
+
 @router.get("/scholarships/export/csv")
 async def export_scholarships_csv(
+    request: Request,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+):
+    """Export scholarships as CSV, streamed in batches from a server-side cursor."""
+    try:
+        batches = stream_batches(AsyncSessionLocal, export_query(start_date, end_date), settings.EXPORT_BATCH_SIZE)
+        return export_response(csv_chunks(batches), request, "text/csv", "scholarships_export.csv")
+    except Exception as e:
+        logger.error(f"Error exporting scholarships to CSV: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/scholarships/export/ndjson")
+async def export_scholarships_ndjson(
+    request: Request,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+):
+    """Export scholarships as newline-delimited JSON, streamed like the CSV export."""
+    try:
+        batches = stream_batches(AsyncSessionLocal, export_query(start_date, end_date), settings.EXPORT_BATCH_SIZE)
+        return export_response(ndjson_chunks(batches), request, "application/x-ndjson", "scholarships_export.ndjson")
+    except Exception as e:
+        logger.error(f"Error exporting scholarships to NDJSON: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+def columnar_export(
+    start_date: Optional[datetime],
+    end_date: Optional[datetime],
+    columns: Optional[str],
+    media_type: str,
+    filename: str,
+    write
+) -> StreamingResponse:
+    if not columnar_available():
+        raise HTTPException(status_code=501, detail="Columnar exports require pyarrow")
+    try:
+        names = columnar_columns([name.strip() for name in columns.split(",") if name.strip()] if columns else None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    query = export_query(start_date, end_date, [getattr(Scholarship, name) for name in names])
+    batches = stream_batches(AsyncSessionLocal, query, settings.EXPORT_BATCH_SIZE)
+    return StreamingResponse(
+        write(batches, names),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+@router.get("/scholarships/export/parquet")
+async def export_scholarships_parquet(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    db: Session = Depends(get_db)
+    columns: Optional[str] = Query(None, description="Comma-separated column names; all columns when omitted")
 ):
-    """Export scholarships as CSV."""
-    from fastapi.responses import StreamingResponse
-    import csv
-    import io
-    
+    """Export scholarships as a typed Parquet file, written one row group at a time."""
     try:
-        scholarships = await export_scholarships(start_date, end_date, db)
-        
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Write headers
-        writer.writerow([
-            "Title", "Amount", "Deadline", "Field of Study", 
-            "Level of Study", "Eligibility Criteria", "Application URL",
-            "Source URL", "Confidence Score", "Last Updated"
-        ])
-        
-        # Write data
-        for scholarship in scholarships:
-            writer.writerow([
-                scholarship.title,
-                scholarship.amount,
-                scholarship.deadline.isoformat() if scholarship.deadline else "",
-                scholarship.field_of_study,
-                scholarship.level_of_study,
-                scholarship.eligibility_criteria,
-                scholarship.application_url,
-                scholarship.source_url,
-                scholarship.confidence_score,
-                scholarship.last_updated.isoformat()
-            ])
-            
-        output.seek(0)
-        return StreamingResponse(
-            iter([output.getvalue()]),
-            media_type="text/csv",
-            headers={"Content-Disposition": f"attachment; filename=scholarships_export.csv"}
+        return columnar_export(
+            start_date, end_date, columns, "application/vnd.apache.parquet", "scholarships_export.parquet",
+            lambda batches, names: parquet_chunks(batches, names, settings.EXPORT_PARQUET_ROW_GROUP_SIZE)
         )
-        
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error exporting scholarships to CSV: {str(e)}")
-        raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
+        logger.error(f"Error exporting scholarships to Parquet: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/scholarships/export/arrow")
+async def export_scholarships_arrow(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    columns: Optional[str] = Query(None, description="Comma-separated column names; all columns when omitted")
+):
+    """Export scholarships as an Arrow IPC stream, one record batch per fetched batch."""
+    try:
+        return columnar_export(
+            start_date, end_date, columns, "application/vnd.apache.arrow.stream", "scholarships_export.arrows",
+            arrow_stream_chunks
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error exporting scholarships to Arrow: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+# Declared last so /scholarships/search, /changes, /stats, /facets, /vocabulary and /export are not captured as an id
+@router.get("/scholarships/{scholarship_id}", response_model=ScholarshipResponse)
+async def get_scholarship(scholarship_id: int, db: AsyncSession = Depends(get_db)):
+    """Get detailed information about a specific scholarship."""
+    try:
+        scholarship = await db.get(Scholarship, scholarship_id)
+
+        if not scholarship:
+            raise HTTPException(status_code=404, detail="Scholarship not found")
+
+        return ScholarshipResponse(**scholarship_response_fields(scholarship))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting scholarship {scholarship_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/scholarships/{scholarship_id}/similar", response_model=List[SimilarScholarshipResponse])
+async def get_similar_scholarships(
+    scholarship_id: int,
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_db)
+):
+    """Scholarships whose title, eligibility, field and level read most like this one's, best first."""
+    if similarity_index is None:
+        raise HTTPException(status_code=501, detail="Similar scholarships require numpy")
+    try:
+        if not await db.get(Scholarship, scholarship_id):
+            raise HTTPException(status_code=404, detail="Scholarship not found")
+
+        await similarity_index.refresh(db)
+        # Scoring multiplies the whole matrix; numpy releases the GIL, so a thread keeps the loop free
+        matches = await asyncio.to_thread(similarity_index.similar, scholarship_id, limit)
+        rows = {
+            s.id: s for s in (await db.execute(
+                select(Scholarship).filter(Scholarship.id.in_([id for id, _ in matches]))
+            )).scalars()
+        }
+        # The index can trail the table by one refresh; skip rows deleted since
+        return [
+            SimilarScholarshipResponse(**scholarship_response_fields(rows[id]), score=score)
+            for id, score in matches if id in rows
+        ]
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error finding scholarships similar to {scholarship_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
@@ -0,0 +1,159 @@
+# app/core/cache.py
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import hashlib
+import json
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+CACHE_STATUS_HEADER = "X-Cache"
+
+
+class DataVersion:
+    """
+    Counter bumped after every committed write in this process. Cached
+    responses remember the version they were built at and are discarded as
+    soon as it moves, so they are never older than the last committed batch.
+    """
+
+    def __init__(self):
+        self.value = 0
+
+    def bump(self):
+        self.value += 1
+
+
+data_version = DataVersion()
+
+
+def track_writes(engine: Engine, version: DataVersion = data_version):
+    """Bump `version` whenever a transaction on `engine` commits; read-only sessions roll back and do not."""
+    @event.listens_for(engine, "commit")
+    def _bump(conn):
+        version.bump()
+
+
+@dataclass
+class CachedResponse:
+    version: int
+    expires: float
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+    etag: bytes
+
+
+def _without_fields(value: Any, fields: frozenset) -> Any:
+    if isinstance(value, dict):
+        return {key: _without_fields(item, fields) for key, item in value.items() if key not in fields}
+    if isinstance(value, list):
+        return [_without_fields(item, fields) for item in value]
+    return value
+
+
+def strong_etag(body: bytes, volatile_fields: Iterable[str] = ()) -> bytes:
+    """
+    ETag of a response body. For a JSON body, `volatile_fields` are dropped at
+    any depth before hashing, so values derived from the clock (a generation
+    timestamp, an uptime) do not make every render look changed.
+    """
+    fields = frozenset(volatile_fields)
+    if fields:
+        try:
+            body = json.dumps(_without_fields(json.loads(body), fields), sort_keys=True, separators=(",", ":")).encode()
+        except ValueError:  # Not JSON; hash it as sent
+            pass
+    return b'"' + hashlib.sha256(body).hexdigest()[:32].encode() + b'"'
+
+
+def etag_matches(if_none_match: Optional[bytes], etag: bytes) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(b',')]
+    # If-None-Match uses the weak comparison, so W/"x" matches "x"
+    return b'*' in candidates or any(tag.removeprefix(b'W/') == etag for tag in candidates)
+
+
+class ResponseCacheMiddleware:
+    """
+    Caches 200 responses to GET requests for the paths in `ttls`, tags them
+    with a strong ETag and answers matching If-None-Match with 304.
+
+    An entry is served until its TTL runs out or `version` moves. The TTL only
+    matters for writes made outside this process (other API workers, scripts),
+    which do not bump the in-process version. Fields listed for a path in
+    `volatile_fields` are left out of its ETag, so a body that only differs in
+    them still revalidates with 304 after the TTL. Add this middleware before
+    CORSMiddleware so CORS headers are applied per request, not cached.
+    """
+
+    def __init__(self, app, ttls: Dict[str, float], max_entries: int = 256, version: DataVersion = data_version,
+                 volatile_fields: Optional[Dict[str, List[str]]] = None):
+        self.app = app
+        self.ttls = ttls
+        self.volatile_fields = volatile_fields or {}
+        self.max_entries = max_entries
+        self.version = version
+        self._entries: "OrderedDict[Tuple[str, bytes], CachedResponse]" = OrderedDict()
+
+    async def __call__(self, scope, receive, send):
+        ttl = self.ttls.get(scope.get("path")) if scope["type"] == "http" else None
+        if ttl is None or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        key = (scope["path"], scope.get("query_string", b""))
+        if_none_match = dict(scope["headers"]).get(b"if-none-match")
+        entry = self._entries.get(key)
+        if entry and entry.version == self.version.value and entry.expires > time.monotonic():
+            self._entries.move_to_end(key)
+            await self._send(send, entry, if_none_match, b"HIT")
+            return
+
+        version = self.version.value
+        start = {}
+        chunks = []
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        # An exception from the app propagates from here untouched; nothing has been sent on yet
+        await self.app(scope, receive, capture)
+        if "status" not in start:  # The app returned without starting a response
+            return
+
+        body = b"".join(chunks)
+        if start["status"] != 200:
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+            return
+        headers = [(name, value) for name, value in start.get("headers", []) if name.lower() != b"content-length"]
+        etag = strong_etag(body, self.volatile_fields.get(scope["path"], ()))
+        entry = CachedResponse(version, time.monotonic() + ttl, start["status"], headers, body, etag)
+        self._store(key, entry)
+        await self._send(send, entry, if_none_match, b"MISS")
+
+    def _store(self, key, entry: CachedResponse):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _send(self, send, entry: CachedResponse, if_none_match: Optional[bytes], cache_status: bytes):
+        headers = entry.headers + [
+            (b"etag", entry.etag),
+            (b"cache-control", b"no-cache"),  # Let browsers keep it, but revalidate every poll
+            (CACHE_STATUS_HEADER.lower().encode(), cache_status),
+        ]
+        if etag_matches(if_none_match, entry.etag):
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        headers.append((b"content-length", str(len(entry.body)).encode()))
+        await send({"type": "http.response.start", "status": entry.status, "headers": headers})
+        await send({"type": "http.response.body", "body": entry.body})
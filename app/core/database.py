@@ -1,15 +1,23 @@
 # app/core/database.py
-from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.orm import sessionmaker
+from .cache import track_writes
 from .config import get_settings
+from .storage import build_async_engine, build_engine
 
 settings = get_settings()
-engine = create_engine(settings.DATABASE_URL)
+
+# Sync engine for Alembic, maintenance commands and scripts
+engine = build_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-def get_db():
-    db = SessionLocal()
-    try:
+async_engine = build_async_engine(settings.DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Committed writes invalidate cached API responses
+track_writes(engine)
+track_writes(async_engine.sync_engine)
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
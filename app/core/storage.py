@@ -0,0 +1,156 @@
+# app/core/storage.py
+from typing import Any, Dict
+import logging
+from sqlalchemy import create_engine, event, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool, StaticPool
+from .config import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+# Async drivers used by the API and the worker for each configured backend
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+}
+
+
+def backend_name(url: str) -> str:
+    return make_url(url).get_backend_name()
+
+
+def is_memory_sqlite(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == 'sqlite' and parsed.database in (None, '', ':memory:')
+
+
+def to_async_url(url: str) -> str:
+    """Swap the driver of a sync database URL for its asyncio counterpart."""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None or parsed.drivername == driver:
+        return url
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def to_sync_url(url: str) -> str:
+    """Drop an async driver so Alembic and scripts can connect with the default sync one."""
+    parsed = make_url(url)
+    if parsed.drivername in ASYNC_DRIVERS.values():
+        return parsed.set(drivername=parsed.get_backend_name()).render_as_string(hide_password=False)
+    return url
+
+
+def upsert_insert(dialect_name: str, table):
+    """INSERT construct supporting on_conflict_do_update for the given dialect."""
+    if dialect_name == 'postgresql':
+        return postgresql.insert(table)
+    if dialect_name == 'sqlite':
+        return sqlite.insert(table)
+    raise NotImplementedError(f"Upserts are not supported on {dialect_name}")
+
+
+def elapsed_seconds(dialect_name: str, start, end):
+    """SQL expression for the seconds between two DateTime columns."""
+    if dialect_name == 'postgresql':
+        return func.extract('epoch', end - start)
+    if dialect_name == 'sqlite':
+        return (func.julianday(end) - func.julianday(start)) * 86400.0
+    raise NotImplementedError(f"Durations are not supported on {dialect_name}")
+
+
+def sqlite_pragmas(settings: Settings) -> Dict[str, Any]:
+    """Per-connection pragmas applied to every new SQLite connection, in order."""
+    return {
+        'busy_timeout': settings.SQLITE_BUSY_TIMEOUT_MS,
+        'synchronous': settings.SQLITE_SYNCHRONOUS,
+        'mmap_size': settings.SQLITE_MMAP_SIZE,
+        'cache_size': -settings.SQLITE_CACHE_SIZE_KB,  # Negative values are KiB, not pages
+    }
+
+
+def set_journal_mode(cursor, journal_mode: str):
+    """
+    Switch the database file's journal mode if it differs. The mode is stored in
+    the file, so this normally only does work on the first connection; switching
+    needs an exclusive lock, and failing to get one must not fail the connection.
+    """
+    cursor.execute("PRAGMA journal_mode")
+    current = cursor.fetchone()[0]
+    if current.lower() == journal_mode.lower():
+        return
+    try:
+        cursor.execute(f"PRAGMA journal_mode={journal_mode}")
+    except Exception as e:
+        logger.warning(f"Could not switch SQLite journal mode from {current} to {journal_mode}: {str(e)}")
+
+
+def install_sqlite_pragmas(engine: Engine, settings: Settings):
+    """Apply the SQLite pragmas whenever the pool opens a connection."""
+    pragmas = sqlite_pragmas(settings)
+    # In-memory databases cannot use WAL
+    journal_mode = None if is_memory_sqlite(str(engine.url)) else settings.SQLITE_JOURNAL_MODE
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            if journal_mode:
+                set_journal_mode(cursor, journal_mode)
+        finally:
+            cursor.close()
+
+
+def engine_options(url: str, settings: Settings, is_async: bool = False, pooled: bool = True) -> Dict[str, Any]:
+    """Pool and driver options for the configured backend."""
+    if backend_name(url) == 'sqlite':
+        if is_memory_sqlite(url):
+            # One shared connection, otherwise every session sees an empty database
+            return {'poolclass': StaticPool, 'connect_args': {'check_same_thread': False}}
+        options = {'connect_args': {'timeout': settings.SQLITE_BUSY_TIMEOUT_MS / 1000}}
+        if not is_async:
+            options['connect_args']['check_same_thread'] = False
+        if not pooled:
+            return {**options, 'poolclass': NullPool}
+        return {
+            **options,
+            # aiosqlite defaults to NullPool, i.e. a new connection thread per session
+            'poolclass': AsyncAdaptedQueuePool if is_async else QueuePool,
+            'pool_size': settings.DB_POOL_SIZE,
+            'max_overflow': settings.DB_MAX_OVERFLOW,
+            'pool_timeout': settings.DB_POOL_TIMEOUT,
+        }
+
+    if not pooled:
+        return {'poolclass': NullPool}
+    return {
+        'pool_size': settings.DB_POOL_SIZE,
+        'max_overflow': settings.DB_MAX_OVERFLOW,
+        'pool_timeout': settings.DB_POOL_TIMEOUT,
+        'pool_recycle': settings.DB_POOL_RECYCLE,
+        'pool_pre_ping': True,  # Drop connections closed by the server or a proxy
+    }
+
+
+def build_engine(url: str = None, pooled: bool = True) -> Engine:
+    """Sync engine with the storage profile applied; used by Alembic and scripts."""
+    settings = get_settings()
+    url = to_sync_url(url or settings.DATABASE_URL)
+    engine = create_engine(url, **engine_options(url, settings, pooled=pooled))
+    if backend_name(url) == 'sqlite':
+        install_sqlite_pragmas(engine, settings)
+    return engine
+
+
+def build_async_engine(url: str = None) -> AsyncEngine:
+    """Async engine with the storage profile applied; used by the API and the worker."""
+    settings = get_settings()
+    url = to_async_url(url or settings.DATABASE_URL)
+    engine = create_async_engine(url, **engine_options(url, settings, is_async=True))
+    if backend_name(url) == 'sqlite':
+        install_sqlite_pragmas(engine.sync_engine, settings)
+    return engine
@@ -0,0 +1,68 @@
+# app/models/extraction.py
+from typing import Any, List, Optional
+from pydantic import BaseModel, Field, validator
+
+
+class AmountAnalysis(BaseModel):
+    type: str = "unknown"  # fixed, range, unknown
+    value: Optional[str] = None
+    is_renewable: bool = False
+    conditions: List[str] = []
+
+    @validator('value', pre=True)
+    def coerce_value(cls, v):
+        if v is None or isinstance(v, str):
+            return v
+        return str(v)
+
+    @validator('conditions', pre=True)
+    def coerce_conditions(cls, v):
+        if v is None:
+            return []
+        if isinstance(v, str):
+            return [v]
+        return [str(item) for item in v]
+
+
+class DeadlineInfo(BaseModel):
+    date: Optional[str] = None  # YYYY-MM-DD
+    is_recurring: bool = False
+
+    @validator('date', pre=True)
+    def coerce_date(cls, v):
+        if v in (None, "", "null"):
+            return None
+        return str(v)
+
+
+class ScholarshipAnalysis(BaseModel):
+    """Schema of the analysis the extraction prompt asks the model to return."""
+    amount_analysis: AmountAnalysis
+    eligibility_requirements: List[str] = []
+    deadline_info: DeadlineInfo
+    field_of_study: str
+    level_of_study: str
+    confidence_score: float = Field(..., ge=0.0, le=1.0)
+
+    @validator('eligibility_requirements', pre=True)
+    def coerce_requirements(cls, v):
+        if v is None:
+            return []
+        if isinstance(v, str):
+            return [v]
+        return [str(item) for item in v]
+
+    @validator('confidence_score', pre=True)
+    def scale_confidence(cls, v: Any):
+        # Models occasionally answer on a 0-100 scale
+        if isinstance(v, (int, float)) and 1.0 < v <= 100.0:
+            return v / 100.0
+        return v
+
+
+class PackedScholarshipAnalysis(ScholarshipAnalysis):
+    id: str
+
+    @validator('id', pre=True)
+    def coerce_id(cls, v):
+        return str(v)
@@ -1,13 +1,19 @@
 from datetime import datetime
 from typing import Optional, List
-from sqlalchemy import Column, Integer, String, DateTime, Float, Text, Enum, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Float, Text, Enum, Boolean, ForeignKey, UniqueConstraint, Index, DDL, event, JSON, Computed, LargeBinary
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
+from app.utils.vocabulary import TERMS
 
 Base = declarative_base()
 
 class ScrapingTask(Base):
     __tablename__ = "scraping_tasks"
+    __table_args__ = (
+        Index("ix_scraping_tasks_status_last_run_id", "status", "last_run", "id"),
+        Index("ix_scraping_tasks_last_run_id", "last_run", "id"),
+    )
 
     id = Column(Integer, primary_key=True)
     url = Column(String(500), nullable=False, index=True)
@@ -24,6 +30,7 @@ class ScrapingTask(Base):
     scraped_links = relationship("ScrapedLink", back_populates="task", cascade="all, delete-orphan")
     progress = relationship("ScrapingProgress", back_populates="task", uselist=False, cascade="all, delete-orphan")
     scholarships = relationship("Scholarship", back_populates="task", cascade="all, delete-orphan")
+    llm_usage = relationship("LLMUsage", back_populates="task", cascade="all, delete-orphan")
 
 class ScrapedLink(Base):
     __tablename__ = "scraped_links"
@@ -59,30 +66,158 @@ class ScrapingProgress(Base):
 
 class Scholarship(Base):
     __tablename__ = "scholarships"
+    __table_args__ = (
+        Index("ix_scholarships_last_updated_id", "last_updated", "id"),
+        Index("ix_scholarships_created_at_id", "created_at", "id"),
+        Index("ix_scholarships_cluster_id_id", "cluster_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True)
     task_id = Column(Integer, ForeignKey("scraping_tasks.id", ondelete="CASCADE"), nullable=False, index=True)
+    # sha256 of normalized title, application URL and source domain; re-crawls upsert on it
+    identity_key = Column(String(64), nullable=False, unique=True, index=True)
     title = Column(String(500), index=True)
     amount = Column(String(100))
-    deadline = Column(DateTime, nullable=True, index=True)
+    deadline = Column(DateTime, nullable=True, index=True)  # Next occurrence for recurring deadlines
+    deadline_kind = Column(String(16), nullable=True, index=True)  # date, recurring, rolling, unknown
     field_of_study = Column(String(200), index=True)
     level_of_study = Column(String(100), index=True)
+    # Canonical vocabulary terms for the free-form field and level above
+    field_id = Column(Integer, ForeignKey("vocabulary_terms.id"), nullable=True, index=True)
+    level_id = Column(Integer, ForeignKey("vocabulary_terms.id"), nullable=True, index=True)
     eligibility_criteria = Column(Text)
     application_url = Column(String(500))
     source_url = Column(String(500), index=True)
     location_of_study = Column(String(200))
     
     # AI processing fields
-    ai_summary = Column(Text, nullable=True)
+    ai_summary = Column(JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), 'postgresql'), nullable=True)
+    # Generated from ai_summary (virtual on SQLite, stored on Postgres) so these filters use an index
+    ai_is_recurring = Column(Boolean, Computed(ai_summary[('deadline_info', 'is_recurring')].as_boolean()), index=True)
+    ai_is_renewable = Column(Boolean, Computed(ai_summary[('amount_analysis', 'is_renewable')].as_boolean()), index=True)
     confidence_score = Column(Float, nullable=True, index=True)
+    model_tier = Column(String(100), nullable=True)  # Model that produced the accepted extraction
     last_updated = Column(DateTime, default=lambda: datetime.utcnow(), onupdate=lambda: datetime.utcnow())
     
     # Additional fields for better tracking
-    amount_normalized_min = Column(Float, nullable=True)
-    amount_normalized_max = Column(Float, nullable=True)
+    amount_normalized_min = Column(Float, nullable=True, index=True)
+    amount_normalized_max = Column(Float, nullable=True, index=True)
     amount_type = Column(String(50), nullable=True)  # fixed, range, unknown
     is_renewable = Column(Boolean, default=False)
     created_at = Column(DateTime, default=lambda: datetime.utcnow())
 
+    # Near-duplicate detection over title and eligibility (app.utils.minhash)
+    minhash = Column(LargeBinary, nullable=True)
+    cluster_id = Column(Integer, nullable=True)  # Lowest id in the duplicate cluster; NULL when unique
+
+    # Relationship
+    task = relationship("ScrapingTask", back_populates="scholarships")
+
+# Canonical field and level of study names, seeded from app.utils.vocabulary.TERMS.
+# Ids are fixed in code so the save-time mapper never has to look them up.
+class VocabularyTerm(Base):
+    __tablename__ = "vocabulary_terms"
+    __table_args__ = (UniqueConstraint("dimension", "name", name="uq_vocabulary_terms_dimension_name"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    dimension = Column(String(16), nullable=False)  # field, level
+    name = Column(String(100), nullable=False)
+
+# MinHash LSH band keys: scholarships sharing a (band, bucket) are duplicate candidates.
+class ScholarshipMinHashBand(Base):
+    __tablename__ = "scholarship_minhash_bands"
+    __table_args__ = (Index("ix_scholarship_minhash_bands_band_bucket", "band", "bucket"),)
+
+    scholarship_id = Column(Integer, ForeignKey("scholarships.id", ondelete="CASCADE"), primary_key=True)
+    band = Column(Integer, primary_key=True)
+    bucket = Column(BigInteger, nullable=False)
+
+# Running counts behind /scholarships/stats, adjusted in the same transaction as
+# every scholarship write so the endpoint never scans the scholarships table.
+class ScholarshipRollup(Base):
+    __tablename__ = "scholarship_rollups"
+
+    dimension = Column(String(32), primary_key=True)  # total, field, level, amount, deadline_month, day
+    bucket = Column(String(200), primary_key=True)
+    row_count = Column(Integer, nullable=False, default=0)
+    confidence_sum = Column(Float, nullable=False, default=0.0)
+    confidence_count = Column(Integer, nullable=False, default=0)  # Rows with a confidence score
+
+# Append-only log of scholarship inserts, updates and deletes for the changes feed.
+# seq is assigned in commit order; rows outlive the scholarships they describe.
+class ScholarshipChange(Base):
+    __tablename__ = "scholarship_changes"
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    scholarship_id = Column(Integer, nullable=False, index=True)
+    identity_key = Column(String(64), nullable=False)
+    operation = Column(String(10), nullable=False)  # insert, update, delete
+    changed_at = Column(DateTime, default=lambda: datetime.utcnow())
+
+class LLMUsage(Base):
+    __tablename__ = "llm_usage"
+    __table_args__ = (UniqueConstraint("task_id", "model", "operation", name="uq_llm_usage_task_model_operation"),)
+
+    id = Column(Integer, primary_key=True)
+    task_id = Column(Integer, ForeignKey("scraping_tasks.id", ondelete="CASCADE"), nullable=False, index=True)
+    domain = Column(String(255), nullable=False, index=True)
+    model = Column(String(100), nullable=False)
+    operation = Column(String(50), nullable=False)  # classify, extract
+    calls = Column(Integer, default=0)
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    cost = Column(Float, default=0.0)  # Estimated USD
+    total_latency = Column(Float, default=0.0)  # Seconds
+    last_update = Column(DateTime, default=lambda: datetime.utcnow(), onupdate=lambda: datetime.utcnow())
+
     # Relationship
-    task = relationship("ScrapingTask", back_populates="scholarships")
\ No newline at end of file
+    task = relationship("ScrapingTask", back_populates="llm_usage")
+
+
+# Full-text index over title, eligibility, field and level. SQLite keeps an FTS5
+# external-content table in sync with triggers; Postgres uses a generated tsvector
+# column with a GIN index. Migrations create the same objects for existing databases.
+SCHOLARSHIP_SEARCH_DDL = {
+    'sqlite': [
+        """CREATE VIRTUAL TABLE scholarships_fts USING fts5(
+            title, eligibility_criteria, field_of_study, level_of_study,
+            content='scholarships', content_rowid='id',
+            tokenize='porter unicode61 remove_diacritics 2'
+        )""",
+        """CREATE TRIGGER scholarships_fts_ai AFTER INSERT ON scholarships BEGIN
+            INSERT INTO scholarships_fts(rowid, title, eligibility_criteria, field_of_study, level_of_study)
+            VALUES (new.id, new.title, new.eligibility_criteria, new.field_of_study, new.level_of_study);
+        END""",
+        """CREATE TRIGGER scholarships_fts_ad AFTER DELETE ON scholarships BEGIN
+            INSERT INTO scholarships_fts(scholarships_fts, rowid, title, eligibility_criteria, field_of_study, level_of_study)
+            VALUES ('delete', old.id, old.title, old.eligibility_criteria, old.field_of_study, old.level_of_study);
+        END""",
+        """CREATE TRIGGER scholarships_fts_au AFTER UPDATE OF title, eligibility_criteria, field_of_study, level_of_study
+        ON scholarships BEGIN
+            INSERT INTO scholarships_fts(scholarships_fts, rowid, title, eligibility_criteria, field_of_study, level_of_study)
+            VALUES ('delete', old.id, old.title, old.eligibility_criteria, old.field_of_study, old.level_of_study);
+            INSERT INTO scholarships_fts(rowid, title, eligibility_criteria, field_of_study, level_of_study)
+            VALUES (new.id, new.title, new.eligibility_criteria, new.field_of_study, new.level_of_study);
+        END""",
+    ],
+    'postgresql': [
+        """ALTER TABLE scholarships ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(field_of_study, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(level_of_study, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(eligibility_criteria, '')), 'C')
+        ) STORED""",
+        "CREATE INDEX ix_scholarships_search_vector ON scholarships USING GIN (search_vector)",
+    ],
+}
+
+for _dialect, _statements in SCHOLARSHIP_SEARCH_DDL.items():
+    for _statement in _statements:
+        event.listen(Scholarship.__table__, 'after_create', DDL(_statement).execute_if(dialect=_dialect))
+event.listen(Scholarship.__table__, 'before_drop', DDL("DROP TABLE IF EXISTS scholarships_fts").execute_if(dialect='sqlite'))
+
+@event.listens_for(VocabularyTerm.__table__, 'after_create')
+def _seed_vocabulary(target, connection, **kw):
+    connection.execute(target.insert(), [
+        {'id': term_id, 'dimension': dimension, 'name': name} for term_id, dimension, name in TERMS
+    ])
@@ -1,85 +1,101 @@
 import asyncio
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 import logging
 from typing import List, Any, Dict, Optional
-from app.models.schemas import ScrapingTask, Scholarship, ScrapedLink, ScrapingProgress
+from app.models.schemas import ScrapingTask, ScrapingProgress, LLMUsage
 from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
 from app.scraper.parser import DynamicParser
 from app.services.ai import ScholarshipAIProcessor, LinkClassifier
+from app.services.resilience import AIUnavailableError, get_openai_guard
+from app.services.usage import usage_tracker
+from app.scraper.write_buffer import WriteBehindBuffer
+from app.utils.amounts import amount_columns, parse_amount
+from app.utils.deadlines import Deadline, deadline_columns, mark_recurring, normalize_deadline, normalize_deadlines
+from app.utils.identity import scholarship_identity_key
+from app.utils.vocabulary import vocabulary_columns
 from app.core.logging_config import setup_logging
 from playwright.async_api import async_playwright, TimeoutError
 import urllib.parse
 import json
+from collections import deque
 
 logger = setup_logging()
 
+def deadline_text(data: Dict[str, Any]) -> Optional[str]:
+    """The AI's deadline date for a processed scholarship, else the deadline text scraped with it."""
+    deadline_info = data.get('deadline_info')
+    if isinstance(deadline_info, dict) and deadline_info.get('date'):
+        return str(deadline_info['date'])
+    return data['deadline'] if isinstance(data.get('deadline'), str) else None
+
 class ScholarshipScraper:
-    def __init__(self, db: Session):
-        self.db = db
+    def __init__(self, session_factory: async_sessionmaker = AsyncSessionLocal):
+        self.session_factory = session_factory
         self.parser = DynamicParser()
         self.ai_processor = ScholarshipAIProcessor()
         self.link_classifier = LinkClassifier()
         self.settings = get_settings()
+        self.buffer = WriteBehindBuffer(
+            session_factory,
+            max_items=self.settings.WRITE_BUFFER_MAX_ITEMS,
+            max_interval=self.settings.WRITE_BUFFER_FLUSH_INTERVAL,
+            duplicate_threshold=self.settings.DUPLICATE_SIMILARITY_THRESHOLD
+        )
+        self.buffer.add_flush_hook(self.stage_llm_usage)
+        self.progress_ids: Dict[int, int] = {}  # task_id -> id of the progress record being updated
         logger.info("ScholarshipScraper initialized")
 
-    def parse_date(self, date_str: Optional[str]) -> Optional[datetime]:
-        """Parse date string into datetime object."""
-        if not date_str:
-            return None
-        try:
-            formats = [
-                '%Y-%m-%d',
-                '%d-%m-%Y',
-                '%m/%d/%Y',
-                '%Y/%m/%d',
-                '%b %d, %Y',
-                '%B %d, %Y',
-                '%Y-%m-%dT%H:%M:%S'
-            ]
-            
-            for fmt in formats:
-                try:
-                    return datetime.strptime(date_str, fmt)
-                except ValueError:
-                    continue
-            
-            return None
-        except Exception as e:
-            logger.error(f"Error parsing date '{date_str}': {str(e)}")
-            return None
-
     def prepare_scholarship_data(self, data: Dict[str, Any], task_id: int, source_url: str) -> Dict[str, Any]:
         """Prepare scholarship data with proper type conversions."""
         try:
-            # Handle deadline
-            deadline_date = None
-            if isinstance(data.get('deadline_info'), dict):
-                deadline_date = self.parse_date(data['deadline_info'].get('date'))
-            elif isinstance(data.get('deadline'), str):
-                deadline_date = self.parse_date(data['deadline'])
+            # Handle deadline; process_text_blocks normalizes a whole chunk's at once
+            deadline = data.get('deadline_normalized')
+            if not isinstance(deadline, Deadline):
+                deadline = normalize_deadline(deadline_text(data))
+            deadline_info = data.get('deadline_info')
+            if isinstance(deadline_info, dict):
+                deadline = mark_recurring(deadline, deadline_info.get('is_recurring'))
 
-            # Ensure AI summary is a string
+            # Stored in a JSON column; older callers may still hand over the encoded text
             ai_summary = data.get('ai_summary')
-            if isinstance(ai_summary, dict):
-                ai_summary = json.dumps(ai_summary)
-            elif ai_summary is None:
-                ai_summary = '{}'
+            if isinstance(ai_summary, str):
+                try:
+                    ai_summary = json.loads(ai_summary)
+                except ValueError:
+                    ai_summary = None
+            if not isinstance(ai_summary, dict):
+                ai_summary = {}
+
+            title = str(data.get('title', 'Unknown'))
+            application_url = str(data.get('url', source_url))
+            field_of_study = str(data.get('field_of_study', 'Not specified'))
+            level_of_study = str(data.get('level_of_study', 'Not specified'))
+
+            amount_info = data.get('amount_normalized')
+            if not isinstance(amount_info, dict):
+                amount_info = parse_amount(data.get('amount'))
 
             # Prepare normalized data
             return {
                 'task_id': task_id,
-                'title': str(data.get('title', 'Unknown')),
-                'amount': str(data.get('amount_normalized', {}).get('display_amount', 'Unknown')),
-                'deadline': deadline_date,
-                'field_of_study': str(data.get('field_of_study', 'Not specified')),
-                'level_of_study': str(data.get('level_of_study', 'Not specified')),
+                'identity_key': scholarship_identity_key(title, application_url, source_url),
+                'title': title,
+                'amount': str(amount_info.get('display_amount', 'Unknown')),
+                **amount_columns(amount_info),
+                **deadline_columns(deadline),
+                'field_of_study': field_of_study,
+                'level_of_study': level_of_study,
+                **vocabulary_columns(field_of_study, level_of_study),
                 'eligibility_criteria': str(data.get('eligibility_requirements', 'Contact institution')),
-                'application_url': str(data.get('url', source_url)),
+                'application_url': application_url,
                 'location_of_study': str(data.get('location_of_study', 'Not specified')),
                 'source_url': str(source_url),
                 'ai_summary': ai_summary,
                 'confidence_score': float(data.get('confidence_score', 0.0)),
+                'model_tier': data.get('model_tier'),
                 'last_updated': datetime.utcnow()
             }
         except Exception as e:
@@ -87,47 +103,112 @@ class ScholarshipScraper:
             return None
 
     async def save_scholarship(self, data: Dict[str, Any], task_id: int, source_url: str):
-        """Save a single scholarship with progress tracking."""
+        """Queue a single scholarship and its progress increment for the next batched write."""
         try:
             # Prepare data with proper type conversions
             prepared_data = self.prepare_scholarship_data(data, task_id, source_url)
             if not prepared_data:
                 return None
 
-            # Create scholarship object
-            scholarship = Scholarship(**prepared_data)
-            
-            try:
-                self.db.add(scholarship)
-                self.db.flush()  # Check for errors before committing
-                
-                # Update progress
-                progress = self.db.query(ScrapingProgress).filter_by(task_id=task_id).first()
-                if progress:
-                    progress.scholarships_found += 1
-                
-                self.db.commit()
-                logger.info(f"Saved scholarship: {scholarship.title}")
-                return scholarship
-                
-            except Exception as e:
-                self.db.rollback()
-                logger.error(f"Database error saving scholarship: {str(e)}")
-                return None
-            
+            await self.buffer.add_scholarship(prepared_data)
+            if task_id in self.progress_ids:
+                await self.buffer.increment_progress(self.progress_ids[task_id], scholarships_found=1)
+
+            logger.info(f"Queued scholarship: {prepared_data['title']}")
+            return prepared_data
+
         except Exception as e:
             logger.error(f"Error in save_scholarship: {str(e)}")
-            self.db.rollback()
             return None
 
+    async def wait_for_ai(self):
+        """Pause AI stages until the shared OpenAI circuit breaker lets requests through."""
+        await get_openai_guard().breaker.wait_until_available()
+
+    async def process_text_blocks(self, text_blocks: List[str], task_id: int, source_url: str):
+        """Run text blocks through the AI processor in chunks and save the results."""
+        chunk_size = self.settings.AI_CHUNK_SIZE
+        pending = list(text_blocks)
+        while pending:
+            chunk, pending = pending[:chunk_size], pending[chunk_size:]
+            requeued = False
+            try:
+                processed_chunk = await self.ai_processor.process_scholarship_chunk(chunk)
+            except AIUnavailableError as e:
+                # Keep what was finished, requeue the rest once the circuit recovers
+                logger.warning(f"AI unavailable, requeueing {len(e.pending_blocks)} text blocks: {str(e)}")
+                processed_chunk = e.partial_results
+                pending = e.pending_blocks + pending
+                requeued = True
+
+            processed_chunk = [processed_data for processed_data in processed_chunk if processed_data]
+            # Listings on one page tend to share deadlines; each distinct string is classified once
+            deadlines = normalize_deadlines([deadline_text(processed_data) for processed_data in processed_chunk])
+            for processed_data, deadline in zip(processed_chunk, deadlines):
+                processed_data['deadline_normalized'] = deadline
+                await self.save_scholarship(processed_data, task_id, source_url)
+
+            if requeued:
+                await self.wait_for_ai()
+
+    async def stage_llm_usage(self, db: AsyncSession):
+        """
+        Add LLM usage recorded since the last flush to the usage rows (caller
+        commits). Returns a callable that gives the usage back to the tracker if
+        the flush rolls back, so the next flush writes it instead.
+        """
+        rows = usage_tracker.drain()
+        try:
+            await self._add_llm_usage(db, rows)
+        except Exception:
+            usage_tracker.restore(rows)
+            raise
+        return lambda: usage_tracker.restore(rows)
+
+    async def _add_llm_usage(self, db: AsyncSession, rows: List[Dict[str, Any]]):
+        for row in rows:
+            usage = (await db.execute(
+                select(LLMUsage)
+                .filter_by(task_id=row['task_id'], model=row['model'], operation=row['operation'])
+                .limit(1)
+            )).scalar()
+            if usage is None:
+                usage = LLMUsage(
+                    task_id=row['task_id'],
+                    domain=row['domain'],
+                    model=row['model'],
+                    operation=row['operation'],
+                    calls=0,
+                    prompt_tokens=0,
+                    completion_tokens=0,
+                    cost=0.0,
+                    total_latency=0.0
+                )
+                db.add(usage)
+            usage.calls += row['calls']
+            usage.prompt_tokens += row['prompt_tokens']
+            usage.completion_tokens += row['completion_tokens']
+            usage.cost += row['cost']
+            usage.total_latency += row['total_latency']
+
     async def scrape_url(self, task: ScrapingTask, retry_count: int = 0):
+        domain = urllib.parse.urlparse(task.url).netloc
+        # Tasks are scraped concurrently, so each gets its own session
+        async with self.session_factory() as db:
+            task = await db.get(ScrapingTask, task.id)
+            if task is None:
+                return
+            with usage_tracker.scope(task.id, domain):
+                return await self._scrape_url(db, task, retry_count)
+
+    async def _scrape_url(self, db: AsyncSession, task: ScrapingTask, retry_count: int = 0):
         logger.info(f"Starting to scrape URL: {task.url}")
         
         # Create or update progress tracking
         try:
-            existing_progress = self.db.query(ScrapingProgress)\
-                .filter_by(task_id=task.id)\
-                .first()
+            existing_progress = (await db.execute(
+                select(ScrapingProgress).filter_by(task_id=task.id).limit(1)
+            )).scalar()
             
             if existing_progress:
                 progress = existing_progress
@@ -143,9 +224,10 @@ class ScholarshipScraper:
                     scholarships_found=0,
                     start_time=datetime.utcnow()
                 )
-                self.db.add(progress)
+                db.add(progress)
             
-            self.db.commit()
+            await db.commit()
+            self.progress_ids[task.id] = progress.id
 
         except Exception as e:
             logger.error(f"Error creating progress record: {str(e)}")
@@ -163,7 +245,7 @@ class ScholarshipScraper:
                         logger.warning(f"Timeout error occurred while scraping {task.url}. Retrying...")
                         await browser.close()
                         await asyncio.sleep(5)
-                        return await self.scrape_url(task, retry_count + 1)
+                        return await self._scrape_url(db, task, retry_count + 1)
                     else:
                         raise e
 
@@ -178,26 +260,33 @@ class ScholarshipScraper:
                 
                 # Update progress with total links
                 progress.total_links = len(links)
-                self.db.commit()
+                await db.commit()
                 
-                for link in links:
+                pending_links = deque(links)
+                while pending_links:
+                    link = pending_links.popleft()
                     try:
                         link_text = link['text']
                         link_url = link['url']
                         
                         if link_text and link_url:
                             full_url = urllib.parse.urljoin(task.url, link_url)
-                            classification = await self.link_classifier.classify(link_text, full_url)
+                            try:
+                                classification = await self.link_classifier.classify(link_text, full_url)
+                            except AIUnavailableError as e:
+                                # Requeue the link and pause until the AI circuit recovers
+                                logger.warning(f"AI unavailable, requeueing link {full_url}: {str(e)}")
+                                pending_links.appendleft(link)
+                                await self.wait_for_ai()
+                                continue
                             
-                            scraped_link = ScrapedLink(
-                                task_id=task.id,
-                                text=link_text,
-                                url=full_url,
-                                classification=classification,
-                                found_at=datetime.utcnow()
-                            )
-                            self.db.add(scraped_link)
-                            self.db.commit()
+                            await self.buffer.add_link({
+                                'task_id': task.id,
+                                'text': link_text,
+                                'url': full_url,
+                                'classification': classification,
+                                'found_at': datetime.utcnow()
+                            })
                             
                             if classification == 'scholarship':
                                 await page.goto(full_url, wait_until="networkidle", timeout=60000)
@@ -206,14 +295,10 @@ class ScholarshipScraper:
                                 text_blocks = raw_data.get('text_blocks', [])
                                 
                                 # Process and save scholarships in real-time
-                                processed_scholarships = await self.ai_processor.process_scholarship_chunk(text_blocks)
-                                for processed_data in processed_scholarships:
-                                    if processed_data:
-                                        await self.save_scholarship(processed_data, task.id, full_url)
+                                await self.process_text_blocks(text_blocks, task.id, full_url)
                             
                             # Update progress
-                            progress.processed_links += 1
-                            self.db.commit()
+                            await self.buffer.increment_progress(progress.id, processed_links=1)
                             
                     except Exception as e:
                         logger.warning(f"Error processing link: {str(e)}")
@@ -225,16 +310,11 @@ class ScholarshipScraper:
                 
                 raw_data = await self.parser.parse(html, task.url)
                 text_blocks = raw_data.get('text_blocks', [])
+                await self.process_text_blocks(text_blocks, task.id, task.url)
                 
-                chunk_size = self.settings.AI_CHUNK_SIZE
-                for i in range(0, len(text_blocks), chunk_size):
-                    chunk = text_blocks[i:i+chunk_size]
-                    processed_chunk = await self.ai_processor.process_scholarship_chunk(chunk)
-                    
-                    for processed_data in processed_chunk:
-                        if processed_data:
-                            await self.save_scholarship(processed_data, task.id, task.url)
-                
+                # Write out buffered rows before marking the task complete
+                await self.buffer.flush()
+
                 # Update task and progress status
                 progress.status = "completed"
                 progress.end_time = datetime.utcnow()
@@ -242,31 +322,46 @@ class ScholarshipScraper:
                 task.last_run = datetime.utcnow()
                 task.next_run = datetime.utcnow() + timedelta(hours=24)
                 task.success_count += 1
-                self.db.commit()
+                await db.commit()
                 
                 logger.info(f"Successfully processed task: {task.url}")
                 
         except Exception as e:
             logger.error(f"Error scraping {task.url}: {str(e)}", exc_info=True)
+            await self.buffer.flush()
             progress.status = "failed"
             progress.error_message = str(e)
             task.status = "failed"
             task.error_message = str(e)
+            task.last_run = datetime.utcnow()
             task.fail_count += 1
-            self.db.commit()
+            await db.commit()
+
+    async def close(self):
+        """Flush buffered writes; called on shutdown."""
+        await self.buffer.close()
 
     async def run_worker(self):
         logger.info("Worker started")
+        self.buffer.start()
+        try:
+            await self._run_worker_loop()
+        finally:
+            await self.close()
+
+    async def _run_worker_loop(self):
         while True:
             try:
-                tasks = self.db.query(ScrapingTask)\
-                    .filter(ScrapingTask.status.in_(["pending", "failed"]))\
-                    .filter(
-                        (ScrapingTask.next_run <= datetime.utcnow()) | 
-                        (ScrapingTask.next_run.is_(None))
-                    )\
-                    .limit(self.settings.WORKER_BATCH_SIZE)\
-                    .all()
+                async with self.session_factory() as db:
+                    tasks = (await db.execute(
+                        select(ScrapingTask)
+                        .filter(ScrapingTask.status.in_(["pending", "failed"]))
+                        .filter(
+                            (ScrapingTask.next_run <= datetime.utcnow()) | 
+                            (ScrapingTask.next_run.is_(None))
+                        )
+                        .limit(self.settings.WORKER_BATCH_SIZE)
+                    )).scalars().all()
                 
                 if not tasks:
                     logger.debug("No tasks found, waiting...")
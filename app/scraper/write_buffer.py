@@ -0,0 +1,187 @@
+# app/scraper/write_buffer.py
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import logging
+import time
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.core.storage import upsert_insert
+from app.models.schemas import Scholarship, ScrapedLink, ScrapingProgress
+from app.services.changes import existing_identity_keys, record_upserts
+from app.services.duplicates import link_duplicates
+from app.services.rollups import apply_rollup_deltas, existing_rollup_rows, rollup_deltas
+
+logger = logging.getLogger(__name__)
+
+# Kept from the first crawl when a re-crawl upserts the same scholarship
+SCHOLARSHIP_INSERT_ONLY = ('id', 'task_id', 'identity_key', 'created_at')
+
+
+class WriteBehindBuffer:
+    """
+    Collects scraped links, scholarships and progress increments and writes them
+    in batches: one bulk insert per table and a single commit per flush.
+
+    Rows are written in the order they were added. Links are inserted before
+    scholarships, and progress counters are updated last, so a committed
+    counter never covers rows that are not yet visible. Scholarships are
+    upserted on identity_key, so a re-crawl refreshes the existing row, and
+    the stats rollups are moved from the old row's buckets to the new ones and
+    the change is logged for the changes feed, all in the same transaction.
+    Saved scholarships are also linked to their near-duplicates there.
+
+    Each flush runs in its own session from `session_factory`, so the buffer
+    never shares a session with the coroutines feeding it.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, max_items: int = 200, max_interval: float = 2.0,
+                 duplicate_threshold: float = 0.8):
+        self.session_factory = session_factory
+        self.max_items = max_items
+        self.max_interval = max_interval
+        self.duplicate_threshold = duplicate_threshold
+        self._links: List[Dict[str, Any]] = []
+        self._scholarships: List[Dict[str, Any]] = []
+        self._progress: Dict[int, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._flush_hooks: List[Callable[[AsyncSession], Awaitable[Optional[Callable[[], None]]]]] = []
+        self._last_flush = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._flusher: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._links) + len(self._scholarships) + len(self._progress)
+
+    def add_flush_hook(self, hook: Callable[[AsyncSession], Awaitable[Optional[Callable[[], None]]]]):
+        """
+        Register a coroutine function that stages extra writes into each flush's
+        transaction. It may return a callable that hands back whatever it took
+        for those writes, which is called if the transaction rolls back.
+        """
+        self._flush_hooks.append(hook)
+
+    async def add_link(self, row: Dict[str, Any]):
+        self._links.append(row)
+        await self.maybe_flush()
+
+    async def add_scholarship(self, row: Dict[str, Any]):
+        self._scholarships.append(row)
+        await self.maybe_flush()
+
+    async def increment_progress(self, progress_id: int, **counts: int):
+        """Queue increments for ScrapingProgress counters, e.g. processed_links=1."""
+        for column, amount in counts.items():
+            self._progress[progress_id][column] += amount
+        await self.maybe_flush()
+
+    async def maybe_flush(self):
+        if self.pending >= self.max_items or time.monotonic() - self._last_flush >= self.max_interval:
+            await self.flush()
+
+    async def flush(self):
+        """Write everything buffered so far in one transaction."""
+        async with self._lock:
+            links, self._links = self._links, []
+            scholarships, self._scholarships = self._scholarships, []
+            progress, self._progress = self._progress, defaultdict(lambda: defaultdict(int))
+            self._last_flush = time.monotonic()
+
+            async with self.session_factory() as db:
+                undo = []
+                try:
+                    await self._write(db, links, scholarships, progress, undo)
+                    await db.commit()
+                except Exception as e:
+                    await self._rollback(db, undo)
+                    logger.error(f"Batched write failed, retrying row by row: {str(e)}")
+                    await self._write_individually(db, links, scholarships, progress)
+
+            if scholarships:
+                logger.info(f"Flushed {len(scholarships)} scholarships and {len(links)} links")
+
+    async def _rollback(self, db: AsyncSession, undo: List[Callable[[], None]]):
+        await db.rollback()
+        for restore in undo:
+            restore()
+
+    async def _write(self, db: AsyncSession, links, scholarships, progress, undo: List[Callable[[], None]]):
+        if links:
+            await db.execute(insert(ScrapedLink), links)
+        if scholarships:
+            await self._upsert_scholarships(db, scholarships)
+        for progress_id, counts in progress.items():
+            await db.execute(
+                update(ScrapingProgress)
+                .where(ScrapingProgress.id == progress_id)
+                .values({
+                    getattr(ScrapingProgress, column): getattr(ScrapingProgress, column) + amount
+                    for column, amount in counts.items()
+                })
+            )
+        for hook in self._flush_hooks:
+            restore = await hook(db)
+            if restore is not None:
+                undo.append(restore)
+
+    async def _upsert_scholarships(self, db: AsyncSession, scholarships: List[Dict[str, Any]]):
+        # One row per key: Postgres refuses to update the same row twice in one statement
+        rows = list({row['identity_key']: row for row in scholarships}.values())
+        keys = [row['identity_key'] for row in rows]
+        replaced = await existing_rollup_rows(db, Scholarship.identity_key.in_(keys))
+        existing_keys = await existing_identity_keys(db, keys)
+        stmt = upsert_insert(db.bind.dialect.name, Scholarship)
+        columns = [column for column in rows[0] if column not in SCHOLARSHIP_INSERT_ONLY]
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Scholarship.identity_key],
+            set_={column: stmt.excluded[column] for column in columns}
+        )
+        await db.execute(stmt, rows)
+        await apply_rollup_deltas(db, rollup_deltas(added=rows, removed=replaced))
+        await record_upserts(db, keys, existing_keys)
+        await link_duplicates(db, keys, self.duplicate_threshold)
+
+    async def _write_individually(self, db: AsyncSession, links, scholarships, progress):
+        """Isolate bad rows so one failure does not drop the whole batch."""
+        for table, rows in ((ScrapedLink, links), (Scholarship, scholarships)):
+            for row in rows:
+                try:
+                    if table is Scholarship:
+                        await self._upsert_scholarships(db, [row])
+                    else:
+                        await db.execute(insert(table), [row])
+                    await db.commit()
+                except Exception as e:
+                    await db.rollback()
+                    logger.error(f"Dropping {table.__tablename__} row: {str(e)}")
+        undo = []
+        try:
+            await self._write(db, [], [], progress, undo)
+            await db.commit()
+        except Exception as e:
+            await self._rollback(db, undo)
+            logger.error(f"Dropping progress updates: {str(e)}")
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.max_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Periodic flush failed: {str(e)}")
+
+    def start(self):
+        """Start flushing on a timer so trailing rows are written while the worker is idle."""
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_periodically())
+
+    async def close(self):
+        """Stop the timer and write out anything still buffered."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush()
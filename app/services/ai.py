@@ -1,13 +1,20 @@
 # app/services/ai.py
 from openai import AsyncOpenAI
-from typing import Dict, Any, List, Optional
-import json
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 import re
 from app.core.config import get_settings
-from pydantic import BaseModel
+from app.services.metrics import ai_metrics
+from app.services.usage import usage_tracker
+from app.services.packing import pack_blocks, count_tokens
+from app.services.resilience import AIUnavailableError, get_openai_guard
+from app.models.extraction import ScholarshipAnalysis, PackedScholarshipAnalysis
+from app.services.json_repair import parse_json_lenient
+from app.utils.amounts import parse_amount
+from pydantic import BaseModel, ValidationError
 import asyncio
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -34,10 +41,29 @@ def safe_get_nested(data: Dict[str, Any], *keys: str, default: Any = None) -> An
     except Exception:
         return default
 
+ANALYSIS_STRUCTURE = """{
+        "amount_analysis": {
+            "type": "fixed|range|unknown",
+            "value": "string",
+            "is_renewable": boolean,
+            "conditions": []
+        },
+        "eligibility_requirements": [],
+        "deadline_info": {
+            "date": "YYYY-MM-DD|null",
+            "is_recurring": boolean
+        },
+        "field_of_study": "string",
+        "level_of_study": "string",
+        "confidence_score": number
+    }"""
+
 class LinkClassifier:
     def __init__(self):
         settings = get_settings()
-        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        # Retries are handled by the shared guard so throttling is seen in one place
+        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, max_retries=0)
+        self.guard = get_openai_guard()
 
     async def classify(self, link_text: str, link_url: str) -> str:
         prompt = f"""Given the following link text and URL, classify the link into one of these categories: scholarship, irrelevant.
@@ -49,7 +75,9 @@ Return only the category name, either "scholarship" or "irrelevant"."""
 
         try:
             # Get response from OpenAI
-            completion = await self.client.chat.completions.create(
+            started = time.monotonic()
+            completion = await self.guard.call(
+                self.client.chat.completions.create,
                 model="gpt-4",
                 messages=[
                     {
@@ -63,6 +91,7 @@ Return only the category name, either "scholarship" or "irrelevant"."""
                 ],
                 temperature=0.1
             )
+            usage_tracker.record("gpt-4", 'classify', completion, time.monotonic() - started)
 
             # Get the response content
             response_content = completion.choices[0].message.content.strip().lower()
@@ -75,150 +104,275 @@ Return only the category name, either "scholarship" or "irrelevant"."""
                 logger.warning(f"Invalid link classification response: {response_content}")
                 return 'irrelevant'
 
+        except AIUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"Error in OpenAI link classification: {str(e)}")
             return 'irrelevant'
 
 class ScholarshipAIProcessor:
     def __init__(self):
-        settings = get_settings()
-        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        self.settings = get_settings()
+        self.client = AsyncOpenAI(api_key=self.settings.OPENAI_API_KEY, max_retries=0)
+        self.guard = get_openai_guard()
 
     def _parse_amount(self, amount_str: str) -> Dict[str, Any]:
         """Extract structured amount information."""
-        default_amount = {
-            'type': 'unknown',
-            'min_amount': None,
-            'max_amount': None,
-            'is_renewable': False,
-            'duration': None,
-            'display_amount': 'Not specified'
+        return parse_amount(amount_str)
+
+    def _extract_structured_fields(self, text_block: str) -> Optional[Dict[str, Any]]:
+        """Extract the labelled fields the parser writes into each text block."""
+        title_match = re.search(r'Title:\s*(.*?)(?:\n|$)', text_block, re.IGNORECASE)
+        amount_match = re.search(r'Amount:\s*(.*?)(?:\n|$)', text_block, re.IGNORECASE)
+        deadline_match = re.search(r'Deadline:\s*(.*?)(?:\n|$)', text_block, re.IGNORECASE)
+        url_match = re.search(r'URL:\s*(.*?)(?:\n|$)', text_block, re.IGNORECASE)
+        description_match = re.search(r'Description:\s*(.*?)(?:\n|$)', text_block, re.IGNORECASE | re.DOTALL)
+
+        # Skip if missing essential information
+        if not (title_match and description_match):
+            return None
+
+        return {
+            'title': title_match.group(1).strip(),
+            'amount': amount_match.group(1).strip() if amount_match else 'Not specified',
+            'deadline': deadline_match.group(1).strip() if deadline_match else None,
+            'url': url_match.group(1).strip() if url_match else '',
+            'description': description_match.group(1).strip(),
         }
 
-        if not amount_str or not isinstance(amount_str, str):
-            return default_amount
+    def _build_prompt(self, text_block: str) -> str:
+        return f"""Analyze this scholarship information and provide a structured JSON response:
+
+    {text_block}
+
+    Return a JSON object with this exact structure:
+    {ANALYSIS_STRUCTURE}"""
+
+    def _build_packed_prompt(self, pack: List[Tuple[str, str]]) -> str:
+        blocks = '\n\n'.join(f"### BLOCK {block_id}\n{text}" for block_id, text in pack)
+        return f"""Analyze each scholarship block below. Every block starts with a "### BLOCK <id>" header.
+
+{blocks}
 
+    Return a JSON object of the form {{"results": [...]}} with one entry per block, in any order.
+    Each entry must include "id" set to the block's id exactly as given, plus this structure:
+    {ANALYSIS_STRUCTURE}"""
+
+    def _validate_analysis(self, model: str, data: Any, schema=ScholarshipAnalysis) -> Optional[Dict[str, Any]]:
+        """Validate a model response against the extraction schema."""
         try:
-            amount_info = default_amount.copy()
-            amount_info['display_amount'] = amount_str
-
-            # Look for patterns like "$5,000" or "up to $10,000"
-            amount_matches = re.findall(r'\$?\d+(?:,\d{3})*(?:\.\d{2})?', amount_str)
-            if amount_matches:
-                amounts = [float(re.sub(r'[$,]', '', amt)) for amt in amount_matches]
-                if len(amounts) == 1:
-                    amount_info['type'] = 'fixed'
-                    amount_info['min_amount'] = amounts[0]
-                    amount_info['max_amount'] = amounts[0]
-                elif len(amounts) >= 2:
-                    amount_info['type'] = 'range'
-                    amount_info['min_amount'] = min(amounts)
-                    amount_info['max_amount'] = max(amounts)
-
-            # Check for renewable scholarships
-            if re.search(r'renewable|per year|annual|yearly', amount_str, re.I):
-                amount_info['is_renewable'] = True
-
-            return amount_info
-        except Exception as e:
-            logger.error(f"Error parsing amount '{amount_str}': {str(e)}")
-            return default_amount
+            return schema.model_validate(data).model_dump()
+        except ValidationError as e:
+            logger.warning(f"Response from {model} failed schema validation: {e.error_count()} errors")
+            return None
+
+    async def _request_json(self, model: str, tier: int, prompt: str) -> Tuple[Optional[Any], bool]:
+        """Send a prompt to one model tier and parse its JSON reply; returns (value, repaired)."""
+        request = {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": "You are a scholarship analysis expert. Return only valid JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.1
+        }
+        if model in self.settings.AI_JSON_MODE_MODELS:
+            request["response_format"] = {"type": "json_object"}
+
+        started = time.monotonic()
+        completion = await self.guard.call(self.client.chat.completions.create, **request)
+        latency = time.monotonic() - started
+        usage_tracker.record(model, 'extract', completion, latency)
+
+        usage = completion.usage
+        ai_metrics.record_call(
+            model,
+            tier,
+            usage.prompt_tokens if usage else 0,
+            usage.completion_tokens if usage else 0,
+            latency
+        )
 
-    async def process_scholarship(self, text_block: str) -> Optional[Dict[str, Any]]:
-        """Process a single scholarship text block."""
+        value, repaired = parse_json_lenient(completion.choices[0].message.content)
+        if value is None:
+            logger.warning(f"Unrecoverable JSON from {model}")
+        elif repaired:
+            logger.info(f"Repaired malformed JSON from {model}")
+        return value, repaired
+
+    async def _request_analysis(self, model: str, tier: int, prompt: str) -> Optional[Dict[str, Any]]:
+        """Ask one model tier for an analysis; None means the response was unusable."""
+        response, repaired = await self._request_json(model, tier, prompt)
+        ai_response = self._validate_analysis(model, response) if response is not None else None
+        ai_metrics.record_parse(model, 'failed' if ai_response is None else 'repaired' if repaired else 'parsed')
+        return ai_response
+
+    async def _request_packed_analysis(self, model: str, tier: int, pack: List[Tuple[str, str]]) -> Dict[str, Dict[str, Any]]:
+        """Analyze a pack of blocks in one request; returns valid results keyed by block id."""
+        response, repaired = await self._request_json(model, tier, self._build_packed_prompt(pack))
+        results = response.get('results') if isinstance(response, dict) else response
+        if not isinstance(results, list):
+            logger.warning(f"Packed response from {model} has no results array")
+            results = []
+
+        expected_ids = {block_id for block_id, _ in pack}
+        analyses = {}
+        for result in results:
+            analysis = self._validate_analysis(model, result, PackedScholarshipAnalysis)
+            if analysis and analysis['id'] in expected_ids:
+                analyses[analysis.pop('id')] = analysis
+
+        for block_id in expected_ids:
+            ai_metrics.record_parse(model, 'failed' if block_id not in analyses else 'repaired' if repaired else 'parsed')
+        return analyses
+
+    def _build_final_data(self, structured_data: Dict[str, Any], ai_response: Dict[str, Any], model: str) -> Dict[str, Any]:
+        # Normalize amount information
+        amount_info = self._parse_amount(ai_response['amount_analysis']['value'])
+
+        return {
+            'title': structured_data['title'],
+            'amount_normalized': amount_info,
+            'amount': structured_data['amount'],
+            'deadline': structured_data['deadline'],
+            'deadline_info': ai_response['deadline_info'],
+            'field_of_study': ai_response['field_of_study'],
+            'level_of_study': ai_response['level_of_study'],
+            'eligibility_requirements': '\n'.join(ai_response['eligibility_requirements']),
+            'application_url': structured_data['url'],
+            'source_url': structured_data['url'],
+            'ai_summary': ai_response,
+            'confidence_score': float(ai_response['confidence_score']),
+            'model_tier': model,
+            'last_updated': datetime.utcnow()
+        }
+
+    async def process_scholarship(self, text_block: str, start_tier: int = 0) -> Optional[Dict[str, Any]]:
+        """Process a single scholarship text block, escalating through the model tiers."""
         try:
-            # Extract basic information using regex
-            title_match = re.search(r'Title:\s*(.*?)(?:\n|$)', text_block, re.IGNORECASE)
-            amount_match = re.search(r'Amount:\s*(.*?)(?:\n|$)', text_block, re.IGNORECASE)
-            deadline_match = re.search(r'Deadline:\s*(.*?)(?:\n|$)', text_block, re.IGNORECASE)
-            url_match = re.search(r'URL:\s*(.*?)(?:\n|$)', text_block, re.IGNORECASE)
-            description_match = re.search(r'Description:\s*(.*?)(?:\n|$)', text_block, re.IGNORECASE | re.DOTALL)
-
-            # Skip if missing essential information
-            if not (title_match and description_match):
+            structured_data = self._extract_structured_fields(text_block)
+            if not structured_data:
                 logger.warning("Skipping scholarship due to missing essential information")
                 return None
 
-            # Structure the data
-            structured_data = {
-                'title': title_match.group(1).strip(),
-                'amount': amount_match.group(1).strip() if amount_match else 'Not specified',
-                'deadline': deadline_match.group(1).strip() if deadline_match else None,
-                'url': url_match.group(1).strip() if url_match else '',
-                'description': description_match.group(1).strip(),
-            }
-
-            # Process with GPT-4
-            prompt = f"""Analyze this scholarship information and provide a structured JSON response:
+            prompt = self._build_prompt(text_block)
+            tiers = self.settings.AI_MODEL_TIERS
+            final_data = None
 
-    {text_block}
+            for tier, model in enumerate(tiers):
+                if tier < start_tier:
+                    continue
+                is_last_tier = tier == len(tiers) - 1
+                try:
+                    ai_response = await self._request_analysis(model, tier, prompt)
+                except AIUnavailableError:
+                    raise
+                except Exception as e:
+                    # A request one model rejects (a 400, a context-length error) can still suit the next tier
+                    logger.error(f"Error analyzing scholarship with {model}: {str(e)}")
+                    ai_response = None
 
-    Return a JSON object with this exact structure:
-    {{
-        "amount_analysis": {{
-            "type": "fixed|range|unknown",
-            "value": "string",
-            "is_renewable": boolean,
-            "conditions": []
-        }},
-        "eligibility_requirements": [],
-        "deadline_info": {{
-            "date": "YYYY-MM-DD|null",
-            "is_recurring": boolean
-        }},
-        "field_of_study": "string",
-        "level_of_study": "string",
-        "confidence_score": number
-    }}"""
+                if ai_response is not None:
+                    final_data = self._build_final_data(structured_data, ai_response, model)
+                    threshold = self.settings.AI_MIN_CONFIDENCE if is_last_tier else self.settings.AI_ESCALATION_CONFIDENCE
+                    if final_data['confidence_score'] >= threshold:
+                        ai_metrics.record_outcome(model, 'accepted')
+                        logger.info(f"Successfully processed scholarship with {model}: {final_data['title']}")
+                        return final_data
 
-            completion = await self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a scholarship analysis expert. Return only valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.1
-            )
+                if not is_last_tier:
+                    ai_metrics.record_outcome(model, 'escalated')
+                    logger.debug(f"Escalating '{structured_data['title']}' from {model} to {tiers[tier + 1]}")
 
-            # Parse AI response
-            ai_response = json.loads(completion.choices[0].message.content.strip())
-            
-            # Normalize amount information
-            amount_info = self._parse_amount(ai_response['amount_analysis']['value'])
-
-            # Build final data structure
-            final_data = {
-                'title': structured_data['title'],
-                'amount_normalized': amount_info,
-                'amount': structured_data['amount'],
-                'deadline_info': ai_response['deadline_info'],
-                'field_of_study': ai_response['field_of_study'],
-                'level_of_study': ai_response['level_of_study'],
-                'eligibility_requirements': '\n'.join(ai_response['eligibility_requirements']),
-                'application_url': structured_data['url'],
-                'source_url': structured_data['url'],
-                'ai_summary': json.dumps(ai_response),
-                'confidence_score': float(ai_response['confidence_score']),
-                'last_updated': datetime.utcnow()
-            }
-
-            # Only return if confidence score is above threshold
-            if final_data['confidence_score'] >= 0.6:
-                logger.info(f"Successfully processed scholarship: {final_data['title']}")
-                return final_data
-            else:
-                logger.warning(f"Skipping low-confidence scholarship: {final_data['title']}")
-                return None
+            title = final_data['title'] if final_data else structured_data['title']
+            logger.warning(f"Skipping low-confidence scholarship: {title}")
+            return None
 
+        except AIUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"Error processing scholarship: {str(e)}")
             return None
     
+    async def process_packed_chunk(self, chunk: List[str]) -> List[Dict[str, Any]]:
+        """
+        Process a chunk by packing as many blocks per request as fit the token budget.
+        Blocks the packed request could not answer confidently fall back to the
+        single-block cascade, starting from the next tier.
+        """
+        tiers = self.settings.AI_MODEL_TIERS
+        model = tiers[0]
+        escalation_tier = 1 if len(tiers) > 1 else 0
+        threshold = self.settings.AI_ESCALATION_CONFIDENCE if len(tiers) > 1 else self.settings.AI_MIN_CONFIDENCE
+
+        blocks = []
+        for text_block in chunk:
+            structured_data = self._extract_structured_fields(text_block)
+            if structured_data:
+                blocks.append((text_block, structured_data))
+            else:
+                logger.warning("Skipping scholarship due to missing essential information")
+
+        packs = pack_blocks(
+            [text_block for text_block, _ in blocks],
+            model,
+            self.settings.AI_PACK_TOKEN_BUDGET - count_tokens(self._build_packed_prompt([]), model),
+            self.settings.AI_PACK_MAX_BLOCK_TOKENS
+        )
+
+        processed_scholarships = []
+        completed = 0  # Blocks fully handled, in pack order
+        try:
+            for pack in packs:
+                try:
+                    analyses = await self._request_packed_analysis(model, 0, pack)
+                except AIUnavailableError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Error processing packed request: {str(e)}")
+                    analyses = {}
+
+                for block_id, _ in pack:
+                    text_block, structured_data = blocks[int(block_id)]
+                    ai_response = analyses.get(block_id)
+                    final_data = None
+                    if ai_response is not None:
+                        final_data = self._build_final_data(structured_data, ai_response, model)
+                        if final_data['confidence_score'] >= threshold:
+                            ai_metrics.record_outcome(model, 'accepted')
+                            processed_scholarships.append(final_data)
+                            completed += 1
+                            continue
+
+                    if final_data and len(tiers) == 1:
+                        logger.warning(f"Skipping low-confidence scholarship: {final_data['title']}")
+                    else:
+                        if len(tiers) > 1:
+                            ai_metrics.record_outcome(model, 'escalated')
+                        processed_data = await self.process_scholarship(text_block, start_tier=escalation_tier)
+                        if processed_data:
+                            processed_scholarships.append(processed_data)
+                    completed += 1
+        except AIUnavailableError as e:
+            e.partial_results = processed_scholarships
+            e.pending_blocks = [text_block for text_block, _ in blocks[completed:]]
+            raise
+
+        return processed_scholarships
+
     async def process_scholarship_chunk(self, chunk: List[str]) -> List[Dict[str, Any]]:
+        if self.settings.AI_PACKING_ENABLED:
+            return await self.process_packed_chunk(chunk)
+
         processed_scholarships = []
         
-        for text_block in chunk:
-            processed_data = await self.process_scholarship(text_block)
+        for index, text_block in enumerate(chunk):
+            try:
+                processed_data = await self.process_scholarship(text_block)
+            except AIUnavailableError as e:
+                e.partial_results = processed_scholarships
+                e.pending_blocks = chunk[index:]
+                raise
             
             if processed_data:
                 processed_scholarships.append(processed_data)
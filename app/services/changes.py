@@ -0,0 +1,81 @@
+# app/services/changes.py
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import and_, case, insert, literal, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.schemas import Scholarship, ScholarshipChange
+
+INSERT, UPDATE, DELETE = 'insert', 'update', 'delete'
+
+_CHANGE_COLUMNS = ['scholarship_id', 'identity_key', 'operation', 'changed_at']
+
+
+async def _serialize_writers(db: AsyncSession):
+    """
+    Hold the change log's write lock until commit so seq order is commit order.
+    Without it a Postgres transaction could take a lower seq but commit after a
+    reader has already moved past it. SQLite serializes writers on its own.
+    """
+    if db.bind.dialect.name == 'postgresql':
+        await db.execute(text("LOCK TABLE scholarship_changes IN EXCLUSIVE MODE"))
+
+
+async def existing_identity_keys(db: AsyncSession, keys: Iterable[str]) -> List[str]:
+    """Which of `keys` are already stored; call before an upsert to tell inserts from updates."""
+    return list((await db.execute(
+        select(Scholarship.identity_key).where(Scholarship.identity_key.in_(list(keys)))
+    )).scalars())
+
+
+async def record_upserts(db: AsyncSession, keys: Iterable[str], existing_keys: Iterable[str]):
+    """Log the scholarships just upserted under `keys`, in the caller's transaction."""
+    keys = list(keys)
+    if not keys:
+        return
+    await _serialize_writers(db)
+    operation = case((Scholarship.identity_key.in_(list(existing_keys)), UPDATE), else_=INSERT)
+    await db.execute(
+        insert(ScholarshipChange).from_select(
+            _CHANGE_COLUMNS,
+            select(Scholarship.id, Scholarship.identity_key, operation, literal(datetime.utcnow()))
+            .where(Scholarship.identity_key.in_(keys))
+            .order_by(Scholarship.id)
+        )
+    )
+
+
+async def record_deletes(db: AsyncSession, *conditions):
+    """Log the scholarships matching `conditions` as deleted; call just before deleting them."""
+    await _serialize_writers(db)
+    await db.execute(
+        insert(ScholarshipChange).from_select(
+            _CHANGE_COLUMNS,
+            select(Scholarship.id, Scholarship.identity_key, literal(DELETE), literal(datetime.utcnow()))
+            .where(*conditions)
+            .order_by(Scholarship.id)
+        )
+    )
+
+
+async def read_changes(
+    db: AsyncSession,
+    since: int,
+    limit: int
+) -> Tuple[List[Tuple[ScholarshipChange, Optional[Scholarship]]], bool]:
+    """
+    Changes after `since` in seq order with the scholarship's current row (None
+    once deleted), and whether more changes follow this page. The row must
+    match on identity key as well as id, because SQLite hands the id of a
+    deleted row to the next insert.
+    """
+    rows = (await db.execute(
+        select(ScholarshipChange, Scholarship)
+        .outerjoin(Scholarship, and_(
+            Scholarship.id == ScholarshipChange.scholarship_id,
+            Scholarship.identity_key == ScholarshipChange.identity_key
+        ))
+        .where(ScholarshipChange.seq > since)
+        .order_by(ScholarshipChange.seq)
+        .limit(limit + 1)
+    )).all()
+    return [(row.ScholarshipChange, row.Scholarship) for row in rows[:limit]], len(rows) > limit
@@ -0,0 +1,175 @@
+# app/services/duplicates.py
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import and_, bindparam, delete, exists, insert, or_, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from app.models.schemas import Scholarship, ScholarshipMinHashBand
+from app.utils.minhash import band_buckets, signature, similar_pairs, similarity
+
+
+class _Clusters:
+    """Union-find over scholarship ids; each set is labelled by its smallest id."""
+
+    def __init__(self):
+        self._parent: Dict[int, int] = {}
+
+    def find(self, id: int) -> int:
+        parent = self._parent.setdefault(id, id)
+        if parent != id:
+            parent = self._parent[id] = self.find(parent)
+        return parent
+
+    def union(self, first: int, second: int):
+        a, b = self.find(first), self.find(second)
+        if a != b:
+            self._parent[max(a, b)] = min(a, b)
+
+    def groups(self) -> List[Set[int]]:
+        groups: Dict[int, Set[int]] = {}
+        for id in self._parent:
+            groups.setdefault(self.find(id), set()).add(id)
+        return [group for group in groups.values() if len(group) > 1]
+
+
+def collapse_condition():
+    """Keep one row per duplicate cluster: those with no lower-id member in the same cluster."""
+    member = aliased(Scholarship)
+    return or_(
+        Scholarship.cluster_id.is_(None),
+        ~exists().where(and_(member.cluster_id == Scholarship.cluster_id, member.id < Scholarship.id))
+    )
+
+
+async def _store_signatures(db: AsyncSession, signatures: Dict[int, Optional[bytes]]):
+    """Replace the stored signature and LSH band rows of each scholarship."""
+    if not signatures:
+        return
+    await db.execute(
+        update(Scholarship.__table__)
+        .where(Scholarship.__table__.c.id == bindparam('row_id'))
+        # Keep last_updated, which orders listings and feeds the day rollups, out of the onupdate
+        .values(minhash=bindparam('packed'), last_updated=Scholarship.__table__.c.last_updated),
+        [{'row_id': id, 'packed': packed} for id, packed in signatures.items()]
+    )
+    await db.execute(delete(ScholarshipMinHashBand).where(ScholarshipMinHashBand.scholarship_id.in_(list(signatures))))
+    bands = [
+        {'scholarship_id': id, 'band': band, 'bucket': bucket}
+        for id, packed in signatures.items() if packed
+        for band, bucket in band_buckets(packed)
+    ]
+    if bands:
+        await db.execute(insert(ScholarshipMinHashBand), bands)
+
+
+async def _merge(db: AsyncSession, clusters: _Clusters, current: Dict[int, Optional[int]]):
+    """
+    Label every multi-member group with its smallest id, pulling in the rest of
+    any existing cluster a member already belonged to.
+    """
+    for group in clusters.groups():
+        previous = {current.get(id) for id in group} - {None}
+        label = min(group | previous)
+        await db.execute(
+            update(Scholarship)
+            .where(or_(Scholarship.id.in_(list(group)), Scholarship.cluster_id.in_(list(previous))))
+            .values(cluster_id=label, last_updated=Scholarship.last_updated)
+            .execution_options(synchronize_session=False)
+        )
+
+
+async def link_duplicates(db: AsyncSession, keys: Iterable[str], threshold: float) -> int:
+    """
+    Sign the scholarships just saved under `keys`, look up candidates sharing an
+    LSH bucket and join verified near-duplicates into one cluster, in the
+    caller's transaction. Clusters only grow here; scripts/cluster_duplicates.py
+    recomputes them from scratch. Returns the number of duplicate pairs found.
+    """
+    rows = (await db.execute(
+        select(Scholarship.id, Scholarship.title, Scholarship.eligibility_criteria)
+        .where(Scholarship.identity_key.in_(list(keys)))
+    )).all()
+    signatures = {row.id: signature(row.title, row.eligibility_criteria) for row in rows}
+    await _store_signatures(db, signatures)
+
+    wanted = {key for packed in signatures.values() if packed for key in band_buckets(packed)}
+    if not wanted:
+        return 0
+    candidates = (await db.execute(
+        select(ScholarshipMinHashBand.scholarship_id)
+        .where(tuple_(ScholarshipMinHashBand.band, ScholarshipMinHashBand.bucket).in_(list(wanted)))
+        .distinct()
+    )).scalars().all()
+    stored = {
+        row.id: row for row in (await db.execute(
+            select(Scholarship.id, Scholarship.minhash, Scholarship.cluster_id)
+            .where(Scholarship.id.in_(list(candidates)))
+        )).all()
+    }
+
+    clusters = _Clusters()
+    pairs = 0
+    for id, packed in signatures.items():
+        for candidate in candidates:
+            other = stored.get(candidate)
+            if packed and other and candidate != id and other.minhash and similarity(packed, other.minhash) >= threshold:
+                clusters.union(id, candidate)
+                pairs += 1
+    await _merge(db, clusters, {id: row.cluster_id for id, row in stored.items()})
+    return pairs
+
+
+async def reindex_signatures(db: AsyncSession, batch_size: int = 1000) -> int:
+    """Recompute every stored signature and band row, one committed batch at a time."""
+    indexed, last_id = 0, 0
+    while True:
+        rows = (await db.execute(
+            select(Scholarship.id, Scholarship.title, Scholarship.eligibility_criteria)
+            .where(Scholarship.id > last_id)
+            .order_by(Scholarship.id)
+            .limit(batch_size)
+        )).all()
+        if not rows:
+            return indexed
+        await _store_signatures(db, {row.id: signature(row.title, row.eligibility_criteria) for row in rows})
+        await db.commit()
+        indexed += len(rows)
+        last_id = rows[-1].id
+
+
+async def rebuild_clusters(db: AsyncSession, threshold: float, batch_size: int = 1000) -> Tuple[int, int]:
+    """
+    Recompute every cluster from the stored signatures in the caller's
+    transaction. Returns (scholarships clustered, clusters).
+    """
+    signatures, current = [], {}
+    result = await db.stream(
+        select(Scholarship.id, Scholarship.minhash, Scholarship.cluster_id)
+        .where(or_(Scholarship.minhash.is_not(None), Scholarship.cluster_id.is_not(None)))
+        .execution_options(yield_per=batch_size)
+    )
+    async for partition in result.partitions():
+        for row in partition:
+            if row.minhash:
+                signatures.append((row.id, row.minhash))
+            if row.cluster_id is not None:
+                current[row.id] = row.cluster_id
+
+    clusters = _Clusters()
+    for first, second in similar_pairs(signatures, threshold):
+        clusters.union(first, second)
+
+    groups = clusters.groups()
+    labels = {id: min(group) for group in groups for id in group}
+    # Only rows whose cluster changes are written
+    changed = [
+        {'row_id': id, 'label': labels.get(id)}
+        for id in current.keys() | labels.keys() if current.get(id) != labels.get(id)
+    ]
+    if changed:
+        await db.execute(
+            update(Scholarship.__table__)
+            .where(Scholarship.__table__.c.id == bindparam('row_id'))
+            .values(cluster_id=bindparam('label'), last_updated=Scholarship.__table__.c.last_updated),
+            changed
+        )
+    return sum(len(group) for group in groups), len(groups)
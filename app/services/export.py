@@ -0,0 +1,253 @@
+# app/services/export.py
+from datetime import datetime
+from typing import Any, AsyncIterator, Iterable, List, Optional, Sequence
+import csv
+import io
+import json
+import logging
+import zlib
+from sqlalchemy import desc, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.sql import Select
+from app.models.schemas import Scholarship
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Columnar exports are unavailable without pyarrow
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+# (CSV header, column). NDJSON rows carry the id as well and use column names as keys.
+EXPORT_COLUMNS = (
+    ("Title", Scholarship.title),
+    ("Amount", Scholarship.amount),
+    ("Deadline", Scholarship.deadline),
+    ("Field of Study", Scholarship.field_of_study),
+    ("Level of Study", Scholarship.level_of_study),
+    ("Eligibility Criteria", Scholarship.eligibility_criteria),
+    ("Application URL", Scholarship.application_url),
+    ("Source URL", Scholarship.source_url),
+    ("Confidence Score", Scholarship.confidence_score),
+    ("Last Updated", Scholarship.last_updated),
+)
+
+
+def export_query(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    columns: Optional[Sequence[Any]] = None
+) -> Select:
+    """
+    Plain column rows, newest first; no ORM entities are built for an export.
+    Defaults to the id followed by EXPORT_COLUMNS.
+    """
+    query = select(*(columns or (Scholarship.id, *(column for _, column in EXPORT_COLUMNS))))
+    if start_date:
+        query = query.filter(Scholarship.created_at >= start_date)
+    if end_date:
+        query = query.filter(Scholarship.created_at <= end_date)
+    return query.order_by(desc(Scholarship.created_at), desc(Scholarship.id))
+
+
+async def stream_batches(session_factory: async_sessionmaker, query: Select, batch_size: int) -> AsyncIterator[list]:
+    """
+    Yield result rows `batch_size` at a time from a server-side cursor. The
+    session is owned by the generator because the response body is produced
+    after the endpoint (and its request-scoped session) has returned.
+    """
+    async with session_factory() as db:
+        result = await db.stream(query.execution_options(yield_per=batch_size))
+        async for batch in result.partitions():
+            yield batch
+
+
+def _text(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+async def csv_chunks(batches: AsyncIterator[Iterable]) -> AsyncIterator[str]:
+    """One CSV chunk per batch, header first."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([header for header, _ in EXPORT_COLUMNS])
+    yield buffer.getvalue()
+    async for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_text(value) if value is not None else "" for value in row[1:]] for row in batch)
+        yield buffer.getvalue()
+
+
+async def ndjson_chunks(batches: AsyncIterator[Iterable]) -> AsyncIterator[str]:
+    """One JSON object per line, one chunk per batch."""
+    keys = [Scholarship.id.key] + [column.key for _, column in EXPORT_COLUMNS]
+    async for batch in batches:
+        yield "".join(json.dumps(dict(zip(keys, row)), default=_text) + "\n" for row in batch)
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """
+    Whether an Accept-Encoding header allows gzip: its own entry decides if
+    present, otherwise a "*" entry does, and q=0 (or an unreadable q) refuses.
+    """
+    allowed = {}
+    for entry in (accept_encoding or "").lower().split(","):
+        coding, _, params = entry.partition(";")
+        coding = coding.strip()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        allowed[coding] = quality > 0
+    for coding in ("gzip", "x-gzip", "*"):
+        if coding in allowed:
+            return allowed[coding]
+    return False
+
+
+async def encode_chunks(chunks: AsyncIterator[str], gzip: bool = False) -> AsyncIterator[bytes]:
+    """UTF-8 encode, optionally as one continuous gzip member, logging failures mid-stream."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+    try:
+        async for chunk in chunks:
+            data = chunk.encode("utf-8")
+            if compressor:
+                data = compressor.compress(data)
+            if data:
+                yield data
+        if compressor:
+            yield compressor.flush()
+    except Exception as e:
+        # Headers are already sent, so the client sees a truncated body rather than a 500
+        logger.error(f"Export stream failed: {str(e)}")
+        raise
+
+
+# Columnar exports: column name -> arrow type. Low-cardinality text is dictionary-encoded.
+_DICTIONARY = "dictionary"
+COLUMNAR_TYPES = {
+    "id": "int64",
+    "title": "string",
+    "amount": "string",
+    "deadline": "timestamp",
+    "field_of_study": _DICTIONARY,
+    "level_of_study": _DICTIONARY,
+    "eligibility_criteria": "string",
+    "application_url": "string",
+    "source_url": "string",
+    "location_of_study": _DICTIONARY,
+    "confidence_score": "float64",
+    "amount_normalized_min": "float64",
+    "amount_normalized_max": "float64",
+    "amount_type": _DICTIONARY,
+    "is_renewable": "bool_",
+    "model_tier": _DICTIONARY,
+    "last_updated": "timestamp",
+    "created_at": "timestamp",
+}
+
+
+def columnar_available() -> bool:
+    return pa is not None
+
+
+def columnar_columns(names: Optional[Sequence[str]] = None) -> List[str]:
+    """Validate a column projection; raises ValueError naming unknown columns."""
+    if not names:
+        return list(COLUMNAR_TYPES)
+    unknown = [name for name in names if name not in COLUMNAR_TYPES]
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+    return list(dict.fromkeys(names))
+
+
+def _arrow_type(kind: str):
+    if kind == _DICTIONARY:
+        return pa.dictionary(pa.int32(), pa.string())
+    if kind == "timestamp":
+        return pa.timestamp("us")
+    return getattr(pa, kind)()
+
+
+def columnar_schema(names: Sequence[str]):
+    return pa.schema([pa.field(name, _arrow_type(COLUMNAR_TYPES[name])) for name in names])
+
+
+def record_batch(rows: Sequence[Sequence[Any]], schema):
+    """Build a typed RecordBatch from one partition of result rows."""
+    arrays = []
+    for index, field in enumerate(schema):
+        values = [row[index] for row in rows]
+        if pa.types.is_dictionary(field.type):
+            arrays.append(pa.array(values, type=pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands back whatever was written since the last take()."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        return len(data)
+
+    def take(self) -> bytes:
+        data, self._buffer = bytes(self._buffer), bytearray()
+        return data
+
+
+async def arrow_stream_chunks(batches: AsyncIterator[Sequence], names: Sequence[str]) -> AsyncIterator[bytes]:
+    """Arrow IPC stream: the schema, then one record batch per partition."""
+    schema = columnar_schema(names)
+    sink = _ChunkSink()
+    try:
+        with pa.ipc.new_stream(sink, schema) as writer:
+            yield sink.take()
+            async for rows in batches:
+                writer.write_batch(record_batch(rows, schema))
+                yield sink.take()
+        yield sink.take()
+    except Exception as e:
+        logger.error(f"Arrow export stream failed: {str(e)}")
+        raise
+
+
+async def parquet_chunks(
+    batches: AsyncIterator[Sequence],
+    names: Sequence[str],
+    row_group_size: int
+) -> AsyncIterator[bytes]:
+    """Parquet file written row group by row group; at most one row group is held in memory."""
+    schema = columnar_schema(names)
+    sink = _ChunkSink()
+    pending, pending_rows = [], 0
+    try:
+        with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+            async for rows in batches:
+                pending.append(record_batch(rows, schema))
+                pending_rows += len(rows)
+                if pending_rows >= row_group_size:
+                    writer.write_table(pa.Table.from_batches(pending, schema=schema))
+                    pending, pending_rows = [], 0
+                    yield sink.take()
+            if pending:
+                writer.write_table(pa.Table.from_batches(pending, schema=schema))
+        yield sink.take()
+    except Exception as e:
+        logger.error(f"Parquet export stream failed: {str(e)}")
+        raise
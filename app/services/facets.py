@@ -0,0 +1,176 @@
+# app/services/facets.py
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+import asyncio
+import logging
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.core.config import get_settings
+from app.models.schemas import Scholarship, ScholarshipChange
+from app.services.rollups import AMOUNT, AMOUNT_BUCKET_ORDER, DEADLINE_MONTH, FIELD, LEVEL, NO_DEADLINE, amount_bucket
+from app.utils.vocabulary import term_name, terms
+
+logger = logging.getLogger(__name__)
+
+DIMENSIONS = (FIELD, LEVEL, AMOUNT, DEADLINE_MONTH)
+
+# Columns a scholarship's facet values are derived from
+FACET_SOURCE_COLUMNS = (
+    Scholarship.id,
+    Scholarship.field_id,
+    Scholarship.level_id,
+    Scholarship.amount_normalized_max,
+    Scholarship.deadline,
+)
+
+
+def facet_values(row: Mapping[str, Any]) -> Dict[str, str]:
+    """The value a scholarship row has in each facet dimension."""
+    deadline = row.get('deadline')
+    return {
+        FIELD: str(row.get('field_id') or ''),
+        LEVEL: str(row.get('level_id') or ''),
+        AMOUNT: amount_bucket(row.get('amount_normalized_max')),
+        DEADLINE_MONTH: deadline.strftime('%Y-%m') if deadline else NO_DEADLINE,
+    }
+
+
+def _bitset(ids: Iterable[int], size: int) -> int:
+    """An int with bit n set for every id n, built in a bytearray rather than bit by bit."""
+    buffer = bytearray(size // 8 + 1)
+    for id in ids:
+        buffer[id >> 3] |= 1 << (id & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+def _label(dimension: str, value: str) -> str:
+    if dimension in (FIELD, LEVEL):
+        return term_name(int(value)) if value else 'Not specified'
+    return value
+
+
+def _order(dimension: str, values: Iterable[str]) -> List[str]:
+    """Display order: vocabulary id order, amount bucket order, then chronological months."""
+    values = set(values)
+    if dimension in (FIELD, LEVEL):
+        known = [str(term_id) for term_id, _ in terms(dimension)]
+        return [value for value in known if value in values] + sorted(values - set(known))
+    if dimension == AMOUNT:
+        return [label for label in AMOUNT_BUCKET_ORDER if label in values]
+    return sorted(values - {NO_DEADLINE}) + ([NO_DEADLINE] if NO_DEADLINE in values else [])
+
+
+class FacetIndex:
+    """
+    Per-value scholarship id bitsets, held in memory and counted by intersection.
+    Python ints serve as the bitsets: & and bit_count run in C over machine
+    words, so a count over every value of every dimension takes a few
+    milliseconds even at hundreds of thousands of rows.
+
+    The index follows the scholarship change log rather than hooking writes, so
+    it also sees rows written by other processes: every refresh clears the ids
+    changed since the last one and sets them again from their current rows.
+    """
+
+    def __init__(self, full_rebuild_changes: int = 50000):
+        self.full_rebuild_changes = full_rebuild_changes
+        self._lock = asyncio.Lock()
+        self._bits: Dict[Tuple[str, str], int] = {}
+        self._all = 0
+        self._seq: Optional[int] = None  # Last change applied; None until the first build
+
+    async def refresh(self, db: AsyncSession):
+        """Bring the index up to date with the change log, building it on first use."""
+        async with self._lock:
+            latest = (await db.execute(select(func.max(ScholarshipChange.seq)))).scalar() or 0
+            if self._seq is None or latest - self._seq > self.full_rebuild_changes:
+                await self._build(db, latest)
+            elif latest > self._seq:
+                await self._apply_changes(db, latest)
+
+    async def _build(self, db: AsyncSession, seq: int, batch_size: int = 10000):
+        # seq is read before the rows, so changes committed in between are applied again next refresh
+        ids_by_value = defaultdict(list)
+        ids = []
+        result = await db.stream(select(*FACET_SOURCE_COLUMNS).execution_options(yield_per=batch_size))
+        async for partition in result.mappings().partitions():
+            for row in partition:
+                for dimension, value in facet_values(row).items():
+                    ids_by_value[(dimension, value)].append(row['id'])
+                ids.append(row['id'])
+        size = max(ids, default=0)
+        self._bits = {key: _bitset(value_ids, size) for key, value_ids in ids_by_value.items()}
+        self._all = _bitset(ids, size)
+        self._seq = seq
+        logger.info(f"Built facet index over {len(ids)} scholarships")
+
+    async def _apply_changes(self, db: AsyncSession, latest: int):
+        changed = set((await db.execute(
+            select(ScholarshipChange.scholarship_id)
+            .where(ScholarshipChange.seq > self._seq, ScholarshipChange.seq <= latest)
+        )).scalars())
+        rows = (await db.execute(
+            select(*FACET_SOURCE_COLUMNS).where(Scholarship.id.in_(changed))
+        )).mappings().all()
+
+        size = max(changed)
+        ids_by_value = defaultdict(list)
+        for row in rows:
+            for dimension, value in facet_values(row).items():
+                ids_by_value[(dimension, value)].append(row['id'])
+        added = {key: _bitset(value_ids, size) for key, value_ids in ids_by_value.items()}
+
+        # Clear every changed id, then set the ones that still exist from their current values
+        keep = ~_bitset(changed, size)
+        for key in set(self._bits) | set(added):
+            bits = (self._bits.get(key, 0) & keep) | added.get(key, 0)
+            if bits:
+                self._bits[key] = bits
+            else:
+                self._bits.pop(key, None)
+        self._all = (self._all & keep) | _bitset((row['id'] for row in rows), size)
+        self._seq = latest
+
+    def counts(self, selected: Mapping[str, Sequence[str]]) -> Tuple[int, Dict[str, List[Tuple[str, str, int]]]]:
+        """
+        (matching total, dimension -> [(value, label, count)]) for the selected
+        values, OR-ed within a dimension and AND-ed across dimensions. Each
+        dimension is counted under the other dimensions' selections only, so
+        its unselected values show how many rows choosing them would add.
+        """
+        masks = {}
+        for dimension, values in selected.items():
+            if values:
+                mask = 0
+                for value in values:
+                    mask |= self._bits.get((dimension, value), 0)
+                masks[dimension] = mask
+
+        def intersect(skip: Optional[str] = None) -> int:
+            bits = self._all
+            for dimension, mask in masks.items():
+                if dimension != skip:
+                    bits &= mask
+            return bits
+
+        facets = {}
+        for dimension in DIMENSIONS:
+            scope = intersect(skip=dimension)
+            values = [value for key_dimension, value in self._bits if key_dimension == dimension]
+            facets[dimension] = [
+                (value, _label(dimension, value), (self._bits[(dimension, value)] & scope).bit_count())
+                for value in _order(dimension, values)
+            ]
+        return intersect().bit_count(), facets
+
+
+facet_index = FacetIndex(get_settings().FACET_FULL_REBUILD_CHANGES)
+
+
+async def warm_facet_index(session_factory: async_sessionmaker):
+    """Build the shared index ahead of its first request; a failure is retried by that request."""
+    try:
+        async with session_factory() as db:
+            await facet_index.refresh(db)
+    except Exception as e:
+        logger.error(f"Error building facet index: {str(e)}")
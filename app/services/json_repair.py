@@ -0,0 +1,64 @@
+# app/services/json_repair.py
+from typing import Any, Optional, Tuple
+import ast
+import json
+import re
+
+_FENCE_RE = re.compile(r'^```(?:json)?\s*|\s*```$', re.IGNORECASE)
+_TRAILING_COMMA_RE = re.compile(r',\s*([}\]])')
+_PY_LITERALS = {'True': 'true', 'False': 'false', 'None': 'null'}
+_PY_LITERAL_RE = re.compile(r'\b(True|False|None)\b')
+_DECODER = json.JSONDecoder()
+
+
+def _outermost_span(text: str) -> Optional[str]:
+    """Return the text between the first opening and last matching closing bracket."""
+    starts = [i for i in (text.find('{'), text.find('[')) if i != -1]
+    if not starts:
+        return None
+    start = min(starts)
+    closer = '}' if text[start] == '{' else ']'
+    end = text.rfind(closer)
+    if end <= start:
+        return None
+    return text[start:end + 1]
+
+
+def parse_json_lenient(text: Optional[str]) -> Tuple[Optional[Any], bool]:
+    """
+    Parse model output as JSON, repairing common defects if needed.
+    Returns (value, repaired); value is None when nothing could be recovered.
+    """
+    if not text:
+        return None, False
+
+    text = text.strip()
+    try:
+        return json.loads(text), False
+    except json.JSONDecodeError:
+        pass
+
+    candidate = _FENCE_RE.sub('', text)
+    candidate = _outermost_span(candidate) or candidate
+    candidate = _TRAILING_COMMA_RE.sub(r'\1', candidate)
+
+    # Prose before or after the payload: decode the first complete value only
+    try:
+        return _DECODER.raw_decode(candidate)[0], True
+    except json.JSONDecodeError:
+        pass
+
+    try:
+        return _DECODER.raw_decode(_PY_LITERAL_RE.sub(lambda m: _PY_LITERALS[m.group(1)], candidate))[0], True
+    except json.JSONDecodeError:
+        pass
+
+    # Single-quoted, Python-style dicts
+    try:
+        value = ast.literal_eval(candidate)
+        if isinstance(value, (dict, list)):
+            return value, True
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        pass
+
+    return None, False
@@ -0,0 +1,89 @@
+# app/services/listing.py
+from datetime import datetime
+from typing import Any, Iterable, List, Optional
+import json
+from sqlalchemy import Text, cast, select
+from sqlalchemy.sql import Select
+from app.models.schemas import Scholarship
+
+try:
+    import orjson
+except ImportError:  # The standard library encoder is slower but produces the same JSON
+    orjson = None
+
+# Response field -> column, in ScholarshipResponse order
+LIST_FIELDS = {
+    'id': Scholarship.id,
+    'title': Scholarship.title,
+    'amount': Scholarship.amount,
+    'deadline': Scholarship.deadline,
+    'deadline_kind': Scholarship.deadline_kind,
+    'field_of_study': Scholarship.field_of_study,
+    'level_of_study': Scholarship.level_of_study,
+    'eligibility_criteria': Scholarship.eligibility_criteria,
+    'application_url': Scholarship.application_url,
+    'source_url': Scholarship.source_url,
+    'confidence_score': Scholarship.confidence_score,
+    'ai_summary': cast(Scholarship.ai_summary, Text).label('ai_summary'),
+    'last_updated': Scholarship.last_updated,
+    'task_id': Scholarship.task_id,
+    'cluster_id': Scholarship.cluster_id,
+}
+
+# Read back as the database's JSON text and written into the response as-is
+RAW_JSON_FIELDS = {'ai_summary'}
+
+# Keyset pagination reads these from every row whether or not they are returned
+_CURSOR_FIELDS = ('last_updated', 'id')
+
+
+def list_fields(fields: Optional[str]) -> List[str]:
+    """
+    Response fields for a comma-separated `fields=` value, all of them when
+    empty. The id is always included. Raises ValueError for unknown names.
+    """
+    if not fields:
+        return list(LIST_FIELDS)
+    requested = {name.strip() for name in fields.split(',') if name.strip()}
+    unknown = requested - LIST_FIELDS.keys()
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}; choose from {', '.join(LIST_FIELDS)}")
+    return [name for name in LIST_FIELDS if name in requested or name == 'id']
+
+
+def list_query(names: Iterable[str]) -> Select:
+    """Plain column rows for `names` plus the cursor columns; no ORM entities or validators."""
+    names = set(names) | set(_CURSOR_FIELDS)
+    return select(*(column for name, column in LIST_FIELDS.items() if name in names))
+
+
+def _text(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _dumps(value: Any) -> bytes:
+    if orjson:
+        return orjson.dumps(value)
+    return json.dumps(value, default=_text, separators=(',', ':')).encode()
+
+
+def encode_list(rows: Iterable[Any], names: List[str]) -> bytes:
+    """
+    JSON array of `names` from each row. Raw JSON fields are spliced in after
+    the rest of the object instead of being parsed and re-encoded; an empty
+    value becomes null.
+    """
+    plain = [name for name in names if name not in RAW_JSON_FIELDS]
+    raw = [name for name in names if name in RAW_JSON_FIELDS]
+    items = []
+    for row in rows:
+        item = _dumps({name: getattr(row, name) for name in plain})
+        if raw:
+            item = item[:-1] + b''.join(
+                b',"' + name.encode() + b'":' + ((getattr(row, name) or '').encode() or b'null')
+                for name in raw
+            ) + b'}'
+        items.append(item)
+    return b'[' + b','.join(items) + b']'
@@ -0,0 +1,88 @@
+# app/services/metrics.py
+from collections import defaultdict
+from typing import Dict, Any
+import threading
+from app.core.config import get_settings
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimate the USD cost of a completion from the configured pricing table."""
+    pricing = get_settings().AI_MODEL_PRICING.get(model)
+    if not pricing:
+        return 0.0
+    prompt_price, completion_price = pricing
+    return (prompt_tokens / 1000) * prompt_price + (completion_tokens / 1000) * completion_price
+
+
+class AIMetrics:
+    """In-process counters for LLM calls, keyed by model."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models: Dict[str, Dict[str, Any]] = defaultdict(self._empty_entry)
+
+    @staticmethod
+    def _empty_entry() -> Dict[str, Any]:
+        return {
+            'tier': None,
+            'calls': 0,
+            'accepted': 0,
+            'escalated': 0,
+            'prompt_tokens': 0,
+            'completion_tokens': 0,
+            'cost_usd': 0.0,
+            'total_latency': 0.0,
+            'max_latency': 0.0,
+            'parsed': 0,
+            'repaired': 0,
+            'parse_failed': 0,
+        }
+
+    def record_call(self, model: str, tier: int, prompt_tokens: int, completion_tokens: int, latency: float):
+        """Record token usage, cost and latency of a single completion."""
+        with self._lock:
+            entry = self._models[model]
+            entry['tier'] = tier
+            entry['calls'] += 1
+            entry['prompt_tokens'] += prompt_tokens
+            entry['completion_tokens'] += completion_tokens
+            entry['cost_usd'] += estimate_cost(model, prompt_tokens, completion_tokens)
+            entry['total_latency'] += latency
+            entry['max_latency'] = max(entry['max_latency'], latency)
+
+    def record_outcome(self, model: str, outcome: str):
+        """Record whether a tier's result was accepted or escalated."""
+        with self._lock:
+            self._models[model][outcome] += 1
+
+    def record_parse(self, model: str, outcome: str):
+        """Record how a response parsed: 'parsed', 'repaired' or 'failed'."""
+        with self._lock:
+            self._models[model]['parse_failed' if outcome == 'failed' else outcome] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-model totals with derived averages."""
+        with self._lock:
+            result = {}
+            for model, entry in self._models.items():
+                calls = entry['calls']
+                parse_total = entry['parsed'] + entry['repaired'] + entry['parse_failed']
+                result[model] = {
+                    'tier': entry['tier'],
+                    'calls': calls,
+                    'accepted': entry['accepted'],
+                    'escalated': entry['escalated'],
+                    'prompt_tokens': entry['prompt_tokens'],
+                    'completion_tokens': entry['completion_tokens'],
+                    'cost_usd': round(entry['cost_usd'], 6),
+                    'avg_latency_ms': round(entry['total_latency'] / calls * 1000, 1) if calls else 0.0,
+                    'max_latency_ms': round(entry['max_latency'] * 1000, 1),
+                    'parsed': entry['parsed'],
+                    'repaired': entry['repaired'],
+                    'parse_failed': entry['parse_failed'],
+                    'parse_failure_rate': round(entry['parse_failed'] / parse_total, 4) if parse_total else 0.0,
+                }
+            return result
+
+
+ai_metrics = AIMetrics()
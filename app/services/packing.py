@@ -0,0 +1,85 @@
+# app/services/packing.py
+from functools import lru_cache
+from typing import List, Tuple
+import logging
+import math
+
+try:
+    import tiktoken
+except ImportError:  # Fall back to a character estimate
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Rough characters-per-token ratio used when no tokenizer is available
+CHARS_PER_TOKEN = 4
+# Tokens spent on the "### BLOCK <id>" header and separators around each block
+BLOCK_OVERHEAD_TOKENS = 8
+
+
+@lru_cache(maxsize=8)
+def _get_encoding(model: str):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"Tokenizer unavailable for {model}, estimating tokens: {str(e)}")
+        return None
+
+
+def count_tokens(text: str, model: str) -> int:
+    """Count tokens with the model's local tokenizer, or estimate them."""
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(encoding.encode(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str) -> str:
+    """Deterministically cut text down to at most max_tokens tokens."""
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    tokens = encoding.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
+
+
+def pack_blocks(
+    blocks: List[str],
+    model: str,
+    token_budget: int,
+    max_block_tokens: int
+) -> List[List[Tuple[str, str]]]:
+    """
+    Group text blocks into packs that each fit within token_budget.
+    Blocks keep their input order and are identified by their index in `blocks`.
+    Blocks longer than max_block_tokens (or the whole budget) are truncated.
+    """
+    block_limit = max(1, min(max_block_tokens, token_budget - BLOCK_OVERHEAD_TOKENS))
+    packs: List[List[Tuple[str, str]]] = []
+    current: List[Tuple[str, str]] = []
+    current_tokens = 0
+
+    for index, block in enumerate(blocks):
+        block_tokens = count_tokens(block, model)
+        if block_tokens > block_limit:
+            logger.debug(f"Truncating block {index} from {block_tokens} to {block_limit} tokens")
+            block = truncate_to_tokens(block, block_limit, model)
+            block_tokens = block_limit
+
+        cost = block_tokens + BLOCK_OVERHEAD_TOKENS
+        if current and current_tokens + cost > token_budget:
+            packs.append(current)
+            current, current_tokens = [], 0
+
+        current.append((str(index), block))
+        current_tokens += cost
+
+    if current:
+        packs.append(current)
+    return packs
@@ -0,0 +1,225 @@
+# app/services/resilience.py
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import time
+import openai
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class AIUnavailableError(Exception):
+    """
+    Raised when the AI provider is throttling or failing and the circuit is open.
+    Callers should requeue the affected work instead of degrading results.
+    """
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+        # Filled in by chunk processors so callers can resume where they stopped
+        self.partial_results: List[Dict[str, Any]] = []
+        self.pending_blocks: List[str] = []
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD limit on in-flight requests: additive increase, multiplicative decrease."""
+
+    def __init__(self, initial: int, minimum: int, maximum: int, decrease_factor: float = 0.5):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self._paused_until = 0.0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        while True:
+            delay = self._paused_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            async with self._condition:
+                if self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                await self._condition.wait()
+
+    async def release(self):
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self):
+        # Roughly +1 per window of `limit` successful requests
+        self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+
+    def on_throttle(self, retry_after: Optional[float] = None):
+        self.limit = max(self.minimum, self.limit * self.decrease_factor)
+        if retry_after:
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures; lets a single probe through after reset_timeout."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+
+    def retry_after(self) -> float:
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def allow_request(self) -> bool:
+        if self.state == self.OPEN and self.retry_after() == 0.0:
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            logger.info("AI circuit breaker closed")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def release_probe(self):
+        """Let another probe through when the one in flight ended without an outcome."""
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"AI circuit breaker opened after {self.failures} failures")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    async def wait_until_available(self, poll_interval: float = 1.0):
+        """Wait until the breaker is closed or ready to let a probe request through."""
+        while True:
+            if self.state == self.CLOSED or (self.state == self.HALF_OPEN and not self._probe_in_flight):
+                return
+            if self.state == self.OPEN:
+                remaining = self.retry_after()
+                if remaining == 0.0:
+                    return
+                await asyncio.sleep(remaining)
+                continue
+            # Half-open with a probe in flight: wait for its outcome
+            await asyncio.sleep(poll_interval)
+
+
+def _parse_retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, 'response', None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if headers.get('retry-after-ms'):
+            return float(headers['retry-after-ms']) / 1000
+        if headers.get('retry-after'):
+            return float(headers['retry-after'])
+    except ValueError:  # HTTP-date form, fall back to our own backoff
+        pass
+    return None
+
+
+def classify_error(error: Exception) -> Tuple[bool, Optional[float]]:
+    """Return (is_transient, retry_after) for an exception raised by the OpenAI client."""
+    if isinstance(error, openai.RateLimitError):
+        return True, _parse_retry_after(error)
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code >= 500, _parse_retry_after(error)
+    if isinstance(error, openai.APIConnectionError):  # Includes timeouts
+        return True, None
+    return False, None
+
+
+class OpenAIGuard:
+    """Shared concurrency limiter, retry policy and circuit breaker for OpenAI calls."""
+
+    def __init__(self):
+        settings = get_settings()
+        self.max_retries = settings.MAX_RETRIES
+        self.retry_delay = settings.RETRY_DELAY
+        self.limiter = AdaptiveConcurrencyLimiter(
+            initial=settings.AI_INITIAL_CONCURRENCY,
+            minimum=settings.AI_MIN_CONCURRENCY,
+            maximum=settings.AI_MAX_CONCURRENCY
+        )
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.AI_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=settings.AI_BREAKER_RESET_TIMEOUT
+        )
+
+    async def call(self, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Run an OpenAI request, backing off on 429/5xx and honoring Retry-After."""
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow_request():
+                raise AIUnavailableError("AI circuit breaker is open", retry_after=self.breaker.retry_after())
+
+            await self.limiter.acquire()
+            try:
+                result = await func(*args, **kwargs)
+            except asyncio.CancelledError:
+                self.breaker.release_probe()
+                raise
+            except Exception as e:
+                transient, retry_after = classify_error(e)
+                if not transient:
+                    # The provider answered, so it is reachable even though it rejected the request
+                    self.breaker.record_success()
+                    raise
+                last_error = e
+                self.limiter.on_throttle(retry_after)
+                self.breaker.record_failure()
+                delay = retry_after if retry_after is not None else self.retry_delay * (2 ** attempt)
+                logger.warning(f"Transient AI error (attempt {attempt + 1}/{self.max_retries + 1}), "
+                               f"concurrency now {int(self.limiter.limit)}: {str(e)}")
+            else:
+                self.limiter.on_success()
+                self.breaker.record_success()
+                return result
+            finally:
+                await self.limiter.release()
+
+            if attempt < self.max_retries:
+                await asyncio.sleep(delay)
+
+        raise AIUnavailableError(f"AI provider unavailable: {str(last_error)}", retry_after=self.breaker.retry_after())
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'state': self.breaker.state,
+            'consecutive_failures': self.breaker.failures,
+            'retry_after': round(self.breaker.retry_after(), 1),
+            'concurrency_limit': int(self.limiter.limit),
+            'in_flight': self.limiter.in_flight,
+        }
+
+
+@lru_cache()
+def get_openai_guard() -> OpenAIGuard:
+    """Get the process-wide OpenAI guard."""
+    return OpenAIGuard()
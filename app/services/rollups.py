@@ -0,0 +1,166 @@
+# app/services/rollups.py
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+from sqlalchemy import delete, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.storage import upsert_insert
+from app.models.schemas import Scholarship, ScholarshipRollup
+from app.utils.vocabulary import term_name
+
+TOTAL = 'total'
+FIELD = 'field'
+LEVEL = 'level'
+AMOUNT = 'amount'
+DEADLINE_MONTH = 'deadline_month'
+DAY = 'day'
+
+NOT_SPECIFIED = 'Not specified'
+NO_DEADLINE = 'No deadline'
+UNKNOWN_AMOUNT = 'Unknown'
+
+# (upper bound, label); amounts above the last bound fall into OPEN_AMOUNT_BUCKET
+AMOUNT_BUCKETS = (
+    (1000, 'Under $1,000'),
+    (5000, '$1,000 - $4,999'),
+    (10000, '$5,000 - $9,999'),
+    (25000, '$10,000 - $24,999'),
+)
+OPEN_AMOUNT_BUCKET = '$25,000+'
+AMOUNT_BUCKET_ORDER = [label for _, label in AMOUNT_BUCKETS] + [OPEN_AMOUNT_BUCKET, UNKNOWN_AMOUNT]
+
+# Columns a rollup key is derived from
+ROLLUP_SOURCE_COLUMNS = (
+    Scholarship.field_id,
+    Scholarship.level_id,
+    Scholarship.amount_normalized_max,
+    Scholarship.deadline,
+    Scholarship.last_updated,
+    Scholarship.confidence_score,
+)
+
+def amount_bucket(top: Optional[float]) -> str:
+    """Bucket a scholarship by its largest parsed amount (amount_normalized_max)."""
+    if top is None:
+        return UNKNOWN_AMOUNT
+    for bound, label in AMOUNT_BUCKETS:
+        if top < bound:
+            return label
+    return OPEN_AMOUNT_BUCKET
+
+
+def rollup_keys(row: Mapping[str, Any]) -> List[Tuple[str, str]]:
+    """Every (dimension, bucket) a scholarship row is counted under."""
+    deadline = row.get('deadline')
+    last_updated = row.get('last_updated')
+    keys = [
+        (TOTAL, ''),
+        (FIELD, term_name(row.get('field_id')) or NOT_SPECIFIED),
+        (LEVEL, term_name(row.get('level_id')) or NOT_SPECIFIED),
+        (AMOUNT, amount_bucket(row.get('amount_normalized_max'))),
+        (DEADLINE_MONTH, deadline.strftime('%Y-%m') if deadline else NO_DEADLINE),
+    ]
+    if last_updated:
+        keys.append((DAY, last_updated.strftime('%Y-%m-%d')))
+    return keys
+
+
+def rollup_deltas(
+    added: Iterable[Mapping[str, Any]] = (),
+    removed: Iterable[Mapping[str, Any]] = ()
+) -> Dict[Tuple[str, str], List[float]]:
+    """Net [row_count, confidence_sum, confidence_count] change per key."""
+    deltas = defaultdict(lambda: [0, 0.0, 0])
+    for rows, sign in ((added, 1), (removed, -1)):
+        for row in rows:
+            confidence = row.get('confidence_score')
+            for key in rollup_keys(row):
+                delta = deltas[key]
+                delta[0] += sign
+                if confidence is not None:
+                    delta[1] += sign * confidence
+                    delta[2] += sign
+    return {key: delta for key, delta in deltas.items() if any(delta)}
+
+
+async def apply_rollup_deltas(db: AsyncSession, deltas: Dict[Tuple[str, str], List[float]]):
+    """Add deltas to the rollup rows in the caller's transaction, dropping buckets that reach zero."""
+    if not deltas:
+        return
+    stmt = upsert_insert(db.bind.dialect.name, ScholarshipRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ScholarshipRollup.dimension, ScholarshipRollup.bucket],
+        set_={
+            'row_count': ScholarshipRollup.row_count + stmt.excluded.row_count,
+            'confidence_sum': ScholarshipRollup.confidence_sum + stmt.excluded.confidence_sum,
+            'confidence_count': ScholarshipRollup.confidence_count + stmt.excluded.confidence_count,
+        }
+    )
+    await db.execute(stmt, [
+        {'dimension': dimension, 'bucket': bucket, 'row_count': count,
+         'confidence_sum': confidence_sum, 'confidence_count': confidence_count}
+        for (dimension, bucket), (count, confidence_sum, confidence_count) in deltas.items()
+    ])
+    await db.execute(
+        delete(ScholarshipRollup)
+        .where(tuple_(ScholarshipRollup.dimension, ScholarshipRollup.bucket).in_(list(deltas)))
+        .where(ScholarshipRollup.row_count <= 0)
+    )
+
+
+async def existing_rollup_rows(db: AsyncSession, *conditions) -> List[Mapping[str, Any]]:
+    """Rollup source columns of the stored scholarships matching `conditions`."""
+    rows = await db.execute(select(*ROLLUP_SOURCE_COLUMNS).where(*conditions))
+    return [row._mapping for row in rows]
+
+
+async def rebuild_rollups(db: AsyncSession, batch_size: int = 1000) -> int:
+    """Recompute every rollup from the scholarships table. Returns the number of scholarships counted."""
+    deltas = defaultdict(lambda: [0, 0.0, 0])
+    counted = 0
+    result = await db.stream(select(*ROLLUP_SOURCE_COLUMNS).execution_options(yield_per=batch_size))
+    async for partition in result.mappings().partitions():
+        for key, delta in rollup_deltas(partition).items():
+            for i, value in enumerate(delta):
+                deltas[key][i] += value
+        counted += len(partition)
+
+    await db.execute(delete(ScholarshipRollup))
+    await apply_rollup_deltas(db, dict(deltas))
+    return counted
+
+
+async def scholarship_totals(db: AsyncSession) -> Tuple[int, float]:
+    """(count, average confidence) of all scholarships, from the single total rollup row."""
+    total = await db.get(ScholarshipRollup, (TOTAL, ''))
+    if total is None:
+        return 0, 0.0
+    return total.row_count, (total.confidence_sum / total.confidence_count) if total.confidence_count else 0.0
+
+
+async def read_rollups(db: AsyncSession, days: int = 7) -> Dict[str, Any]:
+    """Everything /scholarships/stats needs, read from the rollup table alone."""
+    since = (datetime.utcnow() - timedelta(days=days)).strftime('%Y-%m-%d')
+    rows = (await db.execute(
+        select(ScholarshipRollup)
+        .where(or_(ScholarshipRollup.dimension != DAY, ScholarshipRollup.bucket >= since))
+    )).scalars().all()
+
+    by_dimension = defaultdict(dict)
+    total = None
+    for row in rows:
+        if row.dimension == TOTAL:
+            total = row
+        else:
+            by_dimension[row.dimension][row.bucket] = row.row_count
+
+    amounts = by_dimension[AMOUNT]
+    return {
+        'total_count': total.row_count if total else 0,
+        'average_confidence': (total.confidence_sum / total.confidence_count) if total and total.confidence_count else 0.0,
+        'by_field_of_study': by_dimension[FIELD],
+        'by_level_of_study': by_dimension[LEVEL],
+        'daily_counts': dict(sorted(by_dimension[DAY].items())),
+        'amount_ranges': {label: amounts[label] for label in AMOUNT_BUCKET_ORDER if label in amounts},
+        'deadline_distribution': dict(sorted(by_dimension[DEADLINE_MONTH].items())),
+    }
@@ -0,0 +1,110 @@
+# app/services/search.py
+from typing import Any, List, Optional, Tuple
+import html
+import re
+from sqlalchemy import column, desc, func, literal_column, select, table
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.schemas import Scholarship
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+MARK_START, MARK_END = '<mark>', '</mark>'
+# Control characters the database wraps matches in. HTML escaping leaves them alone, so they become the
+# only <mark> tags in a fragment, however much markup the scraped text holds.
+_SENTINEL_START, _SENTINEL_END = '\x02', '\x03'
+_FTS_TABLE = table('scholarships_fts', column('rowid'))
+
+# bm25 column weights, in FTS table column order: title, eligibility, field, level
+_BM25_WEIGHTS = (10.0, 1.0, 4.0, 4.0)
+_HEADLINE_OPTIONS = f"StartSel=\"{_SENTINEL_START}\", StopSel=\"{_SENTINEL_END}\", MaxFragments=2, MaxWords=24, MinWords=8"
+
+
+def fts5_query(text: str) -> Optional[str]:
+    """
+    Turn free text into an FTS5 MATCH expression: every word is required, quoted so
+    user input cannot inject FTS operators, and the last word matches as a prefix.
+    """
+    terms = _TERM_RE.findall(text or '')
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def render_highlight(text: Optional[str]) -> Optional[str]:
+    """HTML-escape a highlighted fragment, then turn the database's match sentinels into <mark> tags."""
+    if text is None:
+        return None
+    return html.escape(text, quote=False)\
+        .replace(_SENTINEL_START, MARK_START)\
+        .replace(_SENTINEL_END, MARK_END)
+
+
+def _sqlite_search(text: str):
+    match = fts5_query(text)
+    if match is None:
+        return None
+    fts = literal_column('scholarships_fts')
+    # bm25 is lower-is-better; negate so both backends rank higher-is-better
+    rank = (-func.bm25(fts, *_BM25_WEIGHTS)).label('rank')
+    return (
+        select(
+            Scholarship,
+            rank,
+            func.highlight(fts, 0, _SENTINEL_START, _SENTINEL_END).label('title_highlight'),
+            func.snippet(fts, -1, _SENTINEL_START, _SENTINEL_END, '…', 24).label('snippet'),
+        )
+        .join(_FTS_TABLE, _FTS_TABLE.c.rowid == Scholarship.id)
+        .where(fts.op('MATCH')(match))
+        .order_by(desc('rank'), Scholarship.id)
+    )
+
+
+def _postgresql_search(text: str):
+    if not _TERM_RE.search(text or ''):
+        return None
+    query = func.websearch_to_tsquery('english', text)
+    vector = literal_column('scholarships.search_vector')
+    rank = func.ts_rank_cd(vector, query).label('rank')
+    body = func.concat_ws(' · ', Scholarship.field_of_study, Scholarship.level_of_study, Scholarship.eligibility_criteria)
+    return (
+        select(
+            Scholarship,
+            rank,
+            func.ts_headline('english', Scholarship.title, query, f"{_HEADLINE_OPTIONS}, HighlightAll=true").label('title_highlight'),
+            func.ts_headline('english', body, query, _HEADLINE_OPTIONS).label('snippet'),
+        )
+        .where(vector.op('@@')(query))
+        .order_by(desc('rank'), Scholarship.id)
+    )
+
+
+_SEARCH_BUILDERS = {
+    'sqlite': _sqlite_search,
+    'postgresql': _postgresql_search,
+}
+
+
+async def search_scholarships(
+    db: AsyncSession,
+    text: str,
+    conditions: List[Any] = (),
+    skip: int = 0,
+    limit: int = 20
+) -> List[Tuple[Scholarship, float, Optional[str], Optional[str]]]:
+    """Ranked full-text search; returns (scholarship, rank, title_highlight, snippet) rows."""
+    dialect = db.bind.dialect.name
+    builder = _SEARCH_BUILDERS.get(dialect)
+    if builder is None:
+        raise NotImplementedError(f"Full-text search is not supported on {dialect}")
+
+    query = builder(text)
+    if query is None:
+        return []
+    if conditions:
+        query = query.where(*conditions)
+    rows = (await db.execute(query.offset(skip).limit(limit))).all()
+    return [
+        (row.Scholarship, float(row.rank or 0.0), render_highlight(row.title_highlight), render_highlight(row.snippet))
+        for row in rows
+    ]
@@ -0,0 +1,350 @@
+# app/services/similarity.py
+from pathlib import Path
+from typing import Any, List, Mapping, Optional, Sequence, Tuple
+import asyncio
+import itertools
+import json
+import logging
+import os
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.core.config import get_settings
+from app.models.schemas import Scholarship, ScholarshipChange
+from app.utils.text_vectors import hashed_features
+
+try:
+    import numpy as np
+except ImportError:  # Similar-scholarship search is unavailable without numpy
+    np = None
+
+try:
+    import fcntl
+except ImportError:  # No advisory locks on Windows; run one process per SIMILARITY_INDEX_DIR there
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Columns a scholarship's vector is derived from
+SIMILARITY_SOURCE_COLUMNS = (
+    Scholarship.id,
+    Scholarship.title,
+    Scholarship.eligibility_criteria,
+    Scholarship.field_of_study,
+    Scholarship.level_of_study,
+)
+
+_VECTORS = 'vectors.f32'
+_LISTS = 'lists.i32'
+_IDF = 'idf.npy'
+_CENTROIDS = 'centroids.npy'
+_META = 'meta.json'
+_LOCK = '.lock'
+_MIN_CAPACITY = 1024
+_CHUNK_ROWS = 65536
+_ASSIGN_ROWS = 8192  # Each row scores every centroid, so assignment works in smaller chunks
+_KMEANS_ITERATIONS = 10
+_KMEANS_SAMPLE_PER_LIST = 40
+
+
+def _map(path: Path, dtype, shape: Tuple[int, ...]):
+    """Memory-map `path` with `shape`, extending the file with zeros first if it is shorter."""
+    size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+    with open(path, 'ab') as f:
+        if f.tell() < size:
+            f.truncate(size)
+    return np.memmap(path, dtype=dtype, mode='r+', shape=shape)
+
+
+class SimilarityIndex:
+    """
+    Hashed TF-IDF vectors of every scholarship in a memory-mapped float32
+    matrix, searched by cosine similarity. Row n holds scholarship id n (zeros
+    for ids that do not exist), so saves write their row in place and the OS
+    page cache, not the Python heap, holds the matrix.
+
+    Queries multiply the whole matrix by the query vector. From ivf_min_rows
+    indexed rows the index is also split into about sqrt(rows) k-means lists
+    and queries score only the rows of the `probes` lists nearest the query,
+    trading a little recall for time. IDF weights and list centroids are fixed
+    when the index is built; the rebuilds that follow large change bursts
+    refresh them.
+
+    Like the facet index it follows the scholarship change log, so rows saved
+    by the worker, or by any other process, are re-vectorized on the next
+    refresh. The files and the last applied change survive restarts.
+
+    A rebuild deletes and recreates the files, which must not happen under
+    another process that has them mapped, so each process locks a slot
+    directory of its own under `directory` and a restarted process reuses
+    whichever free slot it finds first.
+    """
+
+    def __init__(self, directory: str, dimensions: int = 256, ivf_min_rows: int = 200000,
+                 probes: int = 8, full_rebuild_changes: int = 50000):
+        self.root = Path(directory)
+        self.directory: Optional[Path] = None  # The claimed slot
+        self.dimensions = dimensions
+        self.ivf_min_rows = ivf_min_rows
+        self.probes = probes
+        self.full_rebuild_changes = full_rebuild_changes
+        self._lock = asyncio.Lock()
+        self._vectors = None  # (capacity, dimensions) memmap
+        self._lists = None  # (capacity,) memmap: IVF list + 1 of every row, 0 when unassigned
+        self._idf = None
+        self._centroids = None  # (lists, dimensions) once the index is approximate
+        self._rows = 0  # Rows with a non-zero vector
+        self._seq: Optional[int] = None  # Last change applied; None until loaded or built
+        self._slot_lock = None  # Open lock file of the claimed slot, held for the life of the process
+
+    @property
+    def rows(self) -> int:
+        return self._rows
+
+    @property
+    def approximate(self) -> bool:
+        return self._centroids is not None
+
+    # --- Storage ---
+
+    def _claim(self):
+        """Lock the first slot directory no other process holds and keep the index there."""
+        if self._slot_lock is not None:
+            return
+        for slot in itertools.count():
+            directory = self.root / f"slot-{slot}"
+            directory.mkdir(parents=True, exist_ok=True)
+            lock = open(directory / _LOCK, 'a')
+            try:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:  # Held by another process
+                lock.close()
+                continue
+            self._slot_lock, self.directory = lock, directory
+            return
+
+    def reset(self, capacity: int, idf=None):
+        """Start an empty index with room for ids below `capacity`."""
+        self._claim()
+        for name in (_META, _VECTORS, _LISTS, _CENTROIDS):
+            (self.directory / name).unlink(missing_ok=True)
+        self._vectors = self._lists = self._centroids = None
+        self._grow(max(capacity, _MIN_CAPACITY))
+        self._idf = np.ones(self.dimensions, dtype=np.float32) if idf is None else idf
+        self._rows = 0
+        self._seq = None
+
+    def _grow(self, capacity: int):
+        if self._vectors is not None:
+            if capacity <= len(self._vectors):
+                return
+            capacity = max(capacity, 2 * len(self._vectors))
+            self._vectors.flush()
+            self._lists.flush()
+        self._vectors = _map(self.directory / _VECTORS, np.float32, (capacity, self.dimensions))
+        self._lists = _map(self.directory / _LISTS, np.int32, (capacity,))
+
+    def save(self, seq: int):
+        """Flush the matrix, then record `seq` as applied. A crash in between only replays changes."""
+        self._vectors.flush()
+        self._lists.flush()
+        np.save(self.directory / _IDF, self._idf)
+        if self._centroids is not None:
+            np.save(self.directory / _CENTROIDS, self._centroids)
+        meta = {'seq': seq, 'dimensions': self.dimensions, 'capacity': len(self._vectors), 'rows': self._rows}
+        temporary = self.directory / f"{_META}.tmp"
+        temporary.write_text(json.dumps(meta))
+        os.replace(temporary, self.directory / _META)
+        self._seq = seq
+
+    def _load(self) -> bool:
+        self._claim()
+        try:
+            meta = json.loads((self.directory / _META).read_text())
+        except (OSError, ValueError):
+            return False
+        if meta.get('dimensions') != self.dimensions:
+            return False
+        self._grow(meta['capacity'])
+        self._idf = np.load(self.directory / _IDF)
+        centroids = self.directory / _CENTROIDS
+        self._centroids = np.load(centroids) if centroids.exists() else None
+        self._rows = meta['rows']
+        self._seq = meta['seq']
+        return True
+
+    # --- Vectors ---
+
+    def term_frequencies(self, rows: Sequence[Mapping[str, Any]]):
+        """(ids, unweighted term frequency matrix) for rows of SIMILARITY_SOURCE_COLUMNS."""
+        positions, buckets, weights = [], [], []
+        for position, row in enumerate(rows):
+            features = hashed_features(
+                row['title'], row['eligibility_criteria'], row['field_of_study'], row['level_of_study'], self.dimensions
+            )
+            positions.extend([position] * len(features))
+            buckets.extend(features)
+            weights.extend(features.values())
+        matrix = np.zeros((len(rows), self.dimensions), dtype=np.float32)
+        matrix[positions, buckets] = weights
+        return np.array([row['id'] for row in rows], dtype=np.int64), matrix
+
+    def _weigh(self, matrix):
+        """Apply IDF weights and scale each row to unit length, in place."""
+        matrix *= self._idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+    def _assign(self, matrix):
+        """IVF list + 1 of each row; 0 for empty rows."""
+        lists = np.argmax(matrix @ self._centroids.T, axis=1).astype(np.int32) + 1
+        lists[~matrix.any(axis=1)] = 0
+        return lists
+
+    def put(self, ids, frequencies):
+        """Write the vectors of `ids` from their term frequencies; an all-zero row removes an id."""
+        if not len(ids):
+            return
+        self._grow(int(ids.max()) + 1)
+        vectors = self._weigh(frequencies)
+        self._rows += int(vectors.any(axis=1).sum()) - int(self._vectors[ids].any(axis=1).sum())
+        self._vectors[ids] = vectors
+        if self._centroids is not None:
+            self._lists[ids] = self._assign(vectors)
+
+    def remove(self, ids):
+        ids = np.asarray([id for id in ids if id < len(self._vectors)], dtype=np.int64)
+        self.put(ids, np.zeros((len(ids), self.dimensions), dtype=np.float32))
+
+    def stage(self, ids, frequencies, document_frequencies) -> int:
+        """Write raw term frequencies during a build and count their documents; returns non-empty rows."""
+        self._grow(int(ids.max()) + 1)
+        self._vectors[ids] = frequencies
+        document_frequencies += np.count_nonzero(frequencies, axis=0)
+        return int(frequencies.any(axis=1).sum())
+
+    def finish_build(self, document_frequencies, documents: int):
+        """Turn a matrix of raw term frequencies into weighted vectors, then cluster it if large."""
+        self._idf = (np.log((1.0 + documents) / (1.0 + document_frequencies)) + 1.0).astype(np.float32)
+        for start in range(0, len(self._vectors), _CHUNK_ROWS):
+            self._weigh(self._vectors[start:start + _CHUNK_ROWS])
+        self._rows = documents
+        if documents >= self.ivf_min_rows:
+            self.train()
+
+    def train(self, seed: int = 0):
+        """Spherical k-means over a sample of rows, then assign every row to its nearest list."""
+        present = np.flatnonzero(self._vectors.any(axis=1))
+        lists = max(1, int(np.sqrt(len(present))))
+        rng = np.random.default_rng(seed)
+        sample = np.asarray(self._vectors[np.sort(rng.choice(present, min(len(present), lists * _KMEANS_SAMPLE_PER_LIST), replace=False))])
+        centroids = sample[rng.choice(len(sample), lists, replace=False)]
+        for _ in range(_KMEANS_ITERATIONS):
+            nearest = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, nearest, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # Lists that lost every sample keep their previous centroid
+            centroids = np.where(norms > 0, sums / np.where(norms > 0, norms, 1.0), centroids).astype(np.float32)
+        self._centroids = centroids
+        for start in range(0, len(self._vectors), _ASSIGN_ROWS):
+            self._lists[start:start + _ASSIGN_ROWS] = self._assign(self._vectors[start:start + _ASSIGN_ROWS])
+
+    # --- Search ---
+
+    def similar(self, id: int, limit: int, exact: bool = False) -> List[Tuple[int, float]]:
+        """Up to `limit` (id, cosine similarity) pairs most similar to scholarship `id`, best first."""
+        # Queries run in threads while a refresh may swap these out, so read each once
+        vectors, lists, centroids = self._vectors, self._lists, self._centroids
+        if vectors is None or id >= len(vectors):
+            return []
+        query = np.array(vectors[id])
+        if not query.any():
+            return []
+        if centroids is None or exact:
+            candidates = None
+            scores = vectors @ query
+            scores[id] = -1.0
+        else:
+            probes = np.argsort(centroids @ query)[-self.probes:] + 1
+            candidates = np.flatnonzero(np.isin(lists[:len(vectors)], probes))
+            scores = vectors[candidates] @ query
+            scores[candidates == id] = -1.0
+        limit = min(limit, len(scores))
+        top = np.argpartition(scores, -limit)[-limit:]
+        top = top[np.argsort(scores[top])[::-1]]
+        ids = top if candidates is None else candidates[top]
+        return [(int(match), float(score)) for match, score in zip(ids, scores[top]) if score > 0]
+
+    # --- Refresh ---
+
+    async def refresh(self, db: AsyncSession):
+        """Bring the index up to date with the change log, loading or building it on first use."""
+        async with self._lock:
+            if self._seq is None:
+                self._load()
+            latest = (await db.execute(select(func.max(ScholarshipChange.seq)))).scalar() or 0
+            # A change log behind the saved index means the database was replaced
+            if self._seq is None or latest < self._seq or latest - self._seq > self.full_rebuild_changes:
+                await self._build(db, latest)
+            elif latest > self._seq:
+                await self._apply_changes(db, latest)
+
+    async def _build(self, db: AsyncSession, seq: int, batch_size: int = 10000):
+        # seq is read before the rows, so changes committed in between are applied again next refresh
+        self.reset((await db.execute(select(func.max(Scholarship.id)))).scalar() or 0)
+        document_frequencies = np.zeros(self.dimensions, dtype=np.int64)
+        documents = 0
+        result = await db.stream(select(*SIMILARITY_SOURCE_COLUMNS).execution_options(yield_per=batch_size))
+        async for partition in result.mappings().partitions():
+            # Vectorizing is pure Python; a thread keeps the event loop serving requests meanwhile
+            ids, frequencies = await asyncio.to_thread(self.term_frequencies, partition)
+            documents += self.stage(ids, frequencies, document_frequencies)
+        await asyncio.to_thread(self.finish_build, document_frequencies, documents)
+        await asyncio.to_thread(self.save, seq)
+        logger.info(f"Built similarity index over {documents} scholarships")
+
+    async def _apply_changes(self, db: AsyncSession, latest: int):
+        changed = set((await db.execute(
+            select(ScholarshipChange.scholarship_id)
+            .where(ScholarshipChange.seq > self._seq, ScholarshipChange.seq <= latest)
+        )).scalars())
+        rows = (await db.execute(
+            select(*SIMILARITY_SOURCE_COLUMNS).where(Scholarship.id.in_(changed))
+        )).mappings().all()
+        await asyncio.to_thread(self._update, rows, changed - {row['id'] for row in rows}, latest)
+
+    def _update(self, rows: Sequence[Mapping[str, Any]], removed, seq: int):
+        """Re-vectorize changed `rows`, drop `removed` ids, then save as of change `seq`."""
+        if rows:
+            self.put(*self.term_frequencies(rows))
+        self.remove(removed)
+        if self._centroids is None and self._rows >= self.ivf_min_rows:
+            self.train()
+        self.save(seq)
+
+
+def _create_index() -> SimilarityIndex:
+    settings = get_settings()
+    return SimilarityIndex(
+        settings.SIMILARITY_INDEX_DIR,
+        dimensions=settings.SIMILARITY_DIMENSIONS,
+        ivf_min_rows=settings.SIMILARITY_IVF_MIN_ROWS,
+        probes=settings.SIMILARITY_IVF_PROBES,
+        full_rebuild_changes=settings.SIMILARITY_FULL_REBUILD_CHANGES,
+    )
+
+
+similarity_index = _create_index() if np is not None else None
+
+
+async def warm_similarity_index(session_factory: async_sessionmaker):
+    """Load or build the shared index ahead of its first request; a failure is retried by that request."""
+    if similarity_index is None:
+        return
+    try:
+        async with session_factory() as db:
+            await similarity_index.refresh(db)
+    except Exception as e:
+        logger.error(f"Error building similarity index: {str(e)}")
@@ -0,0 +1,81 @@
+# app/services/usage.py
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+import threading
+from app.services.metrics import estimate_cost
+
+# (task_id, domain) of the scraping task the current coroutine works for
+_current_scope: ContextVar[Optional[Tuple[int, str]]] = ContextVar('llm_usage_scope', default=None)
+
+
+class UsageTracker:
+    """Accumulates LLM usage per (task, domain, model, operation) until the worker persists it."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[int, str, str, str], Dict[str, Any]] = defaultdict(self._empty_entry)
+
+    @staticmethod
+    def _empty_entry() -> Dict[str, Any]:
+        return {
+            'calls': 0,
+            'prompt_tokens': 0,
+            'completion_tokens': 0,
+            'cost': 0.0,
+            'total_latency': 0.0,
+        }
+
+    @contextmanager
+    def scope(self, task_id: int, domain: str):
+        """Attribute every LLM call made inside this block to the given task and domain."""
+        token = _current_scope.set((task_id, domain))
+        try:
+            yield
+        finally:
+            _current_scope.reset(token)
+
+    def record(self, model: str, operation: str, completion: Any, latency: float):
+        """Record one completion against the current scope; calls outside a scope are not attributed."""
+        scope = _current_scope.get()
+        if scope is None:
+            return
+        usage = getattr(completion, 'usage', None)
+        prompt_tokens = usage.prompt_tokens if usage else 0
+        completion_tokens = usage.completion_tokens if usage else 0
+
+        with self._lock:
+            entry = self._pending[(scope[0], scope[1], model, operation)]
+            entry['calls'] += 1
+            entry['prompt_tokens'] += prompt_tokens
+            entry['completion_tokens'] += completion_tokens
+            entry['cost'] += estimate_cost(model, prompt_tokens, completion_tokens)
+            entry['total_latency'] += latency
+
+    def drain(self, task_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Remove and return the usage accumulated since the last drain, for one task or all."""
+        with self._lock:
+            keys = [key for key in self._pending if task_id is None or key[0] == task_id]
+            rows = []
+            for key in keys:
+                entry = self._pending.pop(key)
+                rows.append({
+                    'task_id': key[0],
+                    'domain': key[1],
+                    'model': key[2],
+                    'operation': key[3],
+                    **entry
+                })
+            return rows
+
+    def restore(self, rows: List[Dict[str, Any]]):
+        """Put drained rows back, for when writing them failed; usage recorded since is kept."""
+        with self._lock:
+            for row in rows:
+                entry = self._pending[(row['task_id'], row['domain'], row['model'], row['operation'])]
+                for column in entry:
+                    entry[column] += row[column]
+
+
+usage_tracker = UsageTracker()
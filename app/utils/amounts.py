@@ -0,0 +1,64 @@
+# app/utils/amounts.py
+from typing import Any, Dict, Optional
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+_AMOUNT_RE = re.compile(r'\$?\d+(?:,\d{3})*(?:\.\d{2})?')
+_RENEWABLE_RE = re.compile(r'renewable|per year|annual|yearly', re.I)
+
+
+def parse_amount(amount_str: Optional[str]) -> Dict[str, Any]:
+    """
+    Extract structured amount information from display text such as "$5,000"
+    or "$1,000 - $2,500 per year". One figure is a fixed amount, two or more
+    a range from the smallest to the largest.
+    """
+    default_amount = {
+        'type': 'unknown',
+        'min_amount': None,
+        'max_amount': None,
+        'is_renewable': False,
+        'duration': None,
+        'display_amount': 'Not specified'
+    }
+
+    if not amount_str or not isinstance(amount_str, str):
+        return default_amount
+
+    try:
+        amount_info = default_amount.copy()
+        amount_info['display_amount'] = amount_str
+
+        # Look for patterns like "$5,000" or "up to $10,000"
+        amount_matches = _AMOUNT_RE.findall(amount_str)
+        if amount_matches:
+            amounts = [float(re.sub(r'[$,]', '', amt)) for amt in amount_matches]
+            if len(amounts) == 1:
+                amount_info['type'] = 'fixed'
+                amount_info['min_amount'] = amounts[0]
+                amount_info['max_amount'] = amounts[0]
+            elif len(amounts) >= 2:
+                amount_info['type'] = 'range'
+                amount_info['min_amount'] = min(amounts)
+                amount_info['max_amount'] = max(amounts)
+
+        # Check for renewable scholarships
+        if _RENEWABLE_RE.search(amount_str):
+            amount_info['is_renewable'] = True
+
+        return amount_info
+    except Exception as e:
+        logger.error(f"Error parsing amount '{amount_str}': {str(e)}")
+        return default_amount
+
+
+def amount_columns(amount_info: Dict[str, Any]) -> Dict[str, Any]:
+    """Scholarship column values for a parse_amount result."""
+    return {
+        'amount_normalized_min': amount_info.get('min_amount'),
+        'amount_normalized_max': amount_info.get('max_amount'),
+        'amount_type': amount_info.get('type', 'unknown'),
+        'is_renewable': bool(amount_info.get('is_renewable')),
+    }
@@ -0,0 +1,126 @@
+# app/utils/deadlines.py
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+import re
+
+DATE, RECURRING, ROLLING, UNKNOWN = 'date', 'recurring', 'rolling', 'unknown'
+DEADLINE_KINDS = (DATE, RECURRING, ROLLING, UNKNOWN)
+
+_MONTHS = {
+    'january': 1, 'jan': 1, 'february': 2, 'feb': 2, 'march': 3, 'mar': 3, 'april': 4, 'apr': 4,
+    'may': 5, 'june': 6, 'jun': 6, 'july': 7, 'jul': 7, 'august': 8, 'aug': 8,
+    'september': 9, 'sept': 9, 'sep': 9, 'october': 10, 'oct': 10, 'november': 11, 'nov': 11,
+    'december': 12, 'dec': 12,
+}
+_MONTH = '|'.join(sorted(_MONTHS, key=len, reverse=True))
+_DAY = r'\d{1,2}(?:st|nd|rd|th)?'
+
+# Every supported layout in one alternation, so a single search finds the first
+# date in the text and the group that matched says how to read it
+_DETECTOR = re.compile(
+    r'\b(?:'
+    r'(?P<iso_y>\d{4})[-/.](?P<iso_m>\d{1,2})[-/.](?P<iso_d>\d{1,2})'  # 2025-03-01, 2025/03/01T00:00:00
+    r'|(?P<num_a>\d{1,2})(?P<num_sep>[-/.])(?P<num_b>\d{1,2})(?P=num_sep)(?P<num_y>\d{4}|\d{2})'  # 01-03-2025, 03/01/25
+    rf'|(?P<md_m>{_MONTH})\.?\s+(?P<md_d>{_DAY})\b(?:,?\s*(?P<md_y>\d{{4}}))?'  # March 1st, 2025; Mar. 1
+    rf'|(?P<dm_d>{_DAY})\s+(?:of\s+)?(?P<dm_m>{_MONTH})\b\.?(?:,?\s*(?P<dm_y>\d{{4}}))?'  # 1 March 2025; 1st of March
+    r')(?!\d)',
+    re.IGNORECASE
+)
+_ROLLING_RE = re.compile(
+    r'\b(?:rolling|ongoing|open until filled|until filled|year[- ]round|continuous(?:ly)?|any ?time|no deadline)\b',
+    re.IGNORECASE
+)
+_ANNUAL_RE = re.compile(r'\b(?:annual(?:ly)?|yearly|every year|each year)\b', re.IGNORECASE)
+
+
+class Deadline(NamedTuple):
+    kind: str  # date, recurring, rolling or unknown
+    date: Optional[datetime] = None  # For recurring deadlines stated without a year, the next occurrence
+
+
+def _day(text: str) -> int:
+    return int(text.rstrip('stndrdthSTNDRDTH'))
+
+
+@lru_cache(maxsize=4096)
+def _detect(text: str) -> Tuple[str, Optional[int], Optional[int], Optional[int]]:
+    """(kind, year, month, day) read from `text`; year is None for a month and day alone."""
+    match = _DETECTOR.search(text)
+    if match:
+        if match.group('iso_y'):
+            year, month, day = int(match.group('iso_y')), int(match.group('iso_m')), int(match.group('iso_d'))
+        elif match.group('num_a'):
+            first, second = int(match.group('num_a')), int(match.group('num_b'))
+            year = int(match.group('num_y'))
+            year += 2000 if year < 100 else 0
+            # Slashes read month first and dashes or dots day first, unless only the other order is valid
+            month_first = match.group('num_sep') == '/'
+            if first > 12 or second > 12:
+                month_first = second > 12
+            month, day = (first, second) if month_first else (second, first)
+        elif match.group('md_m'):
+            month, day = _MONTHS[match.group('md_m').lower()], _day(match.group('md_d'))
+            year = int(match.group('md_y')) if match.group('md_y') else None
+        else:
+            month, day = _MONTHS[match.group('dm_m').lower()], _day(match.group('dm_d'))
+            year = int(match.group('dm_y')) if match.group('dm_y') else None
+        try:
+            date(year or 2000, month, day)  # 2000 is a leap year, so February 29 passes without a year
+        except ValueError:
+            return UNKNOWN, None, None, None
+        if year is None or _ANNUAL_RE.search(text):
+            return RECURRING, year, month, day
+        return DATE, year, month, day
+    if _ROLLING_RE.search(text):
+        return ROLLING, None, None, None
+    return UNKNOWN, None, None, None
+
+
+def _next_occurrence(month: int, day: int, today: date) -> Optional[datetime]:
+    for year in range(today.year, today.year + 8):
+        try:
+            candidate = date(year, month, day)
+        except ValueError:  # February 29 outside a leap year
+            continue
+        if candidate >= today:
+            return datetime(candidate.year, candidate.month, candidate.day)
+    return None
+
+
+def normalize_deadline(text: Optional[str], today: Optional[date] = None) -> Deadline:
+    """
+    Classify deadline text such as "2025-03-01", "March 1st", "1 March 2025"
+    or "Rolling". Detection is memoized on the whitespace-normalized text;
+    only resolving a yearless date against `today` happens on every call.
+    """
+    if not text or not isinstance(text, str):
+        return Deadline(UNKNOWN)
+    kind, year, month, day = _detect(' '.join(text.split()))
+    if kind in (ROLLING, UNKNOWN):
+        return Deadline(kind)
+    if year is None:
+        return Deadline(kind, _next_occurrence(month, day, today or date.today()))
+    return Deadline(kind, datetime(year, month, day))
+
+
+def normalize_deadlines(texts: Iterable[Optional[str]], today: Optional[date] = None) -> List[Deadline]:
+    """normalize_deadline for many values at once, each distinct string classified once."""
+    today = today or date.today()
+    distinct: Dict[Optional[str], Deadline] = {}
+    results = []
+    for text in texts:
+        if text not in distinct:
+            distinct[text] = normalize_deadline(text, today)
+        results.append(distinct[text])
+    return results
+
+
+def mark_recurring(deadline: Deadline, is_recurring: Any) -> Deadline:
+    """A dated deadline whose source, such as the AI summary, says it repeats every year."""
+    return deadline._replace(kind=RECURRING) if deadline.kind == DATE and is_recurring else deadline
+
+
+def deadline_columns(deadline: Deadline) -> Dict[str, Any]:
+    """Scholarship column values for a normalize_deadline result."""
+    return {'deadline': deadline.date, 'deadline_kind': deadline.kind}
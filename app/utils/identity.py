@@ -0,0 +1,39 @@
+# app/utils/identity.py
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import hashlib
+import re
+import unicodedata
+
+_NON_WORD_RE = re.compile(r'[\W_]+', re.UNICODE)
+_TRACKING_PARAMS = ('utm_', 'fbclid', 'gclid', 'mc_cid', 'mc_eid')
+
+
+def normalize_title(title: Optional[str]) -> str:
+    """Case-, width- and punctuation-insensitive form of a title."""
+    text = unicodedata.normalize('NFKC', title or '').casefold()
+    return _NON_WORD_RE.sub(' ', text).strip()
+
+
+def normalize_domain(url: Optional[str]) -> str:
+    host = (urlsplit(url or '').hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def normalize_url(url: Optional[str]) -> str:
+    """Drop scheme, www., fragment, trailing slash and tracking parameters; sort the query."""
+    parts = urlsplit((url or '').strip())
+    if not parts.netloc:
+        return (url or '').strip().lower()
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith(_TRACKING_PARAMS)
+    )
+    path = parts.path.rstrip('/')
+    return urlunsplit(('', normalize_domain(url), path, urlencode(query), '')).lstrip('/')
+
+
+def scholarship_identity_key(title: Optional[str], application_url: Optional[str], source_url: Optional[str]) -> str:
+    """Stable key for one award: the same scholarship re-crawled maps to the same key."""
+    parts = (normalize_title(title), normalize_url(application_url), normalize_domain(source_url))
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
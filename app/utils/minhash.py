@@ -0,0 +1,81 @@
+# app/utils/minhash.py
+from array import array
+from typing import Iterable, List, Optional, Set, Tuple
+import hashlib
+import random
+from app.utils.identity import normalize_title
+
+# 16 bands of 4 rows: pairs at Jaccard 0.8 share a band with probability 0.9998,
+# pairs at 0.3 with 0.12. Stored signatures and bands depend on all of these, so
+# changing them means re-running scripts/cluster_duplicates.py --reindex.
+NUM_PERM = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_WORDS = 3
+
+_PRIME = (1 << 61) - 1
+_MASK32 = (1 << 32) - 1
+_rng = random.Random(1337)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+
+def _hash64(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def shingles(title: Optional[str], eligibility: Optional[str]) -> Set[str]:
+    """Overlapping word n-grams of the normalized title and eligibility text."""
+    words = normalize_title(f"{title or ''} {eligibility or ''}").split()
+    if len(words) < SHINGLE_WORDS:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def signature(title: Optional[str], eligibility: Optional[str]) -> Optional[bytes]:
+    """NUM_PERM 32-bit minimum hashes packed as bytes, or None when there is no text."""
+    hashes = [_hash64(shingle) for shingle in shingles(title, eligibility)]
+    if not hashes:
+        return None
+    return array('I', [
+        min((a * h + b) % _PRIME for h in hashes) & _MASK32 for a, b in _PERMUTATIONS
+    ]).tobytes()
+
+
+def _values(packed: bytes) -> array:
+    values = array('I')
+    values.frombytes(packed)
+    return values
+
+
+def band_buckets(packed: bytes) -> List[Tuple[int, int]]:
+    """(band, bucket) LSH keys; two signatures sharing any key are duplicate candidates."""
+    buckets = []
+    for band in range(BANDS):
+        rows = packed[band * ROWS_PER_BAND * 4:(band + 1) * ROWS_PER_BAND * 4]
+        # Signed 63-bit so it fits a BigInteger column on every backend
+        buckets.append((band, int.from_bytes(hashlib.blake2b(rows, digest_size=8).digest(), 'little') >> 1))
+    return buckets
+
+
+def similarity(first: bytes, second: bytes) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    a, b = _values(first), _values(second)
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_PERM
+
+
+def similar_pairs(signatures: Iterable[Tuple[int, bytes]], threshold: float) -> List[Tuple[int, int]]:
+    """(id, id) pairs at or above `threshold`, compared only within shared LSH buckets."""
+    by_id = dict(signatures)
+    members = {}
+    for id, packed in by_id.items():
+        for key in band_buckets(packed):
+            members.setdefault(key, []).append(id)
+    pairs = set()
+    for ids in members.values():
+        # Comparing against the bucket's first member keeps each bucket linear;
+        # members similar to each other but not to it meet again in another band
+        first = ids[0]
+        for other in ids[1:]:
+            if (first, other) not in pairs and similarity(by_id[first], by_id[other]) >= threshold:
+                pairs.add((first, other))
+    return sorted(pairs)
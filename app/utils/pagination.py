@@ -0,0 +1,116 @@
+# app/utils/pagination.py
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, List, Optional
+import base64
+import json
+from fastapi import Response
+from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+PREV_CURSOR_HEADER = "X-Prev-Cursor"
+
+
+@dataclass
+class Cursor:
+    sort_value: Optional[datetime]
+    id: int
+    backward: bool = False
+
+
+@dataclass
+class Page:
+    items: List[Any] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+def encode_cursor(sort_value: Optional[datetime], id: int, backward: bool = False) -> str:
+    """Opaque token for the position just past (sort_value, id)."""
+    payload = [sort_value.isoformat() if sort_value else None, id, 1 if backward else 0]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def decode_cursor(token: str) -> Cursor:
+    """Raises ValueError for tokens that were not produced by encode_cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        sort_value, id, backward = json.loads(raw)
+        return Cursor(datetime.fromisoformat(sort_value) if sort_value else None, int(id), bool(backward))
+    except (TypeError, ValueError, json.JSONDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {token}") from e
+
+
+def _after(sort_column, id_column, cursor: Cursor):
+    """
+    Rows strictly after the cursor in (sort DESC NULLS LAST, id DESC) order, or
+    before it when paging backward. NULLs are handled explicitly because SQLite
+    and Postgres disagree on where they sort by default.
+    """
+    if not cursor.backward:
+        if cursor.sort_value is None:
+            return and_(sort_column.is_(None), id_column < cursor.id)
+        return or_(
+            sort_column < cursor.sort_value,
+            and_(sort_column == cursor.sort_value, id_column < cursor.id),
+            sort_column.is_(None)
+        )
+    if cursor.sort_value is None:
+        return or_(sort_column.is_not(None), id_column > cursor.id)
+    return or_(
+        sort_column > cursor.sort_value,
+        and_(sort_column == cursor.sort_value, id_column > cursor.id)
+    )
+
+
+async def paginate_keyset(
+    db: AsyncSession,
+    query: Select,
+    sort_column,
+    id_column,
+    limit: int,
+    cursor: Optional[str] = None,
+    scalars: bool = True
+) -> Page:
+    """
+    Newest-first keyset pagination over (sort_column, id_column). `query` must
+    select a single entity and carry no ORDER BY, or with scalars=False select
+    plain columns including the sort and id columns; items are then rows.
+    Raises ValueError on a bad cursor.
+    """
+    position = decode_cursor(cursor) if cursor else None
+    backward = bool(position and position.backward)
+
+    if position:
+        query = query.where(_after(sort_column, id_column, position))
+    if backward:
+        query = query.order_by(sort_column.asc().nulls_first(), id_column.asc())
+    else:
+        query = query.order_by(sort_column.desc().nulls_last(), id_column.desc())
+
+    result = await db.execute(query.limit(limit + 1))
+    rows = result.scalars().all() if scalars else result.all()
+    has_more = len(rows) > limit
+    rows = list(rows[:limit])
+    if backward:
+        rows.reverse()
+
+    page = Page(items=rows)
+    if not rows:
+        return page
+
+    key = lambda row: (getattr(row, sort_column.key), getattr(row, id_column.key))
+    if has_more or backward:
+        page.next_cursor = encode_cursor(*key(rows[-1]))
+    if position and (has_more or not backward):
+        page.prev_cursor = encode_cursor(*key(rows[0]), backward=True)
+    return page
+
+
+def set_cursor_headers(response: Response, page: Page):
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    if page.prev_cursor:
+        response.headers[PREV_CURSOR_HEADER] = page.prev_cursor
@@ -0,0 +1,39 @@
+# app/utils/text_vectors.py
+from typing import Dict, Optional
+import math
+import zlib
+from app.utils.identity import normalize_title
+
+# Title words count double: two listings sharing a title are closer than two sharing boilerplate
+TITLE_WEIGHT = 2.0
+
+
+def _features(text: Optional[str]):
+    words = normalize_title(text).split()
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+
+def hashed_features(
+    title: Optional[str],
+    eligibility: Optional[str],
+    field_of_study: Optional[str],
+    level_of_study: Optional[str],
+    dimensions: int
+) -> Dict[int, float]:
+    """
+    Signed, sublinear term frequencies of the word unigrams and bigrams of a
+    scholarship's text, hashed into `dimensions` buckets. crc32 rather than
+    hash() so vectors written by one process match those of another.
+    """
+    counts: Dict[int, float] = {}
+    for text, weight in ((title, TITLE_WEIGHT), (eligibility, 1.0), (field_of_study, 1.0), (level_of_study, 1.0)):
+        for feature in _features(text):
+            key = zlib.crc32(feature.encode('utf-8'))
+            counts[key] = counts.get(key, 0.0) + weight
+    buckets: Dict[int, float] = {}
+    for key, count in counts.items():
+        # The top bit picks the sign so colliding features tend to cancel rather than add up
+        sign = 1.0 if key & 0x80000000 else -1.0
+        bucket = key % dimensions
+        buckets[bucket] = buckets.get(bucket, 0.0) + sign * (1.0 + math.log(count))
+    return buckets
@@ -0,0 +1,173 @@
+# app/utils/vocabulary.py
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+import difflib
+import re
+import unicodedata
+
+FIELD = 'field'
+LEVEL = 'level'
+
+# (id, dimension, canonical name). Scholarships store these ids, so terms may be
+# added but never renumbered; a migration seeds new terms into vocabulary_terms.
+TERMS = (
+    (1, FIELD, 'Not specified'),
+    (2, FIELD, 'Any field'),
+    (3, FIELD, 'Multiple fields'),
+    (4, FIELD, 'STEM'),
+    (5, FIELD, 'Agriculture and Environment'),
+    (6, FIELD, 'Arts and Humanities'),
+    (7, FIELD, 'Business and Economics'),
+    (8, FIELD, 'Computer Science and IT'),
+    (9, FIELD, 'Education'),
+    (10, FIELD, 'Engineering'),
+    (11, FIELD, 'Health and Medicine'),
+    (12, FIELD, 'Sciences and Mathematics'),
+    (13, FIELD, 'Social Sciences'),
+    (14, FIELD, 'Other'),
+    (101, LEVEL, 'Not specified'),
+    (102, LEVEL, 'Any level'),
+    (103, LEVEL, 'High school'),
+    (104, LEVEL, 'College and vocational'),
+    (105, LEVEL, 'Post-secondary'),
+    (106, LEVEL, 'Undergraduate'),
+    (107, LEVEL, 'Graduate'),
+    (108, LEVEL, 'Multiple levels'),
+    (109, LEVEL, 'Other'),
+)
+
+FIELD_NOT_SPECIFIED, FIELD_OTHER = 1, 14
+LEVEL_NOT_SPECIFIED, LEVEL_MULTIPLE, LEVEL_OTHER = 101, 108, 109
+
+# Terms that say nothing about a value beyond "no specific match"
+CATCH_ALL_TERMS = frozenset({FIELD_NOT_SPECIFIED, FIELD_OTHER, LEVEL_NOT_SPECIFIED, LEVEL_OTHER, LEVEL_MULTIPLE})
+
+# Whole values (after normalize) that mean a term only when they are all there is;
+# canonical names always map to their own term
+EXACT = {
+    FIELD_NOT_SPECIFIED: ('not specified', 'unknown', 'none', 'n a', 'not applicable'),
+    2: ('any', 'all', 'various', 'open', 'general', 'open to all'),
+    LEVEL_NOT_SPECIFIED: ('not specified', 'unknown', 'none', 'n a', 'not applicable'),
+    102: ('any', 'all', 'various', 'open', 'all levels', 'any level', 'open to all'),
+}
+
+# Phrases found anywhere in a value; the longest phrase wins where several overlap
+PHRASES = {
+    2: ('any field', 'all fields', 'any discipline', 'all disciplines', 'any program', 'all programs',
+        'any degree', 'any undergraduate degree', 'any major', 'all majors'),
+    3: ('multiple fields', 'several fields', 'various fields', 'multiple disciplines'),
+    4: ('stem', 'steam', 'science technology engineering and mathematics',
+        'science technology engineering and math', 'science technology engineering math'),
+    5: ('agriculture', 'agricultural', 'crop science', 'animal health', 'animal science', 'forestry',
+        'forest', 'environment', 'environmental', 'conservation', 'ecology', 'sustainability',
+        'veterinary'),
+    6: ('art', 'arts', 'fine arts', 'music', 'humanities', 'history', 'philosophy', 'languages',
+        'linguistics', 'literature', 'english', 'french', 'native studies', 'indigenous studies',
+        'black studies', 'african studies', 'caribbean studies', 'design', 'theatre', 'film',
+        'journalism', 'communications'),
+    7: ('business', 'commerce', 'accounting', 'finance', 'economics', 'marketing', 'management',
+        'entrepreneurship', 'mba', 'public relations'),
+    8: ('computer science', 'computing science', 'computing', 'computer', 'information technology',
+        'software', 'data science', 'cybersecurity', 'informatics', 'technology'),
+    9: ('education', 'teaching', 'teacher'),
+    10: ('engineering', 'engineer'),
+    11: ('health', 'health sciences', 'mental health', 'public health', 'medicine', 'medical',
+         'nursing', 'nutrition', 'kinesiology', 'pharmacy', 'dentistry', 'physiotherapy',
+         'sport', 'sports', 'recreation'),
+    12: ('science', 'sciences', 'natural sciences', 'applied science', 'biology', 'chemistry',
+         'biochemistry', 'physics', 'mathematics', 'math', 'statistics'),
+    13: ('psychology', 'sociology', 'social sciences', 'social science', 'social work',
+         'political science', 'anthropology', 'criminology', 'humanitarian', 'community',
+         'advocacy', 'law', 'public policy'),
+    103: ('high school', 'secondary school', 'grade 12', 'grade twelve'),
+    104: ('college', 'community college', 'vocational', 'technical', 'trade', 'trades',
+          'apprenticeship', 'diploma', 'certificate'),
+    105: ('post secondary', 'postsecondary', 'college or university', 'university', 'tertiary',
+          'higher education'),
+    106: ('undergraduate', 'undergrad', 'bachelor', 'bachelors', 'bachelor s', 'bsc', 'ba', 'bs',
+          'freshman', 'first year'),
+    107: ('graduate', 'postgraduate', 'post graduate', 'master', 'masters', 'master s', 'msc',
+          'doctoral', 'doctorate', 'phd', 'postdoctoral'),
+}
+
+# Minimum difflib ratio for a misspelt word to count as a one-word phrase
+FUZZY_CUTOFF = 0.85
+_FUZZY_MIN_LENGTH = 5
+
+_NAMES = {term_id: name for term_id, _, name in TERMS}
+_DIMENSIONS = {term_id: dimension for term_id, dimension, _ in TERMS}
+
+
+def normalize(text: Optional[str]) -> str:
+    """Lowercase ASCII words separated by single spaces."""
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode()
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', text.lower()).split())
+
+
+def _matcher(dimension: str):
+    exact = {normalize(name): term_id for term_id, term_dimension, name in TERMS if term_dimension == dimension}
+    exact.update({phrase: term_id for term_id, phrases in EXACT.items()
+                  if _DIMENSIONS[term_id] == dimension for phrase in phrases})
+    phrases = {phrase: term_id for term_id, candidates in PHRASES.items()
+               if _DIMENSIONS[term_id] == dimension for phrase in candidates}
+    # Longest first so the regex prefers "computer science" over "science" at the same position
+    pattern = re.compile(r'\b(?:' + '|'.join(map(re.escape, sorted(phrases, key=len, reverse=True))) + r')\b')
+    words = [phrase for phrase in phrases if ' ' not in phrase and len(phrase) >= _FUZZY_MIN_LENGTH]
+    return exact, phrases, pattern, words
+
+
+_MATCHERS = {dimension: _matcher(dimension) for dimension in (FIELD, LEVEL)}
+
+
+def _matches(dimension: str, text: str) -> List[int]:
+    """Term ids of the phrases in `text`, in order of appearance, falling back to fuzzy word matches."""
+    _, phrases, pattern, words = _MATCHERS[dimension]
+    found = [phrases[match.group(0)] for match in pattern.finditer(text)]
+    if found:
+        return found
+    for word in text.split():
+        if len(word) >= _FUZZY_MIN_LENGTH:
+            close = difflib.get_close_matches(word, words, n=1, cutoff=FUZZY_CUTOFF)
+            if close:
+                found.append(phrases[close[0]])
+    return found
+
+
+@lru_cache(maxsize=4096)  # Extracted values repeat a lot and fuzzy matching is comparatively slow
+def canonical_term(dimension: str, value: Optional[str]) -> int:
+    """
+    Vocabulary id for a free-form field or level of study. A field goes to the
+    first subject it names; a level naming several distinct levels is "Multiple
+    levels". Values nothing matches are "Other".
+    """
+    text = normalize(value)
+    exact = _MATCHERS[dimension][0]
+    if not text:
+        return FIELD_NOT_SPECIFIED if dimension == FIELD else LEVEL_NOT_SPECIFIED
+    if text in exact:
+        return exact[text]
+
+    found = _matches(dimension, text)
+    if dimension == FIELD:
+        return found[0] if found else FIELD_OTHER
+    distinct = set(found)
+    if len(distinct) > 1:
+        return LEVEL_MULTIPLE
+    return found[0] if found else LEVEL_OTHER
+
+
+def term_name(term_id: Optional[int]) -> Optional[str]:
+    return _NAMES.get(term_id)
+
+
+def terms(dimension: str) -> List[Tuple[int, str]]:
+    """(id, name) of every term in a dimension, in id order."""
+    return [(term_id, name) for term_id, term_dimension, name in TERMS if term_dimension == dimension]
+
+
+def vocabulary_columns(field_of_study: Optional[str], level_of_study: Optional[str]) -> Dict[str, int]:
+    """Scholarship column values for the raw field and level of study."""
+    return {
+        'field_id': canonical_term(FIELD, field_of_study),
+        'level_id': canonical_term(LEVEL, level_of_study),
+    }
@@ -7,7 +7,12 @@ import uvicorn
 # Import local modules
 from app.api.endpoints import router
 from app.scraper.worker import ScholarshipScraper
-from app.core.database import get_db
+from app.core.cache import CACHE_STATUS_HEADER, ResponseCacheMiddleware
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal, async_engine
+from app.services.facets import warm_facet_index
+from app.services.similarity import warm_similarity_index
+from app.utils.pagination import NEXT_CURSOR_HEADER, PREV_CURSOR_HEADER
 
 # Configuration
 CORS_ORIGINS = ["*"]  
@@ -21,20 +26,25 @@ async def lifespan(app: FastAPI):
     Handles startup and shutdown events.
     """
     try:
-        # Startup: Initialize database and start worker
-        db = next(get_db())
-        scraper = ScholarshipScraper(db)
+        # Startup: start the worker; it opens its own database sessions
+        scraper = ScholarshipScraper()
         worker_task = asyncio.create_task(scraper.run_worker())
+        # Build the facet and similarity indexes now rather than on their first requests
+        facet_task = asyncio.create_task(warm_facet_index(AsyncSessionLocal))
+        similarity_task = asyncio.create_task(warm_similarity_index(AsyncSessionLocal))
         
         yield  # Keeps the app running until shutdown
         
     finally:
-        # Shutdown: Clean up worker task
-        worker_task.cancel()
-        try:
-            await worker_task
-        except asyncio.CancelledError:
-            pass
+        # Shutdown: Clean up worker and index tasks
+        for task in (worker_task, facet_task, similarity_task):
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        # Close pooled connections so their driver threads do not outlive the app
+        await async_engine.dispose()
 
 def create_application() -> FastAPI:
     """
@@ -42,6 +52,15 @@ def create_application() -> FastAPI:
     """
     # Create FastAPI instance with lifespan
     app = FastAPI(lifespan=lifespan)
+    settings = get_settings()
+
+    # Added before CORS so it sits inside it and cached bodies carry no per-origin headers
+    app.add_middleware(
+        ResponseCacheMiddleware,
+        ttls=settings.RESPONSE_CACHE_TTLS,
+        max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+        volatile_fields=settings.RESPONSE_CACHE_VOLATILE_FIELDS,
+    )
     
     # Add CORS middleware
     app.add_middleware(
@@ -50,6 +69,7 @@ def create_application() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, PREV_CURSOR_HEADER, "ETag", CACHE_STATUS_HEADER],
         max_age=600,
     )
     
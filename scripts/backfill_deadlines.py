@@ -0,0 +1,99 @@
+"""
+Re-parse every scholarship's deadline from the date its AI summary recorded.
+
+    python scripts/backfill_deadlines.py [--batch-size 1000]
+
+Deadlines are normalized as they are saved, but rows saved before
+app.utils.deadlines existed lost text such as "March 1st" or "Rolling", and the
+migration that added deadline_kind could only classify the dates already
+parsed. Recurring deadlines stated without a year are stored as their next
+occurrence, so re-running this also moves past ones on to the following year.
+A row whose summary has no usable date keeps the deadline it has. Rows are
+processed in id order, one committed batch at a time; the stats rollups and the
+change log are updated in the same transaction as each batch.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def deadline_info(ai_summary):
+    info = ai_summary.get('deadline_info') if isinstance(ai_summary, dict) else None
+    return info if isinstance(info, dict) else {}
+
+
+async def backfill(batch_size: int) -> int:
+    from sqlalchemy import bindparam, select, update
+    from app.core.database import AsyncSessionLocal
+    from app.models.schemas import Scholarship
+    from app.services.changes import record_upserts
+    from app.services.rollups import ROLLUP_SOURCE_COLUMNS, apply_rollup_deltas, rollup_deltas
+    from app.utils.deadlines import DATE, UNKNOWN, Deadline, deadline_columns, mark_recurring, normalize_deadlines
+
+    statement = (
+        update(Scholarship.__table__)
+        .where(Scholarship.__table__.c.id == bindparam('row_id'))
+        # A re-parse is not an edit, so last_updated keeps the value the day rollups were counted under
+        .values({column: bindparam(column) for column in deadline_columns(Deadline(UNKNOWN))})
+        .values(last_updated=Scholarship.__table__.c.last_updated)
+    )
+
+    today = date.today()
+    updated, last_id = 0, 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                select(Scholarship.id, Scholarship.identity_key, Scholarship.ai_summary, Scholarship.deadline_kind,
+                       *ROLLUP_SOURCE_COLUMNS)
+                .where(Scholarship.id > last_id)
+                .order_by(Scholarship.id)
+                .limit(batch_size)
+            )).mappings().all()
+            if not rows:
+                return updated
+
+            infos = [deadline_info(row['ai_summary']) for row in rows]
+            parsed = normalize_deadlines([str(info['date']) if info.get('date') else None for info in infos], today)
+            changed = []
+            for row, info, deadline in zip(rows, infos, parsed):
+                if deadline.kind == UNKNOWN and row['deadline']:
+                    deadline = Deadline(DATE, row['deadline'])
+                values = deadline_columns(mark_recurring(deadline, info.get('is_recurring')))
+                if values != {'deadline': row['deadline'], 'deadline_kind': row['deadline_kind']}:
+                    changed.append((row, values))
+
+            if changed:
+                await db.execute(statement, [{'row_id': row['id'], **values} for row, values in changed])
+                await apply_rollup_deltas(db, rollup_deltas(
+                    added=[{**row, **values} for row, values in changed],
+                    removed=[row for row, _ in changed]
+                ))
+                keys = [row['identity_key'] for row, _ in changed]
+                await record_upserts(db, keys, keys)
+                await db.commit()
+            updated += len(changed)
+        last_id = rows[-1]['id']
+
+
+async def main():
+    from app.core.database import async_engine
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    try:
+        updated = await backfill(args.batch_size)
+    finally:
+        await async_engine.dispose()
+    print(f"Re-parsed deadlines of {updated} scholarships in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+"""
+Re-map every scholarship's field and level of study onto the canonical vocabulary.
+
+    python scripts/backfill_vocabulary.py [--batch-size 1000]
+
+New rows are mapped as they are saved and the migration that added the
+vocabulary mapped existing rows, so this is only needed after changing the
+synonyms in app.utils.vocabulary. Terms themselves are seeded by migrations.
+Rows are processed in id order, one committed batch at a time, and only rows
+whose terms change are written; the stats rollups and the change log are
+updated in the same transaction as each batch.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def backfill(batch_size: int) -> int:
+    from sqlalchemy import bindparam, select, update
+    from app.core.database import AsyncSessionLocal
+    from app.models.schemas import Scholarship
+    from app.services.changes import record_upserts
+    from app.services.rollups import ROLLUP_SOURCE_COLUMNS, apply_rollup_deltas, rollup_deltas
+    from app.utils.vocabulary import vocabulary_columns
+
+    statement = (
+        update(Scholarship.__table__)
+        .where(Scholarship.__table__.c.id == bindparam('row_id'))
+        # A re-map is not an edit, so last_updated keeps the value the day rollups were counted under
+        .values({column: bindparam(column) for column in vocabulary_columns(None, None)})
+        .values(last_updated=Scholarship.__table__.c.last_updated)
+    )
+
+    updated, last_id = 0, 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                select(Scholarship.id, Scholarship.identity_key, Scholarship.field_of_study, Scholarship.level_of_study,
+                       *ROLLUP_SOURCE_COLUMNS)
+                .where(Scholarship.id > last_id)
+                .order_by(Scholarship.id)
+                .limit(batch_size)
+            )).mappings().all()
+            if not rows:
+                return updated
+
+            changed = []
+            for row in rows:
+                values = vocabulary_columns(row['field_of_study'], row['level_of_study'])
+                if any(row[column] != value for column, value in values.items()):
+                    changed.append((row, values))
+
+            if changed:
+                await db.execute(statement, [{'row_id': row['id'], **values} for row, values in changed])
+                await apply_rollup_deltas(db, rollup_deltas(
+                    added=[{**row, **values} for row, values in changed],
+                    removed=[row for row, _ in changed]
+                ))
+                keys = [row['identity_key'] for row, _ in changed]
+                await record_upserts(db, keys, keys)
+                await db.commit()
+            updated += len(changed)
+        last_id = rows[-1]['id']
+
+
+async def main():
+    from app.core.database import async_engine
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    try:
+        updated = await backfill(args.batch_size)
+    finally:
+        await async_engine.dispose()
+    print(f"Re-mapped vocabulary of {updated} scholarships in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
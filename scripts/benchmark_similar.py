@@ -0,0 +1,117 @@
+"""
+Latency benchmark for the similar-scholarships index on synthetic text.
+
+    python scripts/benchmark_similar.py [--rows 1000000] [--queries 200] [--dir /tmp/similarity_benchmark]
+
+Generates scholarship-like rows from a few hundred overlapping topic
+vocabularies, builds an index in --dir the way the API does (vectorize, IDF
+weighting, k-means lists once --rows reaches SIMILARITY_IVF_MIN_ROWS), then
+times top-10 queries against the whole matrix and against the nearest lists,
+and reports how many exact top-10 matches the approximate search finds. No
+database is touched. The matrix alone takes rows x SIMILARITY_DIMENSIONS x 4
+bytes in --dir, about 1 GB at a million rows.
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TOPICS = 400
+WORDS_PER_TOPIC = 60
+VOCABULARY = 20000
+BATCH_SIZE = 10000
+
+
+def synthetic_rows(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    vocabulary = [f"w{n}" for n in range(VOCABULARY)]
+    topics = [rng.sample(vocabulary, WORDS_PER_TOPIC) for _ in range(TOPICS)]
+    for id in range(1, count + 1):
+        topic = topics[rng.randrange(TOPICS)]
+        yield {
+            'id': id,
+            'title': ' '.join(rng.choices(topic, k=6)),
+            'eligibility_criteria': ' '.join(rng.choices(topic, k=25) + rng.choices(vocabulary, k=10)),
+            'field_of_study': rng.choice(topic),
+            'level_of_study': rng.choice(('Undergraduate', 'Graduate', 'College', 'High school')),
+        }
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return (
+        statistics.median(samples) * 1000,
+        samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000,
+    )
+
+
+def main():
+    from app.core.config import get_settings
+    from app.services.similarity import SimilarityIndex, np
+
+    if np is None:
+        sys.exit("numpy is required")
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--dir", default="/tmp/similarity_benchmark")
+    args = parser.parse_args()
+
+    index = SimilarityIndex(
+        args.dir,
+        dimensions=settings.SIMILARITY_DIMENSIONS,
+        ivf_min_rows=settings.SIMILARITY_IVF_MIN_ROWS,
+        probes=settings.SIMILARITY_IVF_PROBES,
+    )
+    try:
+        started = time.perf_counter()
+        index.reset(args.rows + 1)
+        document_frequencies = np.zeros(index.dimensions, dtype=np.int64)
+        documents, batch = 0, []
+        for row in synthetic_rows(args.rows):
+            batch.append(row)
+            if len(batch) == BATCH_SIZE:
+                documents += index.stage(*index.term_frequencies(batch), document_frequencies)
+                batch = []
+        if batch:
+            documents += index.stage(*index.term_frequencies(batch), document_frequencies)
+        vectorized = time.perf_counter()
+        index.finish_build(document_frequencies, documents)
+        built = time.perf_counter()
+        print(f"Vectorized {documents} rows in {vectorized - started:.1f}s, "
+              f"weighted{' and clustered' if index.approximate else ''} them in {built - vectorized:.1f}s")
+
+        ids = random.Random(1).sample(range(1, args.rows + 1), min(args.queries, args.rows))
+        index.similar(ids[0], args.limit, exact=True)  # Page the matrix in
+        exact, exact_times = {}, []
+        for id in ids:
+            started = time.perf_counter()
+            exact[id] = {match for match, _ in index.similar(id, args.limit, exact=True)}
+            exact_times.append(time.perf_counter() - started)
+        p50, p95 = percentiles(exact_times)
+        print(f"Exact top-{args.limit}:       p50 {p50:.1f} ms, p95 {p95:.1f} ms")
+
+        if index.approximate:
+            found, approximate_times = 0, []
+            for id in ids:
+                started = time.perf_counter()
+                matches = {match for match, _ in index.similar(id, args.limit)}
+                approximate_times.append(time.perf_counter() - started)
+                found += len(matches & exact[id])
+            p50, p95 = percentiles(approximate_times)
+            recall = found / max(1, sum(len(matches) for matches in exact.values()))
+            print(f"Approximate top-{args.limit}: p50 {p50:.1f} ms, p95 {p95:.1f} ms, "
+                  f"recall {recall:.1%} ({index.probes} probes)")
+    finally:
+        shutil.rmtree(args.dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Recompute every near-duplicate scholarship cluster from the stored MinHash signatures.
+
+    python scripts/cluster_duplicates.py [--reindex] [--threshold 0.8] [--batch-size 1000]
+
+Saved scholarships are linked to the duplicates already stored as they are
+written, but clusters only ever merge there: a re-crawl that changes a title
+leaves it in its old cluster. This job rebuilds them all from scratch in one
+transaction. --reindex first recomputes every signature and its LSH band rows,
+which is needed after changing the shingling or band layout in app.utils.minhash.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def cluster(reindex: bool, threshold: float, batch_size: int):
+    from app.core.database import AsyncSessionLocal
+    from app.services.duplicates import rebuild_clusters, reindex_signatures
+
+    if reindex:
+        async with AsyncSessionLocal() as db:
+            indexed = await reindex_signatures(db, batch_size)
+        print(f"Signed {indexed} scholarships")
+    async with AsyncSessionLocal() as db:
+        clustered, clusters = await rebuild_clusters(db, threshold, batch_size)
+        await db.commit()
+    return clustered, clusters
+
+
+async def main():
+    from app.core.config import get_settings
+    from app.core.database import async_engine
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reindex", action="store_true", help="Recompute signatures before clustering")
+    parser.add_argument("--threshold", type=float, default=get_settings().DUPLICATE_SIMILARITY_THRESHOLD)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    try:
+        clustered, clusters = await cluster(args.reindex, args.threshold, args.batch_size)
+    finally:
+        await async_engine.dispose()
+    print(f"Grouped {clustered} scholarships into {clusters} duplicate clusters in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
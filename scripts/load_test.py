@@ -0,0 +1,125 @@
+"""
+Concurrent request latency test for the read API.
+
+    python scripts/load_test.py --seed 5000                  # in-process, seeded DATABASE_URL
+    python scripts/load_test.py --url http://localhost:8080  # against a running server
+
+Without --url the app is driven in-process through httpx's ASGI transport, so the
+scraping worker and browser are not started. --seed creates the tables in
+DATABASE_URL and inserts synthetic rows first; point DATABASE_URL at a scratch
+database when using it.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_PATHS = [
+    "/api/scholarships?limit=100",
+    "/api/scholarships/1",
+    "/api/status",
+    "/api/tasks/1/progress",
+]
+
+
+def seed(rows: int):
+    from sqlalchemy import create_engine, insert
+    from app.core.config import get_settings
+    from app.models.schemas import Base, ScrapingTask, ScrapingProgress, Scholarship
+    from app.utils.vocabulary import vocabulary_columns
+
+    engine = create_engine(get_settings().DATABASE_URL)
+    Base.metadata.create_all(engine)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(ScrapingTask), [
+            {"url": f"https://example{i}.edu/scholarships", "status": "completed",
+             "success_count": 1, "fail_count": 0, "created_at": now, "last_run": now}
+            for i in range(max(1, rows // 100))
+        ])
+        conn.execute(insert(ScrapingProgress), [
+            {"task_id": i + 1, "status": "completed", "total_links": 100, "processed_links": 100,
+             "scholarships_found": 100, "start_time": now - timedelta(minutes=5), "end_time": now}
+            for i in range(max(1, rows // 100))
+        ])
+        conn.execute(insert(Scholarship), [
+            {"task_id": i // 100 + 1, "identity_key": f"{i:064x}", "title": f"Scholarship {i}", "amount": "$5,000",
+             "amount_normalized_min": 5000.0, "amount_normalized_max": 5000.0, "amount_type": "fixed",
+             "field_of_study": "STEM", "level_of_study": "Undergraduate",
+             **vocabulary_columns("STEM", "Undergraduate"),
+             "eligibility_criteria": "Open to all students " * 5, "application_url": "https://example.edu/apply",
+             "source_url": f"https://example{i // 100}.edu/scholarships", "confidence_score": 0.9,
+             "ai_summary": {"field_of_study": "STEM"}, "last_updated": now - timedelta(seconds=i),
+             "created_at": now}
+            for i in range(rows)
+        ])
+
+
+async def run(client: httpx.AsyncClient, paths, total: int, concurrency: int):
+    latencies = {path: [] for path in paths}
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        nonlocal errors
+        path = paths[i % len(paths)]
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.get(path)
+            latencies[path].append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(total)])
+    elapsed = time.perf_counter() - started
+
+    print(f"{total} requests, concurrency {concurrency}, {elapsed:.2f}s, "
+          f"{total / elapsed:.1f} req/s, {errors} errors")
+    print(f"{'path':40} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for path, values in latencies.items():
+        values.sort()
+        pct = lambda q: values[min(len(values) - 1, int(q * len(values)))] * 1000
+        print(f"{path:40} {statistics.median(values) * 1000:8.1f} {pct(0.95):8.1f} {pct(0.99):8.1f}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Base URL of a running server; in-process when omitted")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0, help="Insert this many synthetic scholarships first")
+    parser.add_argument("--path", action="append", dest="paths", help="Path to request (repeatable)")
+    args = parser.parse_args()
+
+    if args.seed:
+        seed(args.seed)
+        from app.core.database import AsyncSessionLocal
+        from app.services.rollups import rebuild_rollups
+        async with AsyncSessionLocal() as db:
+            await rebuild_rollups(db)
+            await db.commit()
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60)
+    else:
+        from main import create_application
+        client = httpx.AsyncClient(app=create_application(), base_url="http://loadtest", timeout=60)
+
+    async with client:
+        await run(client, args.paths or DEFAULT_PATHS, args.requests, args.concurrency)
+
+    if not args.url:
+        from app.core.database import async_engine
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
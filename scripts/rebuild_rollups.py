@@ -0,0 +1,34 @@
+"""
+Recompute the /scholarships/stats rollup table from the scholarships table.
+
+    python scripts/rebuild_rollups.py
+
+The rollups are kept up to date as scholarships are written, so this is only
+needed after rows were changed outside the API and worker (manual SQL, bulk
+imports, restored backups) or to clear accumulated float drift in the
+confidence sums. The rebuild runs in one transaction against DATABASE_URL.
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def main():
+    from app.core.database import AsyncSessionLocal, async_engine
+    from app.services.rollups import rebuild_rollups
+
+    started = time.perf_counter()
+    try:
+        async with AsyncSessionLocal() as db:
+            counted = await rebuild_rollups(db)
+            await db.commit()
+    finally:
+        await async_engine.dispose()
+    print(f"Rebuilt rollups from {counted} scholarships in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,35 @@
+import asyncio
+
+import httpx
+import openai
+
+from app.services.ai import ScholarshipAIProcessor
+
+BLOCK = "Title: Example Nursing Award\nAmount: $1,000\nDescription: For nursing students."
+ANALYSIS = {
+    'amount_analysis': {'value': '$1,000'},
+    'deadline_info': {'date': None, 'is_recurring': False},
+    'field_of_study': 'Nursing',
+    'level_of_study': 'Undergraduate',
+    'eligibility_requirements': ['Enrolled in a nursing program'],
+    'confidence_score': 0.9,
+}
+
+
+def test_rejected_request_escalates_to_next_tier():
+    processor = ScholarshipAIProcessor()
+    processor.settings = processor.settings.model_copy(update={'AI_MODEL_TIERS': ['small', 'large']})
+    requested = []
+
+    async def request_analysis(model, tier, prompt):
+        requested.append(model)
+        if model == 'small':
+            request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+            raise openai.BadRequestError("context length exceeded", response=httpx.Response(400, request=request), body=None)
+        return ANALYSIS
+
+    processor._request_analysis = request_analysis
+    result = asyncio.run(processor.process_scholarship(BLOCK))
+
+    assert requested == ['small', 'large']
+    assert result['model_tier'] == 'large'
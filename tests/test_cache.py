@@ -0,0 +1,74 @@
+import asyncio
+import itertools
+import json
+
+import pytest
+
+from app.core.cache import DataVersion, ResponseCacheMiddleware, strong_etag
+
+
+def json_app(body):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": json.dumps(body()).encode()})
+    return app
+
+
+def get(middleware, headers=()):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/api/status", "query_string": b"", "headers": list(headers)}
+    asyncio.run(middleware(scope, receive, send))
+    return messages
+
+
+def test_etag_ignores_volatile_fields_at_any_depth():
+    first = json.dumps({"total": 3, "last_update": "a", "tasks": [{"id": 1, "processing_duration": "1s"}]}).encode()
+    second = json.dumps({"tasks": [{"processing_duration": "9s", "id": 1}], "last_update": "b", "total": 3}).encode()
+    fields = ["last_update", "processing_duration"]
+
+    assert strong_etag(first, fields) == strong_etag(second, fields)
+    assert strong_etag(first) != strong_etag(second)
+    assert strong_etag(b"not json", fields) == strong_etag(b"not json")
+
+
+def test_expired_entry_with_only_volatile_changes_revalidates():
+    clock = itertools.count()
+    middleware = ResponseCacheMiddleware(
+        json_app(lambda: {"total": 3, "last_update": next(clock)}),
+        ttls={"/api/status": 0.0},
+        version=DataVersion(),
+        volatile_fields={"/api/status": ["last_update"]}
+    )
+
+    etag = dict(get(middleware)[0]["headers"])[b"etag"]
+    revalidated = get(middleware, [(b"if-none-match", etag)])
+
+    assert revalidated[0]["status"] == 304
+    assert dict(revalidated[0]["headers"])[b"x-cache"] == b"MISS"
+
+
+def test_app_errors_propagate():
+    async def failing(scope, receive, send):
+        raise RuntimeError("boom")
+
+    middleware = ResponseCacheMiddleware(failing, ttls={"/api/status": 5.0}, version=DataVersion())
+
+    with pytest.raises(RuntimeError, match="boom"):
+        get(middleware)
+
+
+def test_app_without_response_sends_nothing():
+    async def silent(scope, receive, send):
+        pass
+
+    middleware = ResponseCacheMiddleware(silent, ttls={"/api/status": 5.0}, version=DataVersion())
+
+    assert get(middleware) == []
@@ -0,0 +1,69 @@
+from datetime import date, datetime
+
+import pytest
+
+from app.utils.deadlines import (
+    DATE, RECURRING, ROLLING, UNKNOWN, Deadline, deadline_columns, mark_recurring, normalize_deadline,
+    normalize_deadlines
+)
+
+TODAY = date(2026, 10, 19)
+
+
+@pytest.mark.parametrize("text", [
+    '2025-03-01',
+    '2025/03/01T00:00:00',
+    '01-03-2025',  # Dashes read day first
+    '03/01/25',  # Slashes read month first
+    'March 1st, 2025',
+    '1 March 2025',
+])
+def test_dated_formats(text):
+    assert normalize_deadline(text, TODAY) == Deadline(DATE, datetime(2025, 3, 1))
+
+
+def test_only_valid_order_wins():
+    assert normalize_deadline('13/01/2025', TODAY) == Deadline(DATE, datetime(2025, 1, 13))
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('Mar. 1', datetime(2027, 3, 1)),  # Already past this year
+    ('1st of March', datetime(2027, 3, 1)),
+    ('  December   1st  ', datetime(2026, 12, 1)),
+    ('Feb 29', datetime(2028, 2, 29)),  # Next leap year
+])
+def test_yearless_dates_recur_on_their_next_occurrence(text, expected):
+    assert normalize_deadline(text, TODAY) == Deadline(RECURRING, expected)
+
+
+def test_annual_wording_marks_a_dated_deadline_recurring():
+    assert normalize_deadline('Annually on March 1, 2025', TODAY) == Deadline(RECURRING, datetime(2025, 3, 1))
+
+
+@pytest.mark.parametrize("text, kind", [
+    ('Rolling', ROLLING),
+    ('open until filled', ROLLING),
+    ('Feb 30, 2025', UNKNOWN),
+    ('2025-13-01', UNKNOWN),
+    ('no date here', UNKNOWN),
+    ('', UNKNOWN),
+    (None, UNKNOWN),
+])
+def test_undated(text, kind):
+    assert normalize_deadline(text, TODAY) == Deadline(kind)
+
+
+def test_batch_matches_single_calls():
+    texts = ['Rolling', 'March 1st', None, 'Rolling', '2025-03-01']
+    assert normalize_deadlines(texts, TODAY) == [normalize_deadline(text, TODAY) for text in texts]
+
+
+def test_mark_recurring_only_changes_dated_deadlines():
+    dated = Deadline(DATE, datetime(2025, 3, 1))
+    assert mark_recurring(dated, True) == Deadline(RECURRING, datetime(2025, 3, 1))
+    assert mark_recurring(dated, False) == dated
+    assert mark_recurring(Deadline(ROLLING), True) == Deadline(ROLLING)
+
+
+def test_deadline_columns():
+    assert deadline_columns(Deadline(ROLLING)) == {'deadline': None, 'deadline_kind': ROLLING}
@@ -0,0 +1,37 @@
+import asyncio
+import gzip
+
+import pytest
+
+from app.services.export import accepts_gzip, encode_chunks
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, False),
+    ('', False),
+    ('gzip', True),
+    ('gzip, deflate, br', True),
+    ('GZIP;Q=0.5', True),
+    ('x-gzip', True),
+    ('gzip;q=0', False),
+    ('br;q=1, gzip ; q=0.0', False),
+    ('gzip;q=abc', False),
+    ('deflate', False),
+    ('*', True),
+    ('*;q=0', False),
+    ('identity, *;q=0.1', True),
+    ('gzip;q=0, *', False),  # An explicit gzip entry overrides the wildcard
+])
+def test_accepts_gzip(header, expected):
+    assert accepts_gzip(header) is expected
+
+
+def test_encode_chunks_writes_one_gzip_member():
+    async def chunks():
+        for chunk in ('a,b\n', '', '1,2\n'):
+            yield chunk
+
+    async def collect():
+        return b''.join([data async for data in encode_chunks(chunks(), gzip=True)])
+
+    assert gzip.decompress(asyncio.run(collect())) == b'a,b\n1,2\n'
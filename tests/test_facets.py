@@ -0,0 +1,102 @@
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models.schemas import Base, Scholarship, ScholarshipChange, ScrapingTask, VocabularyTerm
+from app.services.facets import FacetIndex
+from app.services.rollups import AMOUNT, DEADLINE_MONTH, FIELD, LEVEL, NO_DEADLINE
+
+ENGINEERING, HEALTH = 10, 11
+UNDERGRADUATE, GRADUATE = 106, 107
+
+# id: (field_id, level_id, amount_normalized_max, deadline)
+ROWS = {
+    1: (ENGINEERING, UNDERGRADUATE, 500.0, datetime(2025, 3, 1)),
+    2: (ENGINEERING, GRADUATE, 2000.0, datetime(2025, 3, 15)),
+    3: (HEALTH, UNDERGRADUATE, 2000.0, None),
+    4: (HEALTH, GRADUATE, 30000.0, datetime(2025, 4, 1)),
+    5: (None, UNDERGRADUATE, None, None),
+}
+
+
+def counts_by_value(facets, dimension):
+    return {value: count for value, _, count in facets[dimension]}
+
+
+def run(steps):
+    """Build an index over ROWS, then run each (writes, selected) step: apply the writes, refresh, count."""
+    async def main(tmp_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'facets.db'}")
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all, tables=[
+                    ScrapingTask.__table__, VocabularyTerm.__table__, Scholarship.__table__, ScholarshipChange.__table__
+                ])
+            session_factory = async_sessionmaker(engine, expire_on_commit=False)
+            index = FacetIndex(full_rebuild_changes=100)
+            results = []
+            async with session_factory() as db:
+                await db.execute(insert(Scholarship), [
+                    {'id': id, 'task_id': 1, 'identity_key': f"key-{id}", 'field_id': field_id, 'level_id': level_id,
+                     'amount_normalized_max': amount, 'deadline': deadline}
+                    for id, (field_id, level_id, amount, deadline) in ROWS.items()
+                ])
+                await db.commit()
+                for writes, selected in steps:
+                    for statement, change in writes:
+                        await db.execute(statement)
+                        await db.execute(insert(ScholarshipChange).values(
+                            scholarship_id=change[0], identity_key=f"key-{change[0]}", operation=change[1]
+                        ))
+                    await db.commit()
+                    await index.refresh(db)
+                    results.append(index.counts(selected))
+            return results
+        finally:
+            await engine.dispose()
+    return main
+
+
+def test_counts_without_selection(tmp_path):
+    [(total, facets)] = asyncio.run(run([([], {})])(tmp_path))
+
+    assert total == 5
+    assert counts_by_value(facets, FIELD) == {'': 1, str(ENGINEERING): 2, str(HEALTH): 2}
+    assert [label for _, label, _ in facets[FIELD]] == ['Engineering', 'Health and Medicine', 'Not specified']
+    assert counts_by_value(facets, LEVEL) == {str(UNDERGRADUATE): 3, str(GRADUATE): 2}
+    assert [value for value, _, _ in facets[AMOUNT]] == ['Under $1,000', '$1,000 - $4,999', '$25,000+', 'Unknown']
+    assert counts_by_value(facets, DEADLINE_MONTH) == {'2025-03': 2, '2025-04': 1, NO_DEADLINE: 2}
+
+
+def test_selections_or_within_and_across_dimensions(tmp_path):
+    selected = {FIELD: [str(ENGINEERING), str(HEALTH)], LEVEL: [str(UNDERGRADUATE)]}
+    [(total, facets)] = asyncio.run(run([([], selected)])(tmp_path))
+
+    assert total == 2  # Rows 1 and 3
+    # A dimension is counted under the other dimensions' selections only
+    assert counts_by_value(facets, FIELD) == {'': 1, str(ENGINEERING): 1, str(HEALTH): 1}
+    assert counts_by_value(facets, LEVEL) == {str(UNDERGRADUATE): 2, str(GRADUATE): 2}
+    assert counts_by_value(facets, AMOUNT) == {'Under $1,000': 1, '$1,000 - $4,999': 1, '$25,000+': 0, 'Unknown': 0}
+
+
+def test_unknown_selected_value_matches_nothing(tmp_path):
+    [(total, _)] = asyncio.run(run([([], {FIELD: ['999']})])(tmp_path))
+
+    assert total == 0
+
+
+def test_refresh_applies_updates_and_deletes(tmp_path):
+    steps = [
+        ([], {}),
+        ([
+            (update(Scholarship).where(Scholarship.id == 5).values(field_id=HEALTH), (5, 'update')),
+            (delete(Scholarship).where(Scholarship.id == 1), (1, 'delete')),
+        ], {FIELD: [str(HEALTH)]}),
+    ]
+    _, (total, facets) = asyncio.run(run(steps)(tmp_path))
+
+    assert total == 3
+    assert counts_by_value(facets, FIELD) == {str(ENGINEERING): 1, str(HEALTH): 3}
+    assert counts_by_value(facets, AMOUNT) == {'$1,000 - $4,999': 1, '$25,000+': 1, 'Unknown': 1}
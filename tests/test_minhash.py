@@ -0,0 +1,50 @@
+from app.utils.minhash import BANDS, NUM_PERM, band_buckets, shingles, signature, similar_pairs, similarity
+
+ELIGIBILITY = (
+    "Open to female undergraduate students enrolled full time in an accredited engineering program at a "
+    "Canadian university who demonstrate leadership, community involvement and academic achievement with a "
+    "minimum average of seventy percent"
+)
+ORIGINAL = signature("Women in Engineering Scholarship", ELIGIBILITY)
+RECASED = signature("WOMEN in Engineering Scholarship!", ELIGIBILITY)
+EXTENDED = signature("Women in Engineering Scholarship", ELIGIBILITY + " in their most recent year")
+UNRELATED = signature("Nursing Bursary", "Available to graduate nursing students with financial need living in Ontario")
+
+
+def test_shingles():
+    assert shingles("A B", None) == {"a b"}
+    assert shingles("One two three four", "") == {"one two three", "two three four"}
+    assert shingles(None, None) == set()
+
+
+def test_signature():
+    assert len(ORIGINAL) == NUM_PERM * 4
+    assert signature("", None) is None
+    assert signature("Women in Engineering Scholarship", ELIGIBILITY) == ORIGINAL
+
+
+def test_similarity_estimates_jaccard():
+    assert similarity(ORIGINAL, RECASED) == 1.0  # Case and punctuation are normalized away
+    assert 0.8 <= similarity(ORIGINAL, EXTENDED) < 1.0
+    assert similarity(ORIGINAL, UNRELATED) < 0.2
+
+
+def test_band_buckets_fit_a_signed_bigint():
+    buckets = band_buckets(ORIGINAL)
+
+    assert [band for band, _ in buckets] == list(range(BANDS))
+    assert all(0 <= bucket < 2 ** 63 for _, bucket in buckets)
+    assert band_buckets(RECASED) == buckets
+
+
+def test_similar_pairs_link_near_duplicates_only():
+    pairs = similar_pairs([(1, ORIGINAL), (2, EXTENDED), (3, UNRELATED), (4, RECASED)], threshold=0.8)
+
+    assert {id for pair in pairs for id in pair} == {1, 2, 4}
+    assert all(first < second for first, second in pairs)
+    signatures = {1: ORIGINAL, 2: EXTENDED, 4: RECASED}
+    assert all(similarity(signatures[first], signatures[second]) >= 0.8 for first, second in pairs)
+
+
+def test_similar_pairs_respect_the_threshold():
+    assert similar_pairs([(1, ORIGINAL), (2, EXTENDED)], threshold=1.0) == []
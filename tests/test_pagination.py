@@ -0,0 +1,94 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models.schemas import Base, ScrapingTask
+from app.utils.pagination import decode_cursor, encode_cursor, paginate_keyset
+
+# id -> last_run; ties and NULLs on purpose
+LAST_RUN = {
+    1: datetime(2024, 1, 1),
+    2: None,
+    3: datetime(2024, 1, 2),
+    4: datetime(2024, 1, 2),
+    5: None,
+    6: datetime(2024, 1, 3),
+    7: None,
+}
+# sort DESC NULLS LAST, id DESC
+NEWEST_FIRST = [6, 4, 3, 1, 7, 5, 2]
+
+
+def walk(tmp_path, limit):
+    """Every page going forward from the start, then every page going back from the last one."""
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'pages.db'}")
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all, tables=[ScrapingTask.__table__])
+            session_factory = async_sessionmaker(engine, expire_on_commit=False)
+            async with session_factory() as db:
+                db.add_all(ScrapingTask(id=id, url=f"https://example.org/{id}", last_run=last_run)
+                           for id, last_run in LAST_RUN.items())
+                await db.commit()
+
+                async def page(cursor):
+                    return await paginate_keyset(db, select(ScrapingTask), ScrapingTask.last_run, ScrapingTask.id,
+                                                 limit, cursor)
+
+                forward = [await page(None)]
+                while forward[-1].next_cursor:
+                    forward.append(await page(forward[-1].next_cursor))
+                backward = [forward[-1]]
+                while backward[-1].prev_cursor:
+                    backward.append(await page(backward[-1].prev_cursor))
+                return forward, backward
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+def ids(pages):
+    return [[task.id for task in page.items] for page in pages]
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 4, 7])
+def test_forward_pages_cover_every_row_once_in_order(tmp_path, limit):
+    forward, _ = walk(tmp_path, limit)
+
+    assert [id for page in ids(forward) for id in page] == NEWEST_FIRST
+    assert all(len(page) == limit for page in ids(forward)[:-1])
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 4, 7])
+def test_backward_pages_retrace_the_forward_ones(tmp_path, limit):
+    forward, backward = walk(tmp_path, limit)
+
+    assert ids(backward) == ids(forward)[::-1]
+
+
+def test_backward_page_links_forward_again(tmp_path):
+    _, backward = walk(tmp_path, 2)
+
+    # Paging back to the first page ends the prev chain but keeps a way forward
+    assert ids(backward)[-1] == [6, 4]
+    assert backward[-1].prev_cursor is None
+    assert backward[-1].next_cursor is not None
+
+
+def test_cursor_round_trip():
+    cursor = decode_cursor(encode_cursor(datetime(2024, 1, 2, 3, 4, 5), 42, backward=True))
+    assert (cursor.sort_value, cursor.id, cursor.backward) == (datetime(2024, 1, 2, 3, 4, 5), 42, True)
+
+    cursor = decode_cursor(encode_cursor(None, 7))
+    assert (cursor.sort_value, cursor.id, cursor.backward) == (None, 7, False)
+
+
+@pytest.mark.parametrize("token", ["", "not-a-cursor", encode_cursor(None, 1) + "x", "WzEsMl0"])
+def test_bad_cursor_raises_value_error(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
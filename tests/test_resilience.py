@@ -0,0 +1,58 @@
+import asyncio
+
+import httpx
+import openai
+import pytest
+
+from app.services.resilience import CircuitBreaker, OpenAIGuard
+
+
+def half_open_guard() -> OpenAIGuard:
+    guard = OpenAIGuard()
+    guard.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    guard.breaker.record_failure()  # Open, and due for a probe straight away
+    return guard
+
+
+def bad_request() -> openai.BadRequestError:
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    return openai.BadRequestError("invalid request", response=httpx.Response(400, request=request), body=None)
+
+
+def test_non_transient_error_releases_half_open_probe():
+    guard = half_open_guard()
+
+    async def rejected():
+        raise bad_request()
+
+    with pytest.raises(openai.BadRequestError):
+        asyncio.run(guard.call(rejected))
+
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+    assert guard.breaker.allow_request()
+    assert guard.limiter.in_flight == 0
+
+
+def test_cancelled_probe_is_released():
+    guard = half_open_guard()
+
+    async def cancel_probe():
+        started = asyncio.Event()
+
+        async def hang():
+            started.set()
+            await asyncio.sleep(3600)
+
+        task = asyncio.create_task(guard.call(hang))
+        await started.wait()
+        assert not guard.breaker.allow_request()  # The probe is in flight
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.wait_for(guard.breaker.wait_until_available(poll_interval=0.01), timeout=1)
+
+    asyncio.run(cancel_probe())
+
+    assert guard.breaker.state == CircuitBreaker.HALF_OPEN
+    assert guard.breaker.allow_request()
+    assert guard.limiter.in_flight == 0
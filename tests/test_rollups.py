@@ -0,0 +1,68 @@
+from datetime import datetime
+
+from app.services.rollups import (
+    AMOUNT, DAY, DEADLINE_MONTH, FIELD, LEVEL, NO_DEADLINE, NOT_SPECIFIED, OPEN_AMOUNT_BUCKET, TOTAL,
+    UNKNOWN_AMOUNT, amount_bucket, rollup_deltas, rollup_keys
+)
+
+ROW = {
+    'field_id': 11,
+    'level_id': 106,
+    'amount_normalized_max': 2500.0,
+    'deadline': datetime(2025, 3, 1),
+    'last_updated': datetime(2024, 11, 19, 8, 30),
+    'confidence_score': 0.8,
+}
+
+
+def test_amount_buckets():
+    assert amount_bucket(None) == UNKNOWN_AMOUNT
+    assert amount_bucket(999.99) == 'Under $1,000'
+    assert amount_bucket(1000) == '$1,000 - $4,999'
+    assert amount_bucket(24999) == '$10,000 - $24,999'
+    assert amount_bucket(25000) == OPEN_AMOUNT_BUCKET
+
+
+def test_rollup_keys():
+    assert rollup_keys(ROW) == [
+        (TOTAL, ''),
+        (FIELD, 'Health and Medicine'),
+        (LEVEL, 'Undergraduate'),
+        (AMOUNT, '$1,000 - $4,999'),
+        (DEADLINE_MONTH, '2025-03'),
+        (DAY, '2024-11-19'),
+    ]
+
+
+def test_rollup_keys_of_a_sparse_row():
+    assert rollup_keys({}) == [
+        (TOTAL, ''),
+        (FIELD, NOT_SPECIFIED),
+        (LEVEL, NOT_SPECIFIED),
+        (AMOUNT, UNKNOWN_AMOUNT),
+        (DEADLINE_MONTH, NO_DEADLINE),
+    ]
+
+
+def test_added_rows_count_and_sum_confidence():
+    deltas = rollup_deltas(added=[ROW, {**ROW, 'confidence_score': None}])
+
+    assert deltas[(TOTAL, '')] == [2, 0.8, 1]
+    assert deltas[(DAY, '2024-11-19')] == [2, 0.8, 1]
+
+
+def test_unchanged_rows_cancel_out():
+    assert rollup_deltas(added=[ROW], removed=[dict(ROW)]) == {}
+
+
+def test_moved_row_leaves_only_the_changed_buckets():
+    moved = {**ROW, 'amount_normalized_max': 30000.0, 'confidence_score': 0.5}
+
+    deltas = rollup_deltas(added=[moved], removed=[ROW])
+
+    assert deltas[(AMOUNT, '$1,000 - $4,999')] == [-1, -0.8, -1]
+    assert deltas[(AMOUNT, OPEN_AMOUNT_BUCKET)] == [1, 0.5, 1]
+    # Same buckets, new confidence: the count nets out, the sum does not
+    assert deltas[(TOTAL, '')][0] == 0
+    assert round(deltas[(TOTAL, '')][1], 9) == -0.3
+    assert set(deltas) == {key for key in rollup_keys(ROW) + rollup_keys(moved)}
@@ -0,0 +1,45 @@
+import pytest
+
+from app.utils.vocabulary import FIELD, LEVEL, TERMS, canonical_term, normalize, term_name, vocabulary_columns
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, 'Not specified'),
+    ('', 'Not specified'),
+    ('N/A', 'Not specified'),
+    ('Any', 'Any field'),
+    ('Computer Science', 'Computer Science and IT'),  # Not "Sciences and Mathematics"
+    ('Nursing and Computer Science', 'Health and Medicine'),  # The first subject named wins
+    ('Enginering', 'Engineering'),  # Misspelt
+    ('Basket weaving', 'Other'),
+])
+def test_field_of_study(value, expected):
+    assert term_name(canonical_term(FIELD, value)) == expected
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, 'Not specified'),
+    ('High School', 'High school'),
+    ('PhD', 'Graduate'),
+    ('all levels', 'Any level'),
+    ('Undergraduate, undergrad', 'Undergraduate'),  # Two phrases, one level
+    ('Undergraduate or Graduate', 'Multiple levels'),
+    ('xyz', 'Other'),
+])
+def test_level_of_study(value, expected):
+    assert term_name(canonical_term(LEVEL, value)) == expected
+
+
+def test_canonical_names_map_to_themselves():
+    for term_id, dimension, name in TERMS:
+        assert canonical_term(dimension, name) == term_id
+
+
+def test_normalize():
+    assert normalize("  Bachelor's — Sciences  ") == 'bachelor s sciences'
+    assert normalize('Études') == 'etudes'
+    assert normalize(None) == ''
+
+
+def test_vocabulary_columns():
+    assert vocabulary_columns('Engineering', 'Graduate') == {'field_id': 10, 'level_id': 107}
@@ -0,0 +1,56 @@
+import asyncio
+from types import SimpleNamespace
+
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.models.schemas import Base, LLMUsage, ScrapedLink, ScrapingProgress, ScrapingTask
+from app.scraper.worker import ScholarshipScraper
+from app.services.usage import usage_tracker
+
+
+class FailFirstCommit(AsyncSession):
+    failures = 1
+
+    async def commit(self):
+        if FailFirstCommit.failures:
+            FailFirstCommit.failures -= 1
+            raise OperationalError("COMMIT", {}, Exception("database is locked"))
+        await super().commit()
+
+
+def test_llm_usage_survives_a_failed_batch(tmp_path):
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'buffer.db'}")
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all, tables=[
+                    ScrapingTask.__table__, ScrapedLink.__table__, ScrapingProgress.__table__, LLMUsage.__table__
+                ])
+            session_factory = async_sessionmaker(engine, expire_on_commit=False)
+            async with session_factory() as db:
+                db.add(ScrapingTask(id=1, url="https://example.org"))
+                await db.commit()
+
+            scraper = ScholarshipScraper(async_sessionmaker(engine, class_=FailFirstCommit, expire_on_commit=False))
+            completion = SimpleNamespace(usage=SimpleNamespace(prompt_tokens=100, completion_tokens=20))
+            with usage_tracker.scope(1, "example.org"):
+                usage_tracker.record("gpt-4o-mini", "extract", completion, 0.5)
+
+            # The batch commit fails after the usage was staged, so the buffer rolls back and retries row by row
+            await scraper.buffer.add_link({"task_id": 1, "url": "https://example.org/ok"})
+            await scraper.buffer.flush()
+
+            async with session_factory() as db:
+                usage = (await db.execute(select(LLMUsage))).scalars().all()
+                links = (await db.execute(select(ScrapedLink.url))).scalars().all()
+            return usage, links
+        finally:
+            await engine.dispose()
+
+    usage, links = asyncio.run(run())
+
+    assert links == ["https://example.org/ok"]
+    assert [(row.calls, row.prompt_tokens, row.completion_tokens) for row in usage] == [(1, 100, 20)]
+    assert usage_tracker.drain() == []